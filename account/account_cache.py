@@ -0,0 +1,285 @@
+import asyncio, os, threading, time
+from decimal import Decimal
+from typing import Callable, List, Optional
+
+from account.models import AccountSnapshot, Balance
+from account.my_account import get_my_exchange_account, get_my_exchange_account_async
+from utils.rate_limiter import background_priority
+
+"""
+# 계좌 캐시 (Account Cache)
+
+전체 계좌 조회(/v1/accounts) 결과를 메모리에 보관하여, 시그널마다 계좌를 다시 조회하지 않도록 합니다.
+
+- 최대 허용 경과 시간(ACCOUNT_CACHE_MAX_AGE)을 넘은 스냅샷은 사용하지 않고 다시 조회
+- 백그라운드 스레드가 주기적으로(ACCOUNT_CACHE_REFRESH_INTERVAL) 갱신
+- 주문하기 전에 해당 금액을 로컬에서 차감(reserve)하여, 동시에 처리 중인 시그널이 같은 잔고로 매수하지 않도록 함
+  (잔고 확인과 차감을 한 번에 처리하여 부족하면 차감하지 않음,
+   접수되지 않으면 차감 취소, 접수되면 접수 후에 조회한 스냅샷이 저장될 때까지 유지)
+- 조회 중에 들어온 로컬 보정은 조회 결과에 다시 반영 (조회 결과를 버리지 않음)
+- 주문이 체결되면 로컬 스냅샷을 보정(apply_fill)하고 비동기로 다시 조회
+- asyncio 서버는 get_async()로 조회 (동시에 여러 요청이 와도 한 번만 조회)
+"""
+
+ACCOUNT_CACHE_MAX_AGE = float(os.getenv('ACCOUNT_CACHE_MAX_AGE', '5'))
+ACCOUNT_CACHE_REFRESH_INTERVAL = float(os.getenv('ACCOUNT_CACHE_REFRESH_INTERVAL', '3'))
+
+
+class AccountCache:
+    """
+    계좌 스냅샷 캐시.
+
+    Args:
+        fetch (Callable): 계좌 조회 함수 (-> AccountSnapshot)
+        fetch_async (Callable): 계좌 조회 코루틴 함수 (asyncio 서버용)
+        max_age (float): 스냅샷 최대 허용 경과 시간(초)
+        refresh_interval (float): 백그라운드 갱신 주기(초)
+    """
+
+    def __init__(self, fetch: Callable = get_my_exchange_account, max_age: float = ACCOUNT_CACHE_MAX_AGE,
+                 refresh_interval: float = ACCOUNT_CACHE_REFRESH_INTERVAL,
+                 fetch_async: Callable = get_my_exchange_account_async):
+        self._fetch = fetch
+        self._fetch_async = fetch_async
+        self.max_age = max_age
+        self.refresh_interval = refresh_interval
+
+        self._base: Optional[AccountSnapshot] = None  # 마지막으로 조회한 스냅샷 (로컬 보정 전)
+        self._base_seq = 0  # 마지막 스냅샷의 조회를 시작할 때의 보정 순번
+        self._snapshot: Optional[AccountSnapshot] = None  # 조회한 스냅샷 + 아직 반영되지 않은 로컬 보정
+        self._valid = False
+        self._adjustments: List[_Adjustment] = []
+        self._seq = 0  # 로컬 보정 순번 (조회 결과에 보정이 반영되었는지 확인용)
+        self._lock = threading.Lock()  # 스냅샷 교체
+        self._fetch_lock = threading.Lock()  # 동시에 한 번만 조회 (single-flight)
+        self._refresh_event = threading.Event()
+        self._started = False
+        self._async_fetch: Optional[asyncio.Future] = None  # 진행 중인 비동기 조회
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._refresh_loop, name='account-cache', daemon=True).start()
+
+    def age(self) -> Optional[float]:
+        snapshot = self._snapshot
+        return None if snapshot is None else time.time() - snapshot.fetched_at
+
+    def get(self, max_age: Optional[float] = None) -> AccountSnapshot:
+        """
+        계좌 스냅샷을 반환합니다. 최대 허용 경과 시간을 넘었거나 무효화된 경우 다시 조회합니다.
+        """
+        max_age = self.max_age if max_age is None else max_age
+
+        snapshot = self._fresh(max_age)
+        if snapshot is not None:
+            return snapshot
+
+        with self._fetch_lock:
+            # 대기하는 동안 다른 스레드가 갱신했으면 그 결과를 사용
+            snapshot = self._fresh(max_age)
+            if snapshot is not None:
+                return snapshot
+            return self._refresh_locked()
+
+    def _fresh(self, max_age: float) -> Optional[AccountSnapshot]:
+        with self._lock:
+            snapshot = self._snapshot
+            if self._valid and snapshot is not None and time.time() - snapshot.fetched_at <= max_age:
+                return snapshot
+        return None
+
+    async def get_async(self, max_age: Optional[float] = None) -> AccountSnapshot:
+        """
+        get()의 asyncio 버전. 이벤트 루프를 막지 않고 조회합니다.
+        """
+        max_age = self.max_age if max_age is None else max_age
+
+        snapshot = self._fresh(max_age)
+        if snapshot is not None:
+            return snapshot
+
+        # 조회 중이면 같은 조회 결과를 기다림 (요청한 코루틴이 취소되어도 조회는 계속)
+        if self._async_fetch is None or self._async_fetch.done():
+            self._async_fetch = asyncio.ensure_future(self._refresh_coro())
+        return await asyncio.shield(self._async_fetch)
+
+    async def _refresh_coro(self) -> AccountSnapshot:
+        seq = self._seq
+        return self._store(await self._fetch_async(), seq)
+
+    def _refresh_locked(self) -> AccountSnapshot:
+        seq = self._seq
+        return self._store(self._fetch(), seq)
+
+    def _store(self, snapshot: AccountSnapshot, seq: int) -> AccountSnapshot:
+        with self._lock:
+            # 나중에 시작한 조회 결과가 이미 저장되어 있으면 그대로 사용
+            if self._base is not None and seq < self._base_seq:
+                return self._snapshot
+            self._base = snapshot
+            self._base_seq = seq
+            self._valid = True
+            # 조회 중에 들어온 보정(주문 / 체결)은 조회 결과에 없을 수 있으므로 다시 반영
+            return self._rebuild()
+
+    def _rebuild(self) -> Optional[AccountSnapshot]:
+        # 조회를 시작하기 전에 거래소에 반영된 보정은 버리고, 나머지를 조회한 스냅샷에 적용 (lock 안에서 호출)
+        self._adjustments = [a for a in self._adjustments
+                             if a.settled_seq is None or a.settled_seq > self._base_seq]
+        if self._base is None:
+            return None
+
+        balances = dict(self._base.balances)
+        for adjustment in self._adjustments:
+            current = balances.get(adjustment.currency)
+            if current is None:
+                current = Balance(currency=adjustment.currency, balance='0')
+
+            # 0 미만으로 내려가도 그대로 둠 (조회 결과가 차감 내역보다 적으면 이후 차감을 거부하도록)
+            new_balance = Decimal(current.balance) + adjustment.delta
+            balances[adjustment.currency] = Balance(currency=current.currency, balance=str(new_balance),
+                                                    locked=current.locked, avg_buy_price=current.avg_buy_price,
+                                                    unit_currency=current.unit_currency)
+
+        # 조회 시각은 유지하여 최대 경과 시간이 지나면 다시 조회되도록 함
+        self._snapshot = AccountSnapshot(balances, self._base.fetched_at)
+        return self._snapshot
+
+    def refresh(self) -> AccountSnapshot:
+        with self._fetch_lock:
+            return self._refresh_locked()
+
+    def refresh_async(self):
+        self._refresh_event.set()
+
+    def invalidate(self, refresh: bool = True):
+        with self._lock:
+            self._valid = False
+        if refresh:
+            self.refresh_async()
+
+    def _refresh_loop(self):
+        while True:
+            self._refresh_event.wait(timeout=self.refresh_interval)
+            self._refresh_event.clear()
+            try:
+                # 주기적인 갱신은 주문보다 낮은 우선순위로 요청
+                with background_priority():
+                    self.refresh()
+            except Exception:
+                pass  # 다음 주기에 재시도 (get()은 최대 경과 시간을 넘으면 직접 조회)
+
+    # ========== 로컬 보정 ==========
+
+    def _add(self, adjustment: '_Adjustment', settled: bool):
+        with self._lock:
+            if settled:
+                self._seq += 1
+                adjustment.settled_seq = self._seq
+            self._adjustments.append(adjustment)
+            self._rebuild()
+
+    def _settle(self, adjustment: '_Adjustment'):
+        # 거래소에 반영됨 -> 이후에 시작한 조회 결과에는 포함되므로 그 결과가 저장되면 버림
+        with self._lock:
+            self._seq += 1
+            adjustment.settled_seq = self._seq
+        self.refresh_async()
+
+    def _remove(self, adjustment: '_Adjustment'):
+        with self._lock:
+            if adjustment in self._adjustments:
+                self._adjustments.remove(adjustment)
+                self._rebuild()
+
+    def reserve(self, currency: str, amount) -> Optional['Reservation']:
+        """
+        주문하기 전에 주문 금액/수량만큼 로컬 잔고를 차감합니다.
+        잔고 확인과 차감을 lock 안에서 한 번에 처리하며, 잔고가 부족하면 차감하지 않습니다.
+
+        주문이 접수되면 settle(), 접수되지 않으면 release()를 호출합니다.
+        with 문으로 사용하면 settle()하지 않고 빠져나올 때 release()합니다.
+
+        Returns:
+            Optional[Reservation]: 차감 내역 (잔고가 부족하면 None)
+        """
+        amount = Decimal(str(amount))
+        if self._snapshot is None:
+            self.get()
+
+        with self._lock:
+            current = self._snapshot.get(currency)
+            available = Decimal(current.balance) if current is not None else Decimal('0')
+            if available < amount:
+                return None
+            reservation = Reservation(self, currency, -amount)
+            self._adjustments.append(reservation)
+            self._rebuild()
+        return reservation
+
+    def apply_fill(self, order):
+        """
+        체결된 주문을 로컬 잔고에 반영합니다. (매도 수량 차감 후 비동기 재조회)
+        """
+        base = order.market.split('-')[-1] if order.market else None
+        if order.side == 'ask' and base and order.executed_volume:
+            self._add(_Adjustment(base, -Decimal(order.executed_volume)), settled=True)
+        self.refresh_async()
+
+
+class _Adjustment:
+    # 로컬 보정 (settled_seq: 거래소에 반영된 시점의 보정 순번, None이면 아직 주문 전/접수 대기)
+    __slots__ = ('currency', 'delta', 'settled_seq')
+
+    def __init__(self, currency: str, delta: Decimal):
+        self.currency = currency
+        self.delta = delta
+        self.settled_seq: Optional[int] = None
+
+
+class Reservation(_Adjustment):
+    """
+    주문 전에 차감한 잔고. (AccountCache.reserve)
+    """
+    __slots__ = ('_cache', '_done')
+
+    def __init__(self, cache: AccountCache, currency: str, delta: Decimal):
+        super().__init__(currency, delta)
+        self._cache = cache
+        self._done = False
+
+    def settle(self):
+        # 주문 접수됨 -> 접수 후에 조회한 스냅샷이 저장될 때까지 차감 유지
+        if not self._done:
+            self._done = True
+            self._cache._settle(self)
+
+    def release(self):
+        # 주문이 접수되지 않음 -> 차감 취소
+        if not self._done:
+            self._done = True
+            self._cache._remove(self)
+
+    def __enter__(self) -> 'Reservation':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_account_cache() -> AccountCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AccountCache()
+                _cache.start()
+    return _cache
@@ -0,0 +1,62 @@
+import time
+from typing import Optional
+
+"""
+# 계좌 레코드
+
+- Balance: 화폐별 잔고
+- AccountSnapshot: 전체 계좌 조회 결과 (currency로 바로 조회할 수 있도록 dict로 보관)
+"""
+
+
+class Balance:
+    __slots__ = ('currency', 'balance', 'locked', 'avg_buy_price', 'unit_currency')
+
+    def __init__(self, currency: str, balance: str, locked: str = '0', avg_buy_price: float = 0.0,
+                 unit_currency: str = 'KRW'):
+        self.currency = currency
+        self.balance = balance  # 주문가능 수량 (업비트 응답 문자열 그대로)
+        self.locked = locked
+        self.avg_buy_price = avg_buy_price
+        self.unit_currency = unit_currency
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Balance':
+        return cls(
+            currency=data['currency'],
+            balance=data.get('balance', '0'),
+            locked=data.get('locked', '0'),
+            avg_buy_price=float(data.get('avg_buy_price') or 0.0),
+            unit_currency=data.get('unit_currency', 'KRW'),
+        )
+
+
+class AccountSnapshot:
+    __slots__ = ('balances', 'fetched_at')
+
+    def __init__(self, balances: dict, fetched_at: Optional[float] = None):
+        self.balances = balances  # currency -> Balance
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+
+    @classmethod
+    def from_list(cls, data: list) -> 'AccountSnapshot':
+        if not isinstance(data, list):
+            raise ValueError(f"예상치 못한 계좌 응답 형식: {data}")
+        return cls({item['currency']: Balance.from_dict(item) for item in data})
+
+    def get(self, currency: str) -> Optional[Balance]:
+        return self.balances.get(currency)
+
+    def __contains__(self, currency: str) -> bool:
+        return currency in self.balances
+
+    def to_dataframe(self):
+        # 분석용 (매매 경로에서는 사용하지 않음)
+        import pandas as pd
+        return pd.DataFrame([{
+            'currency': b.currency,
+            'balance': b.balance,
+            'locked': b.locked,
+            'avg_buy_price': b.avg_buy_price,
+            'unit_currency': b.unit_currency,
+        } for b in self.balances.values()])
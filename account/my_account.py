@@ -1,8 +1,6 @@
-import requests, jwt, uuid, os
-import pandas as pd
-from dotenv import load_dotenv
-
-load_dotenv()
+from account.models import AccountSnapshot
+from utils.upbit_client import get_upbit_client
+# asyncio 클라이언트(aiohttp)는 asyncio 서버에서만 사용하므로 *_async 함수 안에서 불러온다. (동기 서버 기동 시간)
 
 """
 # 전체 계좌 조회
@@ -18,18 +16,17 @@ URL: https://docs.upbit.com/reference/%EC%A0%84%EC%B2%B4-%EA%B3%84%EC%A2%8C-%EC%
 - avg_buy_price_modified: 매수평균가 수정 여부
 - unit_currency: 평단가 기준 화폐
 """
-my_account_url = 'https://api.upbit.com/v1/accounts'
-
-# Authorization
-# Key: access_key, secret_key
-access_key = os.getenv('ACCESS_KEY', '')
-secret_key = os.getenv('SECRET_KEY', '')
+my_account_path = '/v1/accounts'
 
 
 # 내 계좌를 확인합니다.
-def get_my_exchange_account():
-    authorization = 'Bearer {}'.format(jwt.encode({'access_key': access_key, 'nonce': str(uuid.uuid4())}, secret_key))
-    headers = {"Authorization": authorization}
-
-    my_exchange_account = pd.DataFrame(requests.get(my_account_url, headers=headers).json())
+def get_my_exchange_account() -> AccountSnapshot:
+    my_exchange_account = AccountSnapshot.from_list(get_upbit_client().get(my_account_path, auth=True))
     return my_exchange_account
+
+
+# 내 계좌를 확인합니다. (asyncio 서버용)
+async def get_my_exchange_account_async() -> AccountSnapshot:
+    from utils.async_upbit_client import get_async_upbit_client
+
+    return AccountSnapshot.from_list(await get_async_upbit_client().get(my_account_path, auth=True))
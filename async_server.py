@@ -0,0 +1,278 @@
+import asyncio, os
+from decimal import Decimal
+from typing import Awaitable, Callable, Optional
+
+try:
+    import aiohttp
+    from aiohttp import web
+except ImportError:
+    aiohttp = None
+    web = None
+
+# 알림 처리(중복 검사, 시그널 묶음), 저널, 체크포인트, EMA 레짐 등 상태와 매매 규칙은 동기 서버(webserver.py)와 공유
+from webserver import (logger, handle_payload, collect_stats, summarize_account, buy_order_amount,
+                       sell_order_volume, reserve_buy, on_buy_accepted, on_sell_filled, already_submitted, boot,
+                       trade_journal, state_backend, order_error_action, needs_order_lookup, settle_order_error,
+                       record_order_result, order_fee, DUPLICATE_WINDOW, TRADE_DEADLINE, ORDER_UNKNOWN,
+                       ORDER_RECONCILE_DELAY, ORDER_RECONCILE_TIMEOUT)
+from account.account_cache import get_account_cache
+from trading.trade import buy_market_async, sell_market_async, get_order_async
+from trading.models import Order
+from trading.order_tracker import get_order_tracker, OrderTrackTimeout
+from trading.trade_worker import AsyncTradeWorkerPool
+from trading.signal_coalescer import SignalCoalescer
+from trading.trade_journal import order_identifier, EVENT_SUBMIT, EVENT_FAILED
+from upbit_data.market_catalog import get_market_catalog
+from upbit_data.models import MarketInfo
+from upbit_data.price_feed import get_price_feed
+from utils.async_upbit_client import get_async_upbit_client
+from utils.convert_utils import convert_trade_ticker, market_label, signal_label
+from utils.log_utils import correlation
+from utils.metrics import get_metrics, span, inc
+from utils.notifier import notify
+from utils.upbit_client import UpbitAPIError
+from utils.resilience import deadline
+
+"""
+# asyncio 웹훅 서버
+
+webserver.py(Flask, 요청 / 매매 작업마다 스레드)와 같은 API를 하나의 asyncio 이벤트 루프에서 처리합니다.
+
+- /webhook, /metrics, /jobs, /jobs/<job_id>, /stats (응답 형식은 webserver.py와 동일)
+- 매매 작업은 스레드가 아닌 Task로 실행되므로, 업비트 응답을 기다리는 작업 수천 건을 하나의 코어에서 동시에 진행
+- 현재가 조회와 계좌 조회처럼 서로 독립적인 단계는 동시에 기다림 (asyncio.gather)
+- 업비트 호출은 하나의 aiohttp 커넥션 풀(keep-alive)을 공유 (utils/async_upbit_client.py)
+- 기동 시 복원 / 주문 확인 / EMA 계산은 webserver.py와 같이 백그라운드 스레드에서 진행
+
+aiohttp가 필요합니다. 실행: python async_server.py (동기 서버는 기존과 같이 python webserver.py)
+"""
+
+# 동시에 진행할 수 있는 최대 매매 작업 수
+ASYNC_TRADE_CONCURRENCY = int(os.getenv('ASYNC_TRADE_CONCURRENCY', '1000'))
+
+
+async def get_trade_price_async(trade_ticker: str):
+    # trade_price 추출 (현재가 피드, 오래된 가격이면 REST로 다시 조회)
+    with span('trade.price', ticker=market_label(trade_ticker)):
+        return await get_price_feed().get_price_async(trade_ticker)
+
+
+async def get_account_info_async(trade_ticker: str, info: MarketInfo):
+    # 계좌정보 확인 (캐시된 스냅샷, 최대 ACCOUNT_CACHE_MAX_AGE초 이내)
+    with span('trade.account', ticker=market_label(trade_ticker)):
+        my_account = await get_account_cache().get_async()
+    return summarize_account(my_account, info)
+
+
+async def place_order_async(place: Callable[[], Awaitable[Order]], trade_ticker: str, side: str,
+                            identifier: Optional[str], **detail) -> Optional[Order]:
+    """
+    webserver.place_order의 asyncio 버전. 주문 요청을 저널에 먼저 기록(커밋)한 뒤 주문합니다.
+
+    Returns:
+        Optional[Order]: 접수된 주문. 같은 identifier의 주문이 이미 접수되어 있으면(재전송된 시그널) None
+    """
+    if already_submitted(trade_ticker, identifier):
+        return None
+
+    await trade_journal.record_async(EVENT_SUBMIT, identifier, trade_ticker, side, **detail)
+    try:
+        order = await place()
+    except Exception as e:
+        action = order_error_action(e, trade_ticker, identifier, (aiohttp.ClientError, asyncio.TimeoutError))
+        existing = lookup_error = None
+        if needs_order_lookup(action, identifier):
+            try:
+                existing = await find_order_async(identifier, ORDER_RECONCILE_DELAY if action == ORDER_UNKNOWN else 0)
+            except Exception as lookup:
+                lookup_error = lookup
+        return settle_order_error(action, e, trade_ticker, side, identifier, existing, lookup_error)
+
+    return record_order_result(order, trade_ticker, side, identifier)
+
+
+async def find_order_async(identifier: str, delay: float = ORDER_RECONCILE_DELAY) -> Optional[Order]:
+    # webserver.find_order의 asyncio 버전
+    await asyncio.sleep(delay)
+    with deadline(ORDER_RECONCILE_TIMEOUT):
+        try:
+            return await get_order_async(identifier=identifier)
+        except UpbitAPIError as e:
+            if e.status_code == 404:
+                return None
+            raise
+
+
+async def process_trade_async(ticker: str, signal: str, value: str, identifier: Optional[str] = None):
+    # webserver.process_trade와 같은 매매 로직
+    logger.info("Process trading %s %s (%s)", signal, ticker, identifier)
+
+    # 매매 시 사용하는 티커로 변경 (e.g. DOGEKRW -> KRW-DOGE, BTCUSDT -> USDT-BTC)
+    trade_ticker = convert_trade_ticker(ticker)
+
+    # 마켓별 주문 규칙 (마켓 카탈로그에 미리 계산된 값, 네트워크 호출 없음)
+    market_info = get_market_catalog().get(trade_ticker)
+    label = market_label(trade_ticker)
+
+    # 현재가와 계좌 조회는 서로 독립적이므로 동시에 기다린다.
+    (ticker_trade_price, price_age), account_info = await asyncio.gather(
+        get_trade_price_async(trade_ticker), get_account_info_async(trade_ticker, market_info))
+
+    logger.info("[%s] ticker_trade_price : %s (age: %s)", trade_ticker, ticker_trade_price, price_age)
+
+    # 매수
+    if signal == 'buy':
+        buy_amount = buy_order_amount(account_info, market_info)
+        # 주문 금액은 실제로 차감(reserve)한 금액 -> 차감하지 못하면 주문하지 않음
+        reservation = reserve_buy(buy_amount, market_info) if buy_amount is not None else None
+        if reservation is not None:
+            with reservation:
+                with span('trade.order', ticker=label, signal=signal):
+                    buy_result = await place_order_async(
+                        lambda: buy_market_async(trade_ticker, str(buy_amount), identifier),
+                        trade_ticker, 'bid', identifier, price=str(buy_amount))
+                if buy_result is not None and buy_result.is_accepted:
+                    reservation.settle()
+            if buy_result is None:
+                return
+
+            if buy_result.is_accepted:
+                on_buy_accepted(trade_ticker, identifier, buy_result, buy_amount, market_info)
+            else:
+                notify('매수 중 에러 발생', '매수 중 에러가 발생하였습니다. 확인해주세요.')
+                raise RuntimeError("매수가 정상적으로 처리되지 않았습니다.")
+
+    # 매도
+    elif signal == 'sell':
+        sell_amount: Decimal = sell_order_volume(ticker, account_info, ticker_trade_price, price_age, market_info)
+
+        with span('trade.order', ticker=label, signal=signal):
+            sell_result = await place_order_async(
+                lambda: sell_market_async(trade_ticker, str(sell_amount), identifier),
+                trade_ticker, 'ask', identifier, volume=str(sell_amount))
+        if sell_result is None:
+            return
+
+        if sell_result.is_accepted:
+            # 체결(done) 혹은 취소(cancel)될 때까지 대기 (최대 ORDER_TRACK_TIMEOUT초, 이벤트 루프는 막지 않음)
+            try:
+                with span('trade.fill_wait', ticker=label, signal=signal):
+                    filled_order = await asyncio.wrap_future(get_order_tracker().track(sell_result.uuid))
+            except OrderTrackTimeout as e:
+                notify('매도 체결 확인 지연', f'[{trade_ticker}] {sell_amount} 매도 주문의 체결을 확인하지 못했습니다.')
+                raise RuntimeError(str(e))
+
+            on_sell_filled(trade_ticker, identifier, filled_order, sell_amount)
+        else:
+            notify('매도 중 에러 발생', '매도 중 에러가 발생하였습니다. 확인해주세요.')
+            raise RuntimeError("매도가 정상적으로 처리되지 않았습니다.")
+
+
+async def run_trade_job_async(ticker: str, signal: str, value: str, identifier: Optional[str] = None):
+    try:
+        # 처리 시간 예산은 워커가 작업을 시작할 때부터 계산 (큐 / 시그널 묶음 대기 시간은 제외)
+        with deadline(TRADE_DEADLINE), span('trade', ticker=market_label(ticker), signal=signal_label(signal)):
+            await process_trade_async(ticker, signal, value, identifier)
+    except Exception as e:
+        logger.error("[%s] Trade job error: %s", ticker, e)
+        inc('tradehook_errors_total', 'Errors by stage.', stage='trade')
+        # 주문 전에 실패한 경우 (주문 후의 실패는 주문 상태로 기록됨)
+        if identifier and trade_journal.get(identifier) is None:
+            trade_journal.record(EVENT_FAILED, identifier, ticker, signal, error=str(e))
+        raise
+
+
+def submit_trade(ticker: str, signal: str, value: str, job_id: Optional[str] = None):
+    # 시간 창 id(시그널로 정해지는 값)를 작업 id와 주문 identifier로 사용
+    return trade_workers.submit(ticker, signal, value, job_id, job_id=job_id)
+
+
+# 매매 작업 (이벤트 루프의 Task, 같은 티커는 순서대로)
+trade_workers = AsyncTradeWorkerPool(run_trade_job_async, max_concurrency=ASYNC_TRADE_CONCURRENCY)
+
+# 티커별 시그널 묶음 처리 (webserver.py와 같은 시간 창 / identifier 규칙)
+signal_coalescer = SignalCoalescer(
+    submit_trade, order_fee=order_fee,
+    make_id=lambda ticker, signal, value: order_identifier(ticker, value, DUPLICATE_WINDOW))
+
+
+# ========== Routes ==========
+
+async def webhook(request: 'web.Request') -> 'web.Response':
+    # 웹훅과 매매 작업의 로그는 같은 correlation id를 가진다. (요청마다 별도의 Task / 컨텍스트)
+    with span('webhook') as webhook_span, correlation(request.headers.get('X-Request-Id')):
+        try:
+            with span('webhook.parse'):
+                data = await request.json()
+
+            # sqlite / redis 저장소의 중복 검사, 레짐 기록은 I/O를 기다리므로 스레드에서 처리 (컨텍스트는 복사됨)
+            if state_backend.blocking:
+                body, status_code = await asyncio.to_thread(handle_payload, data, webhook_span, signal_coalescer)
+            else:
+                body, status_code = handle_payload(data, webhook_span, signal_coalescer)
+            return web.json_response(body, status=status_code)
+
+        except Exception as e:
+            logger.error("Error: %s", e)
+            inc('tradehook_errors_total', 'Errors by stage.', stage='webhook')
+            webhook_span.tag(status='error')
+            return web.json_response({"error": str(e)}, status=500)
+
+
+async def metrics(request: 'web.Request') -> 'web.Response':
+    return web.Response(body=get_metrics().render().encode('utf-8'),
+                        headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+
+async def list_jobs(request: 'web.Request') -> 'web.Response':
+    status = request.query.get('status')
+    return web.json_response({"stats": trade_workers.stats(), "jobs": trade_workers.list_jobs(status)})
+
+
+async def stats(request: 'web.Request') -> 'web.Response':
+    if state_backend.blocking:
+        return web.json_response(await asyncio.to_thread(collect_stats, trade_workers, signal_coalescer))
+    return web.json_response(collect_stats(trade_workers, signal_coalescer))
+
+
+async def get_job(request: 'web.Request') -> 'web.Response':
+    job_id = request.match_info['job_id']
+    job = trade_workers.get_job(job_id) or signal_coalescer.get(job_id)
+    if job is None:
+        return web.json_response({"error": "job not found"}, status=404)
+    return web.json_response(job)
+
+
+async def on_startup(app: 'web.Application'):
+    # 매매 작업은 서버와 같은 이벤트 루프에서 실행
+    trade_workers.start(asyncio.get_running_loop())
+
+
+async def on_cleanup(app: 'web.Application'):
+    trade_workers.shutdown()
+    await get_async_upbit_client().close()
+
+
+def create_app() -> 'web.Application':
+    if web is None:
+        raise RuntimeError('asyncio 서버를 실행하려면 aiohttp를 설치해야 합니다. (pip install aiohttp)')
+
+    app = web.Application()
+    app.add_routes([
+        web.post('/webhook', webhook),
+        web.get('/metrics', metrics),
+        web.get('/jobs', list_jobs),
+        web.get('/jobs/{job_id}', get_job),
+        web.get('/stats', stats),
+    ])
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+if __name__ == '__main__':
+    logger.info("TradeHook async Web Server starts..")
+
+    boot()
+
+    web.run_app(create_app(), host='0.0.0.0', port=5555, access_log=None)
@@ -0,0 +1,278 @@
+import itertools, math, os, time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, field
+from typing import Optional
+
+import numpy as np
+
+from indicator.vectorized import ema, stoch_rsi, cross_over, cross_under
+from upbit_data.candle_store import CandleStore, CANDLE_STORE_DIR
+from utils.convert_utils import min_quantity
+
+"""
+# 백테스트 엔진 (Backtest)
+
+캔들 저장소의 분봉으로 웹훅 매매 규칙을 재현합니다.
+
+- 시그널: long / short (TradingView Trend Follow 8/34 EMA + Stoch RSI 전략을 근사) 혹은 직접 전달한 시그널 배열
+- EMA 레짐 필터: 50EMA > 200EMA 일 때만 매수 (매도는 항상 허용)
+- 중복 검사 시간 창(dedup_window) 안에서 반복된 같은 시그널은 무시
+- 매수: process_trade와 같이 투자 가능 금액(잔고의 99.9%)이 50,000원 이상이면 50,000원 시장가 매수 (수수료 0.05%)
+- 매도: min_quantity로 계산한 수량(50,000원어치, 8자리 올림, 보유 수량 이내) 시장가 매도
+
+지표 계산은 전체 배열에 대해 NumPy로 한 번에 처리하고, 파이썬 반복은 시그널이 발생한 캔들에서만 수행합니다.
+파라미터 조합(grid)은 마켓/분봉 단위로 묶어서 프로세스 풀에서 병렬로 평가합니다.
+"""
+
+BUY_KRW_AMOUNT = 50000
+KRW_INVEST_RATE = 0.999
+FEE_RATE = 0.0005
+SELL_DECIMAL_PLACES = 8
+INITIAL_KRW = 1_000_000
+
+
+@dataclass(frozen=True)
+class StrategyParams:
+    regime_fast: int = 50
+    regime_slow: int = 200
+    signal_fast: int = 8
+    signal_slow: int = 34
+    rsi_period: int = 14
+    stoch_period: int = 14
+    dedup_window: int = 30  # 초
+    regime_filter: bool = True
+
+
+@dataclass
+class BacktestResult:
+    market: str
+    unit: int
+    params: StrategyParams
+    bars: int = 0
+    buys: int = 0
+    sells: int = 0
+    blocked_buys: int = 0  # 레짐 필터로 막힌 매수 시그널
+    skipped: int = 0  # 잔고 / 보유 수량 부족으로 실행하지 않은 시그널
+    deduped: int = 0
+    final_krw: float = 0.0
+    final_quantity: float = 0.0
+    final_equity: float = 0.0
+    return_pct: float = 0.0
+    max_drawdown_pct: float = 0.0
+    elapsed: float = 0.0
+    equity: Optional[np.ndarray] = field(default=None, repr=False)
+
+    def to_dict(self) -> dict:
+        data = {key: getattr(self, key) for key in self.__dataclass_fields__ if key not in ('params', 'equity')}
+        data.update(asdict(self.params))
+        return data
+
+
+class IndicatorCache:
+    """
+    같은 종가 배열에 대한 지표 계산 결과를 재사용합니다. (파라미터 조합끼리 같은 EMA 기간을 공유)
+    """
+
+    def __init__(self, closes: np.ndarray):
+        self.closes = np.ascontiguousarray(closes, dtype=np.float64)
+        self._cache = {}
+
+    def ema(self, span: int) -> np.ndarray:
+        key = ('ema', span)
+        if key not in self._cache:
+            self._cache[key] = ema(self.closes, span)
+        return self._cache[key]
+
+    def stoch_rsi(self, rsi_period: int, stoch_period: int) -> tuple:
+        key = ('stoch_rsi', rsi_period, stoch_period)
+        if key not in self._cache:
+            self._cache[key] = stoch_rsi(self.closes, rsi_period, stoch_period)
+        return self._cache[key]
+
+
+def strategy_signals(indicators: IndicatorCache, params: StrategyParams) -> tuple:
+    """
+    long / short 시그널 배열을 계산합니다.
+
+    - long : 8EMA > 34EMA (상승 추세) 이고 Stoch RSI %K가 %D를 상향 돌파
+    - short: 8EMA가 34EMA를 하향 돌파하거나, 과매수(%K > 80) 구간에서 %K가 %D를 하향 돌파
+    """
+    fast = indicators.ema(params.signal_fast)
+    slow = indicators.ema(params.signal_slow)
+    percent_k, percent_d = indicators.stoch_rsi(params.rsi_period, params.stoch_period)
+
+    long = (fast > slow) & cross_over(percent_k, percent_d)
+    short = cross_under(fast, slow) | (cross_under(percent_k, percent_d) & (percent_k > 80))
+    return long, short
+
+
+def regime_up(indicators: IndicatorCache, params: StrategyParams) -> np.ndarray:
+    # EmaRegimeEngine과 같이 느린 EMA 기간 이상의 캔들이 쌓여야 유효 (그 전에는 매수하지 않음)
+    up = indicators.ema(params.regime_fast) > indicators.ema(params.regime_slow)
+    up[:params.regime_slow - 1] = False
+    return up
+
+
+def dedup_events(ts: np.ndarray, events: np.ndarray, window: float) -> tuple:
+    """
+    같은 시그널이 window(초) 안에 다시 발생하면 무시합니다.
+
+    Returns:
+        tuple: (남은 이벤트 위치, 무시된 수)
+    """
+    if window <= 0 or len(events) < 2:
+        return events, 0
+
+    # 앞 이벤트와의 간격이 window 이상이면 통과 (window가 캔들 간격보다 짧으면 모두 통과)
+    if np.all(np.diff(ts[events]) >= window):
+        return events, 0
+
+    kept = []
+    last_ts = None
+    for index in events:
+        if last_ts is not None and ts[index] - last_ts < window:
+            continue
+        kept.append(index)
+        last_ts = ts[index]
+    return np.asarray(kept, dtype=np.int64), len(events) - len(kept)
+
+
+def simulate(market: str, unit: int, ts: np.ndarray, closes: np.ndarray, params: StrategyParams,
+             indicators: Optional[IndicatorCache] = None, signals: Optional[tuple] = None,
+             initial_krw: float = INITIAL_KRW) -> BacktestResult:
+    """
+    하나의 파라미터 조합으로 매매를 재현합니다.
+
+    Args:
+        signals (Optional[tuple]): (long, short) bool 배열. 없으면 strategy_signals()로 계산
+    """
+    start = time.perf_counter()
+    indicators = indicators or IndicatorCache(closes)
+    closes = indicators.closes
+    long, short = signals if signals is not None else strategy_signals(indicators, params)
+    up = regime_up(indicators, params) if params.regime_filter else None
+
+    result = BacktestResult(market=market, unit=unit, params=params, bars=len(closes))
+
+    long_events, long_deduped = dedup_events(ts, np.flatnonzero(long), params.dedup_window)
+    short_events, short_deduped = dedup_events(ts, np.flatnonzero(short & ~long), params.dedup_window)
+    result.deduped = long_deduped + short_deduped
+
+    events = np.concatenate([long_events, short_events])
+    is_long = np.concatenate([np.ones(len(long_events), dtype=bool), np.zeros(len(short_events), dtype=bool)])
+    order = np.argsort(events, kind='stable')
+    events, is_long = events[order], is_long[order]
+
+    krw = float(initial_krw)
+    quantity = 0.0
+    executed = []  # (캔들 위치, 실행 후 원화, 실행 후 수량)
+
+    for index, buy in zip(events.tolist(), is_long.tolist()):
+        price = float(closes[index])
+        if buy:
+            if up is not None and not up[index]:
+                result.blocked_buys += 1
+                continue
+            if math.floor(krw * KRW_INVEST_RATE) < BUY_KRW_AMOUNT:
+                result.skipped += 1
+                continue
+            krw -= BUY_KRW_AMOUNT * (1 + FEE_RATE)
+            quantity += BUY_KRW_AMOUNT / price
+            result.buys += 1
+        else:
+            if quantity <= 0:
+                result.skipped += 1
+                continue
+            sell_quantity = min(float(min_quantity(price, SELL_DECIMAL_PLACES)), quantity)
+            krw += sell_quantity * price * (1 - FEE_RATE)
+            quantity -= sell_quantity
+            result.sells += 1
+        executed.append((index, krw, quantity))
+
+    # 체결 시점 사이의 잔고를 앞으로 채워서 캔들별 평가 금액 계산
+    if executed:
+        positions, krw_after, quantity_after = (np.asarray(column) for column in zip(*executed))
+        segment = np.searchsorted(positions, np.arange(len(closes)), side='right') - 1
+        krw_series = np.where(segment >= 0, krw_after[np.maximum(segment, 0)], initial_krw)
+        quantity_series = np.where(segment >= 0, quantity_after[np.maximum(segment, 0)], 0.0)
+        equity = krw_series + quantity_series * closes
+    else:
+        equity = np.full(len(closes), float(initial_krw))
+
+    peak = np.maximum.accumulate(equity) if len(equity) else equity
+    result.final_krw = krw
+    result.final_quantity = quantity
+    result.final_equity = float(equity[-1]) if len(equity) else float(initial_krw)
+    result.return_pct = (result.final_equity / initial_krw - 1) * 100
+    result.max_drawdown_pct = float(np.max(1 - equity / peak) * 100) if len(equity) else 0.0
+    result.equity = equity
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def param_grid(choices: dict) -> list:
+    """
+    StrategyParams 필드별 후보 값의 모든 조합. 함께 바뀌어야 하는 필드는 튜플 키로 묶습니다.
+
+    e.g. param_grid({('regime_fast', 'regime_slow'): [(50, 200), (20, 100)], 'dedup_window': [30, 600]})
+    """
+    keys = list(choices)
+    grid = []
+    for values in itertools.product(*(choices[key] for key in keys)):
+        fields = {}
+        for key, value in zip(keys, values):
+            if isinstance(key, tuple):
+                fields.update(zip(key, value))
+            else:
+                fields[key] = value
+
+        params = StrategyParams(**fields)
+        if params.regime_fast < params.regime_slow and params.signal_fast < params.signal_slow:
+            grid.append(params)
+    return grid
+
+
+def run_market(root: str, market: str, unit: int, grid: list, start: Optional[int] = None,
+               end: Optional[int] = None, keep_equity: bool = False) -> list:
+    """
+    한 마켓/분봉 단위의 캔들을 한 번만 읽고 모든 파라미터 조합을 평가합니다. (프로세스 풀 작업 단위)
+    """
+    rows = CandleStore(root).read(market, unit, start, end)
+    if len(rows) == 0:
+        return []
+
+    ts = np.array(rows['ts'])
+    indicators = IndicatorCache(rows['close'])
+
+    results = []
+    for params in grid:
+        result = simulate(market, unit, ts, indicators.closes, params, indicators=indicators)
+        if not keep_equity:
+            result.equity = None
+        results.append(result)
+    return results
+
+
+def run_grid(markets: list, units: list, grid: list, root: str = CANDLE_STORE_DIR, workers: Optional[int] = None,
+             start: Optional[int] = None, end: Optional[int] = None) -> list:
+    """
+    마켓 x 분봉 단위 x 파라미터 조합을 프로세스 풀에서 평가합니다.
+
+    Returns:
+        list: BacktestResult 목록 (수익률 내림차순)
+    """
+    tasks = [(market, unit) for market in markets for unit in units]
+    workers = min(workers or os.cpu_count() or 1, len(tasks)) or 1
+
+    results = []
+    if workers == 1:
+        for market, unit in tasks:
+            results.extend(run_market(root, market, unit, grid, start, end))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_market, root, market, unit, grid, start, end) for market, unit in tasks]
+            for future in futures:
+                results.extend(future.result())
+
+    results.sort(key=lambda result: result.return_pct, reverse=True)
+    return results
@@ -0,0 +1,84 @@
+import argparse, csv, os, sys, time
+
+"""
+# 백테스트 실행
+
+캔들 저장소의 분봉으로 파라미터 조합을 평가하고 수익률 상위 결과를 출력합니다.
+
+실행 예시
+    python backtest/run_backtest.py --markets KRW-DOGE,KRW-BTC --units 10,60 --sync 100000
+    python backtest/run_backtest.py --markets KRW-DOGE --units 10 --regime 50/200,20/100 --dedup 30,3600 --csv result.csv
+"""
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtest.engine import param_grid, run_grid
+from upbit_data.candle_store import CANDLE_STORE_DIR, CandleStore
+
+
+def parse_pairs(value: str) -> list:
+    # "50/200,20/100" -> [(50, 200), (20, 100)]
+    return [tuple(int(v) for v in item.split('/')) for item in value.split(',') if item]
+
+
+def parse_ints(value: str) -> list:
+    return [int(v) for v in value.split(',') if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TradeHook EMA-filtered strategy backtest')
+    parser.add_argument('--markets', required=True, help='마켓 목록 (e.g. KRW-DOGE,KRW-BTC)')
+    parser.add_argument('--units', default='10', help='분봉 단위 목록 (e.g. 10,60)')
+    parser.add_argument('--regime', default='50/200', help='레짐 EMA 기간 목록 (fast/slow, e.g. 50/200,20/100)')
+    parser.add_argument('--signal', default='8/34', help='시그널 EMA 기간 목록 (fast/slow)')
+    parser.add_argument('--dedup', default='30', help='중복 검사 시간 창(초) 목록')
+    parser.add_argument('--no-filter', action='store_true', help='레짐 필터 없이도 함께 평가')
+    parser.add_argument('--root', default=CANDLE_STORE_DIR, help='캔들 저장소 디렉토리')
+    parser.add_argument('--sync', type=int, default=0, help='평가 전에 업비트에서 캔들을 적재할 개수 (0이면 적재하지 않음)')
+    parser.add_argument('--workers', type=int, default=None, help='프로세스 수 (기본: CPU 수)')
+    parser.add_argument('--top', type=int, default=20, help='출력할 상위 결과 수')
+    parser.add_argument('--csv', help='전체 결과를 CSV 파일로 저장')
+    args = parser.parse_args()
+
+    markets = [market for market in args.markets.split(',') if market]
+    units = parse_ints(args.units)
+
+    if args.sync:
+        store = CandleStore(args.root)
+        for market in markets:
+            for unit in units:
+                added = store.sync(market, unit, count=args.sync)
+                print(f'[{market}] {unit}분봉 {added}개 적재')
+
+    grid = param_grid({
+        ('regime_fast', 'regime_slow'): parse_pairs(args.regime),
+        ('signal_fast', 'signal_slow'): parse_pairs(args.signal),
+        'dedup_window': parse_ints(args.dedup),
+        'regime_filter': [True, False] if args.no_filter else [True],
+    })
+
+    start = time.perf_counter()
+    results = run_grid(markets, units, grid, root=args.root, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    bars = sum(result.bars for result in results)
+    print(f'{len(results)}개 조합, 캔들 {bars:,}개 평가 ({elapsed:.2f}초)')
+    print(f"{'market':<12}{'unit':>5}{'regime':>9}{'signal':>8}{'dedup':>7}{'filter':>7}"
+          f"{'buys':>6}{'sells':>6}{'blocked':>8}{'return%':>9}{'mdd%':>8}")
+    for result in results[:args.top]:
+        params = result.params
+        print(f'{result.market:<12}{result.unit:>5}{f"{params.regime_fast}/{params.regime_slow}":>9}'
+              f'{f"{params.signal_fast}/{params.signal_slow}":>8}{params.dedup_window:>7}'
+              f'{str(params.regime_filter):>7}{result.buys:>6}{result.sells:>6}{result.blocked_buys:>8}'
+              f'{result.return_pct:>9.2f}{result.max_drawdown_pct:>8.2f}')
+
+    if args.csv and results:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            rows = [result.to_dict() for result in results]
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+import os, sys, time, tracemalloc
+
+"""
+# 매매 경로 레코드 벤치마크
+
+시그널 1건을 처리할 때 주문/계좌 응답을 다루는 비용(CPU 시간, 메모리 할당)을 비교합니다.
+
+- before: 응답을 pandas DataFrame으로 감싸서 처리 (기존 방식)
+- after : __slots__ 레코드(Order, AccountSnapshot)로 처리
+
+네트워크 호출은 제외하고, 응답(JSON)을 파싱한 이후의 처리만 측정합니다.
+
+실행: python bench/bench_records.py
+"""
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from account.models import AccountSnapshot
+from trading.models import Order
+
+ORDER_RESPONSE = {
+    'uuid': 'cdd92199-2897-4e14-9448-f923320408ad', 'side': 'bid', 'ord_type': 'price', 'price': '50000',
+    'state': 'wait', 'market': 'KRW-DOGE', 'created_at': '2025-07-01T10:00:00+09:00', 'volume': None,
+    'remaining_volume': None, 'reserved_fee': '25', 'remaining_fee': '25', 'paid_fee': '0', 'locked': '50025',
+    'executed_volume': '0', 'trades_count': 0,
+}
+
+ACCOUNT_RESPONSE = [
+    {'currency': 'KRW', 'balance': '1234567.8', 'locked': '0', 'avg_buy_price': '0',
+     'avg_buy_price_modified': True, 'unit_currency': 'KRW'},
+    {'currency': 'DOGE', 'balance': '1523.12345678', 'locked': '0', 'avg_buy_price': '321.5',
+     'avg_buy_price_modified': False, 'unit_currency': 'KRW'},
+    {'currency': 'BTC', 'balance': '0.0012', 'locked': '0', 'avg_buy_price': '150000000',
+     'avg_buy_price_modified': False, 'unit_currency': 'KRW'},
+]
+
+
+def signal_before(ticker: str):
+    my_account = pd.DataFrame(ACCOUNT_RESPONSE)
+
+    ticker_balance = '0'
+    if ticker in my_account['currency'].values:
+        ticker_balance = my_account[my_account['currency'] == ticker]['balance'].values[0]
+        float(my_account[my_account['currency'] == ticker]['avg_buy_price'].values[0])
+
+    krw_amount = 0.0
+    if 'KRW' in my_account['currency'].values:
+        my_account['balance'] = my_account['balance'].astype(float)
+        krw_amount = my_account[my_account['currency'] == 'KRW']['balance'].values[0]
+
+    buy_result = pd.DataFrame.from_dict(ORDER_RESPONSE, orient='index').T
+    return ticker_balance, krw_amount, bool(buy_result['uuid'].notnull()[0])
+
+
+def signal_after(ticker: str):
+    my_account = AccountSnapshot.from_list(ACCOUNT_RESPONSE)
+
+    ticker_balance = '0'
+    ticker_account = my_account.get(ticker)
+    if ticker_account is not None:
+        ticker_balance = ticker_account.balance
+
+    krw_amount = 0.0
+    krw_account = my_account.get('KRW')
+    if krw_account is not None:
+        krw_amount = float(krw_account.balance)
+
+    buy_result = Order.from_dict(ORDER_RESPONSE)
+    return ticker_balance, krw_amount, buy_result.is_accepted
+
+
+def measure(func, iterations: int):
+    func('DOGE')  # warm-up
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func('DOGE')
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func('DOGE')
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed / iterations * 1e6, peak
+
+
+if __name__ == '__main__':
+    iterations = int(os.getenv('BENCH_ITERATIONS', '2000'))
+
+    before_us, before_peak = measure(signal_before, iterations)
+    after_us, after_peak = measure(signal_after, iterations)
+
+    print(f"{'':8} {'us/signal':>12} {'peak alloc(B)':>14}")
+    print(f"{'before':8} {before_us:12.1f} {before_peak:14,}")
+    print(f"{'after':8} {after_us:12.1f} {after_peak:14,}")
+    print(f"speedup: {before_us / after_us:.0f}x, alloc: {before_peak / after_peak:.0f}x smaller")
@@ -0,0 +1,286 @@
+import calendar, json, random, threading, time, uuid
+from collections import defaultdict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional
+from urllib.parse import urlparse, parse_qs
+
+"""
+# 가짜 업비트 서버 (Fake Upbit)
+
+벤치마크/로컬 테스트용으로 프로세스 안에서 띄우는 업비트 REST API 서버입니다.
+UPBIT_API_URL을 이 서버 주소로 지정하면 실제 거래소 없이 웹훅 전체 흐름을 실행할 수 있습니다.
+
+- POST /v1/orders               : 주문 (fill_delay 후 done)
+- GET  /v1/order                : 개별 주문 조회
+- GET  /v1/orders/open          : 체결 대기 주문 조회
+- GET  /v1/accounts             : 계좌 조회
+- GET  /v1/ticker               : 현재가 조회
+- GET  /v1/candles/minutes/{unit}: 분봉 조회
+- GET  /v1/market/all           : 마켓 목록
+- GET  /v1/orders/chance        : 주문 가능 정보
+
+응답 지연(latency, jitter), 에러 비율(error_rate), 체결 지연(fill_delay)을 설정할 수 있고,
+접수된 주문 수를 마켓/방향별로 집계합니다.
+"""
+
+
+class FakeUpbitState:
+    def __init__(self, markets: list = (), latency: float = 0.02, jitter: float = 0.01, error_rate: float = 0.0,
+                 fill_delay: float = 0.2, krw_balance: float = 100_000_000, coin_balance: float = 1_000_000,
+                 seed: int = 42):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fill_delay = fill_delay
+
+        self.coin_balance = coin_balance
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.prices = {}
+        self.balances = {'KRW': krw_balance}
+        self.add_markets(markets)
+
+        self.orders = {}  # uuid -> order dict
+        self.identifiers = {}  # identifier -> uuid
+        self.order_counts = defaultdict(int)  # (market, side) -> 주문 수
+        self.requests = defaultdict(int)  # path -> 요청 수
+
+    def add_markets(self, markets):
+        # 마켓마다 서로 다른 가격과 초기 보유 수량을 준다.
+        with self._lock:
+            for market in markets:
+                if market not in self.prices:
+                    self.prices[market] = 100.0 + len(self.prices) * 10
+                    self.balances.setdefault(market.split('-')[1], self.coin_balance)
+
+    def delay(self):
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter)))
+
+    def should_fail(self) -> bool:
+        return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    # ========== 주문 ==========
+
+    def create_order(self, params: dict) -> tuple:
+        market = params.get('market')
+        side = params.get('side')
+        if market not in self.prices or side not in ('bid', 'ask'):
+            return 400, {'error': {'name': 'invalid_parameter', 'message': '잘못된 파라미터입니다.'}}
+
+        with self._lock:
+            identifier = params.get('identifier')
+            if identifier and identifier in self.identifiers:
+                return 400, {'error': {'name': 'duplicate_identifier', 'message': 'identifier 중복'}}
+
+            order_uuid = str(uuid.uuid4())
+            price = self.prices[market]
+            if side == 'bid':
+                funds = float(params.get('price', 0))
+                volume = funds / price
+            else:
+                volume = float(params.get('volume', 0))
+                funds = volume * price
+
+            order = {
+                'uuid': order_uuid, 'side': side, 'ord_type': params.get('ord_type'), 'price': params.get('price'),
+                'state': 'wait', 'market': market, 'created_at': time.strftime('%Y-%m-%dT%H:%M:%S+09:00'),
+                'volume': params.get('volume'), 'remaining_volume': str(volume), 'executed_volume': '0',
+                'paid_fee': '0', 'trades_count': 0, 'identifier': identifier,
+                '_done_at': time.monotonic() + self.fill_delay, '_funds': funds, '_filled_volume': volume,
+            }
+            self.orders[order_uuid] = order
+            if identifier:
+                self.identifiers[identifier] = order_uuid
+            self.order_counts[(market, side)] += 1
+
+            # 접수 시 잔고 차감 (업비트의 locked 처리 대신 단순화)
+            base = market.split('-')[1]
+            if side == 'bid':
+                self.balances['KRW'] -= funds * 1.0005
+            else:
+                self.balances[base] -= volume
+
+        return 201, self._public(order)
+
+    def _settle(self, order: dict):
+        if order['state'] == 'wait' and time.monotonic() >= order['_done_at']:
+            base = order['market'].split('-')[1]
+            if order['side'] == 'bid':
+                self.balances[base] += order['_filled_volume']
+            else:
+                self.balances['KRW'] += order['_funds'] * 0.9995
+            order['state'] = 'done'
+            order['executed_volume'] = str(order['_filled_volume'])
+            order['remaining_volume'] = '0'
+            order['trades_count'] = 1
+
+    @staticmethod
+    def _public(order: dict) -> dict:
+        return {key: value for key, value in order.items() if not key.startswith('_')}
+
+    def get_order(self, params: dict) -> tuple:
+        with self._lock:
+            order_uuid = params.get('uuid') or self.identifiers.get(params.get('identifier'))
+            order = self.orders.get(order_uuid)
+            if order is None:
+                return 404, {'error': {'name': 'order_not_found', 'message': '주문을 찾지 못했습니다.'}}
+            self._settle(order)
+            return 200, self._public(order)
+
+    def open_orders(self, params: dict) -> tuple:
+        with self._lock:
+            result = []
+            for order in self.orders.values():
+                self._settle(order)
+                if order['state'] == 'wait' and order['market'] == params.get('market', order['market']):
+                    result.append(self._public(order))
+            return 200, result
+
+    # ========== 계좌 / 시세 ==========
+
+    def accounts(self) -> tuple:
+        with self._lock:
+            for order in self.orders.values():
+                self._settle(order)
+            return 200, [{'currency': currency, 'balance': f'{balance:.8f}', 'locked': '0',
+                          'avg_buy_price': '0', 'avg_buy_price_modified': False, 'unit_currency': 'KRW'}
+                         for currency, balance in self.balances.items()]
+
+    def ticker(self, params: dict) -> tuple:
+        markets = params.get('markets', '').split(',')
+        # 업비트와 같이 없는 마켓이 하나라도 있으면 전체 요청을 거부
+        if any(market not in self.prices for market in markets):
+            return 404, {'error': {'name': 'Code not found', 'message': 'Code not found'}}
+        return 200, [{'market': market, 'trade_price': self.prices[market]} for market in markets]
+
+    def market_all(self) -> tuple:
+        with self._lock:
+            markets = sorted(self.prices)
+        return 200, [{'market': market, 'korean_name': market, 'english_name': market} for market in markets]
+
+    def chance(self, params: dict) -> tuple:
+        market = params.get('market')
+        if market not in self.prices:
+            return 404, {'error': {'name': 'market_does_not_exist', 'message': '마켓을 찾을 수 없습니다.'}}
+        quote, _, base = market.partition('-')
+        return 200, {
+            'bid_fee': '0.0005', 'ask_fee': '0.0005',
+            'market': {'id': market, 'name': market, 'bid': {'currency': quote, 'min_total': '5000'},
+                       'ask': {'currency': base, 'min_total': '5000'}, 'max_total': '1000000000', 'state': 'active'},
+        }
+
+    def candles(self, unit: int, params: dict) -> tuple:
+        market = params.get('market')
+        count = int(params.get('count', 200))
+        unit_sec = unit * 60
+        if 'to' in params:
+            to = calendar.timegm(time.strptime(params['to'][:19].replace(' ', 'T'), '%Y-%m-%dT%H:%M:%S'))
+        else:
+            to = (int(time.time()) // unit_sec + 1) * unit_sec
+
+        result = []
+        base_price = self.prices.get(market, 100.0)
+        for i in range(1, count + 1):
+            ts = to - i * unit_sec
+            # 시각에 따라 결정되는 가격 (같은 캔들은 항상 같은 값)
+            close = base_price * (1 + 0.05 * ((ts // unit_sec) % 200 - 100) / 100)
+            result.append({
+                'market': market,
+                'candle_date_time_utc': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(ts)),
+                'candle_date_time_kst': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(ts + 9 * 3600)),
+                'opening_price': close, 'high_price': close, 'low_price': close, 'trade_price': close,
+                'timestamp': ts * 1000, 'candle_acc_trade_price': close * 10, 'candle_acc_trade_volume': 10,
+                'unit': unit,
+            })
+        return 200, result
+
+    def duplicate_orders(self, expected: dict) -> int:
+        """
+        (market, side)별 예상 주문 수를 넘는 주문 수의 합계.
+        """
+        with self._lock:
+            return sum(max(0, count - expected.get(key, 0)) for key, count in self.order_counts.items())
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state: FakeUpbitState = None
+
+    def _reply(self, status: int, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Remaining-Req', 'group=default; min=1800; sec=29')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method: str):
+        state = self.state
+        parsed = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        path = parsed.path
+        # keep-alive 연결이므로 에러 응답을 보내더라도 요청 본문은 먼저 읽어야 한다.
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+        state.requests[path] += 1
+        state.delay()
+
+        if state.should_fail():
+            return self._reply(500, {'error': {'name': 'server_error', 'message': 'fake error'}})
+
+        if method == 'POST' and path == '/v1/orders':
+            return self._reply(*state.create_order(body))
+        if path == '/v1/order':
+            return self._reply(*state.get_order(params))
+        if path == '/v1/orders/open':
+            return self._reply(*state.open_orders(params))
+        if path == '/v1/accounts':
+            return self._reply(*state.accounts())
+        if path == '/v1/ticker':
+            return self._reply(*state.ticker(params))
+        if path == '/v1/market/all':
+            return self._reply(*state.market_all())
+        if path == '/v1/orders/chance':
+            return self._reply(*state.chance(params))
+        if path.startswith('/v1/candles/minutes/'):
+            return self._reply(*state.candles(int(path.rsplit('/', 1)[1]), params))
+        return self._reply(404, {'error': {'name': 'not_found', 'message': path}})
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeUpbitServer:
+    """
+    가짜 업비트 서버. start() 후 url을 UPBIT_API_URL로 사용합니다.
+    """
+
+    def __init__(self, state: FakeUpbitState, host: str = '127.0.0.1', port: int = 0):
+        handler = type('FakeUpbitHandler', (_Handler,), {'state': state})
+        self.state = state
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'FakeUpbitServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-upbit', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,186 @@
+import json, random, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import requests
+
+"""
+# TradingView 알림 재생기 (Alert Replay)
+
+기록된 알림(JSON lines) 혹은 합성(synthetic) 알림을 /webhook으로 보냅니다.
+TradingView는 응답이 늦으면 같은 알림을 여러 번 재전송하므로, 알림마다 재전송 묶음(burst)을 함께 보냅니다.
+
+기록 파일 형식 (한 줄에 알림 하나, at은 첫 알림 기준 경과 시간(초))
+    {"at": 0.0, "ticker": "DOGEKRW", "value": "buy"}
+"""
+
+
+class Alert:
+    __slots__ = ('at', 'ticker', 'value', 'event_id')
+
+    def __init__(self, at: float, ticker: str, value: str, event_id: int):
+        self.at = at
+        self.ticker = ticker
+        self.value = value
+        self.event_id = event_id  # 같은 알림의 재전송은 같은 event_id
+
+
+def synthetic_tickers(count: int) -> list:
+    """
+    합성 TradingView 티커 목록 (e.g. ['C000KRW', 'C001KRW', ...])
+    """
+    return [f'C{i:03d}KRW' for i in range(count)]
+
+
+def synthetic_alerts(tickers: list, events: int, rate: float = 20.0, retries: tuple = (3, 4),
+                     retry_gap: float = 0.05, seed: int = 7) -> list:
+    """
+    합성 알림 목록을 만듭니다.
+
+    (티커, buy/sell) 조합을 섞어서 차례로 사용하므로, 조합 수(티커 수 x 2)보다 이벤트가 많으면
+    같은 조합이 다시 나오고 중복 검사 시간 창 안이면 웹서버에서 중복으로 처리됩니다.
+
+    Args:
+        tickers (list): TradingView 티커 목록 (e.g. ['DOGEKRW'])
+        events (int): 서로 다른 알림 수
+        rate (float): 초당 알림 수
+        retries (tuple): 알림마다 보내는 횟수 범위 (재전송 포함)
+        retry_gap (float): 재전송 간격(초)
+
+    Returns:
+        list: at 순으로 정렬된 Alert 목록
+    """
+    rnd = random.Random(seed)
+    pairs = [(ticker, value) for ticker in tickers for value in ('buy', 'sell')]
+    rnd.shuffle(pairs)
+
+    alerts = []
+    for event_id in range(events):
+        at = event_id / rate
+        ticker, value = pairs[event_id % len(pairs)]
+        for attempt in range(rnd.randint(*retries)):
+            alerts.append(Alert(at + attempt * retry_gap, ticker, value, event_id))
+
+    alerts.sort(key=lambda alert: alert.at)
+    return alerts
+
+
+def load_alerts(path: str, retries: tuple = (1, 1), retry_gap: float = 0.05, seed: int = 7) -> list:
+    """
+    기록된 알림 파일을 읽습니다. retries로 재전송 묶음을 덧붙일 수 있습니다.
+    """
+    rnd = random.Random(seed)
+    alerts = []
+    with open(path, encoding='utf-8') as f:
+        for event_id, line in enumerate(line for line in f if line.strip()):
+            item = json.loads(line)
+            for attempt in range(rnd.randint(*retries)):
+                alerts.append(Alert(float(item.get('at', 0)) + attempt * retry_gap, item['ticker'], item['value'],
+                                    event_id))
+
+    alerts.sort(key=lambda alert: alert.at)
+    return alerts
+
+
+def expected_orders(alerts: list, convert, window: float, speed: float = 1.0, coalesce_window: float = 0.0) -> dict:
+    """
+    (market, side)별 예상 주문 수.
+
+    이벤트마다 한 번만 주문하고, 같은 (티커, value) 이벤트가 중복 검사 시간 창(window) 안에서
+    다시 오면 주문하지 않는다고 가정합니다.
+    coalesce_window가 있으면 웹서버와 같이 티커별로 첫 시그널부터 coalesce_window초 동안 들어온 시그널을
+    상계(매수 +1 / 매도 -1 합계의 부호)하여 시간 창마다 최대 1건으로 계산합니다.
+    (시간 창 경계에 가까운 시그널은 요청이 도착한 시각에 따라 실제와 다르게 묶일 수 있습니다.)
+    (0이면 상계하지 않은 시그널별 주문 수이며, 접수된 주문이 이 값을 넘으면 중복 주문입니다.)
+    """
+    first_at = {}  # event_id -> 첫 알림 시각
+    for alert in alerts:
+        first_at.setdefault(alert.event_id, (alert.at / speed, alert.ticker, alert.value))
+
+    last_ordered = {}  # (ticker, value) -> 마지막으로 주문된 시각
+    signals = []  # (at, ticker, +1 / -1)
+    for at, ticker, value in sorted(first_at.values()):
+        key = (ticker, value)
+        if key in last_ordered and at - last_ordered[key] < window:
+            continue
+        last_ordered[key] = at
+
+        direction = {'buy': 1, 'sell': -1}.get(value.lower())
+        if direction:
+            signals.append((at, ticker, direction))
+
+    expected = {}
+    windows = {}  # ticker -> [시간 창 마감 시각, 합계]
+
+    def close(ticker: str):
+        net = windows.pop(ticker)[1]
+        if net:
+            market_side = (convert(ticker), 'bid' if net > 0 else 'ask')
+            expected[market_side] = expected.get(market_side, 0) + 1
+
+    for at, ticker, direction in signals:
+        if ticker in windows and at >= windows[ticker][0]:
+            close(ticker)
+        if ticker not in windows:
+            windows[ticker] = [at + coalesce_window, 0]
+        windows[ticker][1] += direction
+        if coalesce_window <= 0:
+            close(ticker)
+    for ticker in list(windows):
+        close(ticker)
+    return expected
+
+
+class ReplayResult:
+    def __init__(self):
+        self.latencies = []  # 웹훅 응답 시간(초)
+        self.statuses = {}  # 응답 상태 -> 건수
+        self.errors = 0
+        self.started_at = 0.0
+        self.finished_at = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, status: str):
+        with self._lock:
+            self.latencies.append(latency)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    @property
+    def elapsed(self) -> float:
+        return self.finished_at - self.started_at
+
+
+def replay(url: str, alerts: list, concurrency: int = 16, speed: float = 1.0,
+           session: Optional[requests.Session] = None) -> ReplayResult:
+    """
+    알림을 at 시각에 맞춰 /webhook으로 보냅니다.
+
+    Args:
+        url (str): 웹훅 URL (e.g. http://127.0.0.1:5555/webhook)
+        concurrency (int): 동시에 보내는 최대 요청 수
+        speed (float): 재생 속도 배율 (2.0이면 2배 빠르게)
+    """
+    session = session or requests.Session()
+    session.mount('http://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=concurrency))
+    result = ReplayResult()
+
+    def send(alert: Alert):
+        start = time.perf_counter()
+        try:
+            response = session.post(url, json={'ticker': alert.ticker, 'value': alert.value}, timeout=10)
+            status = response.json().get('status', str(response.status_code))
+        except (requests.RequestException, ValueError):
+            status = 'request_error'
+            with result._lock:
+                result.errors += 1
+        result.record(time.perf_counter() - start, status)
+
+    result.started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='replay') as executor:
+        for alert in alerts:
+            delay = alert.at / speed - (time.perf_counter() - result.started_at)
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(send, alert)
+    result.finished_at = time.perf_counter()
+    return result
@@ -0,0 +1,243 @@
+import argparse, asyncio, json, logging, os, sys, tempfile, threading, time
+
+"""
+# 웹훅 종단간(end-to-end) 벤치마크
+
+가짜 업비트 서버(fake_upbit)를 띄우고, 웹서버(webserver.app 혹은 --server async 이면 async_server)를 같은 프로세스에서 실행한 뒤
+TradingView 알림(재전송 묶음 포함)을 재생하여 다음을 측정합니다.
+
+- 웹훅 응답 시간 p50 / p99, 처리량(초당 알림 수)
+- 매매 작업 처리 시간(접수 -> 완료) p50 / p99
+- 중복 주문 수 (이벤트당 한 번을 넘어서 접수된 주문)
+- 시그널 묶음 처리(상계)로 줄어든 주문 수 / 수수료
+- (--spans) /metrics 지표의 구간별 평균 처리 시간
+
+실행 예시
+    python bench/run_bench.py --events 200 --tickers 100 --rate 50
+    python bench/run_bench.py --alerts alerts.jsonl --retries 3,4 --error-rate 0.05
+    python bench/run_bench.py --coalesce 0  # 시그널 묶음 처리 없이 비교
+    python bench/run_bench.py --server async --events 2000 --tickers 1000 --rate 500  # asyncio 서버
+"""
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.append(ROOT_DIR)
+sys.path.append(BENCH_DIR)
+
+from fake_upbit import FakeUpbitServer, FakeUpbitState
+from replay import synthetic_tickers, synthetic_alerts, load_alerts, expected_orders, replay
+
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def latency_summary(values: list) -> dict:
+    # 초 -> 밀리초
+    return {'count': len(values), 'p50_ms': round(percentile(values, 50) * 1000, 2),
+            'p99_ms': round(percentile(values, 99) * 1000, 2),
+            'max_ms': round(max(values) * 1000, 2) if values else 0.0}
+
+
+def configure_env(api_url: str, workdir: str, workers: int, coalesce: float):
+    # webserver / utils 모듈은 import 시점에 환경변수를 읽으므로 import 전에 설정한다.
+    os.environ['UPBIT_API_URL'] = api_url
+    os.environ['UPBIT_WS_ENABLED'] = '0'
+    os.environ['STATE_BACKEND_URL'] = 'memory://'
+    os.environ['TRADE_WORKERS'] = str(workers)
+    os.environ['SIGNAL_COALESCE_WINDOW'] = str(coalesce)
+    os.environ['CANDLE_STORE_DIR'] = os.path.join(workdir, 'candles')
+    os.environ['NOTIFY_SPOOL_DIR'] = os.path.join(workdir, 'notify_spool')
+    # 알림 메일은 로컬의 닫힌 포트로 보내서 바로 실패(스풀 기록)하도록 한다.
+    os.environ.setdefault('SMTP_SERVER', '127.0.0.1')
+    os.environ.setdefault('SMTP_PORT', '9')
+    os.environ.setdefault('SMTP_USE_SSL', '0')
+
+
+def wait_for_jobs(trade_workers, signal_coalescer, timeout: float) -> bool:
+    # 시그널을 모으는 중인 시간 창이 모두 주문으로 등록되고, 등록된 작업이 모두 끝날 때까지 대기
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        stats = trade_workers.stats()
+        if signal_coalescer.stats()['pending'] == 0 and stats['queued'] == 0 and stats['running'] == 0:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def start_sync_server(server_module):
+    from werkzeug.serving import make_server
+
+    # 요청마다 찍히는 접근 로그는 측정에 방해되므로 끈다.
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, server_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='bench-webserver', daemon=True).start()
+    return server.server_port, server.shutdown
+
+
+def start_async_server(server_module):
+    from aiohttp import web
+
+    # 이벤트 루프 하나를 별도 스레드에서 실행 (서버와 매매 작업이 같은 루프를 사용)
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(server_module.create_app(), access_log=None)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    loop.run_until_complete(site.start())
+    port = runner.addresses[0][1]
+    thread = threading.Thread(target=loop.run_forever, name='bench-async-server', daemon=True)
+    thread.start()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result(timeout=10)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+
+    return port, stop
+
+
+def run(args) -> dict:
+    if args.alerts:
+        alerts = load_alerts(args.alerts, retries=args.retries)
+    else:
+        alerts = synthetic_alerts(synthetic_tickers(args.tickers), args.events, rate=args.rate,
+                                  retries=args.retries)
+
+    state = FakeUpbitState(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                           fill_delay=args.fill_delay)
+    fake = FakeUpbitServer(state).start()
+
+    workdir = tempfile.mkdtemp(prefix='tradehook-bench-')
+    configure_env(fake.url, workdir, args.workers, args.coalesce)
+    # logs/, data/ 등 상대 경로 파일은 임시 디렉토리에 만든다.
+    os.chdir(workdir)
+
+    import webserver
+    from utils.convert_utils import convert_trade_ticker
+    from utils.metrics import get_metrics
+
+    markets = sorted({convert_trade_ticker(alert.ticker) for alert in alerts})
+    state.add_markets(markets)
+
+    # 매매 작업 풀 / 시그널 묶음 처리기는 서버 모듈마다 따로 있다.
+    if args.server == 'async':
+        import async_server as server
+        port, stop_server = start_async_server(server)
+    else:
+        server = webserver
+        port, stop_server = start_sync_server(server)
+    url = f'http://127.0.0.1:{port}/webhook'
+
+    result = replay(url, alerts, concurrency=args.concurrency, speed=args.speed)
+    drained = wait_for_jobs(server.trade_workers, server.signal_coalescer, args.timeout)
+    finished_at = time.perf_counter()
+    metrics_text = get_metrics().render()
+    stop_server()
+    fake.stop()
+
+    jobs = server.trade_workers.list_jobs()
+    job_latencies = [job['finished_at'] - job['created_at'] for job in jobs if job['finished_at']]
+    # 중복 주문은 상계하지 않은 시그널별 주문 수를 넘는 주문으로 판단 (시간 창 경계는 요청 도착 시각에 따라 달라질 수 있음)
+    signal_orders = expected_orders(alerts, convert_trade_ticker, webserver.DUPLICATE_WINDOW, args.speed)
+    expected = expected_orders(alerts, convert_trade_ticker, webserver.DUPLICATE_WINDOW, args.speed,
+                               server.signal_coalescer.window)
+    coalesce = server.signal_coalescer.stats()
+
+    return {
+        'alerts': len(alerts),
+        'events': len({alert.event_id for alert in alerts}),
+        'markets': len(markets),
+        'elapsed_s': round(result.elapsed, 3),
+        'throughput_rps': round(len(alerts) / result.elapsed, 1) if result.elapsed else 0.0,
+        'webhook': latency_summary(result.latencies),
+        'webhook_status': result.statuses,
+        'server': args.server,
+        'jobs': {**latency_summary(job_latencies), **server.trade_workers.stats(), 'drained': drained,
+                 'total_s': round(finished_at - result.started_at, 3)},
+        'orders': sum(state.order_counts.values()),
+        'expected_orders': sum(expected.values()),
+        'signal_orders': sum(signal_orders.values()),
+        'duplicate_orders': state.duplicate_orders(signal_orders),
+        'coalesce': coalesce,
+        'upbit_requests': dict(state.requests),
+        'metrics': metrics_text,
+        'workdir': workdir,
+    }
+
+
+def print_report(report: dict):
+    print('========== TradeHook benchmark ==========')
+    print(f"server: {report['server']}, alerts: {report['alerts']} (events: {report['events']}, "
+          f"markets: {report['markets']})")
+    print(f"elapsed: {report['elapsed_s']}s, throughput: {report['throughput_rps']} alerts/s")
+    webhook = report['webhook']
+    print(f"webhook latency: p50 {webhook['p50_ms']}ms, p99 {webhook['p99_ms']}ms, max {webhook['max_ms']}ms")
+    print(f"webhook status: {report['webhook_status']}")
+    jobs = report['jobs']
+    print(f"trade job latency: p50 {jobs['p50_ms']}ms, p99 {jobs['p99_ms']}ms, max {jobs['max_ms']}ms "
+          f"(done: {jobs['done']}, failed: {jobs['failed']}, drained: {jobs['drained']})")
+    coalesce = report['coalesce']
+    print(f"orders: {report['orders']} (expected: {report['expected_orders']} after netting, "
+          f"{report['signal_orders']} without netting, duplicate: {report['duplicate_orders']})")
+    print(f"coalesce: window {coalesce['window']}s, signals {coalesce['signals']}, orders {coalesce['orders']}, "
+          f"netted windows {coalesce['windows'] - coalesce['orders'] - coalesce['pending']}, "
+          f"saved {coalesce['orders_saved']} orders / fees {coalesce['fees_saved']}")
+    print(f"upbit requests: {report['upbit_requests']}")
+
+
+def print_spans(metrics_text: str):
+    # /metrics 의 span 히스토그램에서 구간별 평균 처리 시간만 추려서 출력
+    sums, counts = {}, {}
+    for line in metrics_text.splitlines():
+        if line.startswith('tradehook_span_seconds_sum') or line.startswith('tradehook_span_seconds_count'):
+            name_labels, value = line.rsplit(' ', 1)
+            labels = dict(item.split('=', 1) for item in name_labels.split('{', 1)[1].rstrip('}').split(','))
+            key = (labels['span'].strip('"'), labels.get('status', '').strip('"'))
+            target = sums if '_sum' in name_labels else counts
+            target[key] = target.get(key, 0) + float(value)
+
+    print('---------- spans (avg) ----------')
+    for key in sorted(counts):
+        print(f"{key[0]:<20} {key[1]:<12} count {int(counts[key]):>6}  avg {sums[key] / counts[key] * 1000:.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TradeHook webhook end-to-end benchmark')
+    parser.add_argument('--alerts', help='기록된 알림 파일 (JSON lines). 없으면 합성 알림 사용')
+    parser.add_argument('--events', type=int, default=200, help='합성 알림 이벤트 수')
+    parser.add_argument('--tickers', type=int, default=100, help='합성 알림 티커 수')
+    parser.add_argument('--rate', type=float, default=50.0, help='초당 이벤트 수')
+    parser.add_argument('--retries', type=lambda s: tuple(int(v) for v in s.split(',')), default=(3, 4),
+                        help='이벤트당 전송 횟수 범위 (e.g. 3,4)')
+    parser.add_argument('--speed', type=float, default=1.0, help='재생 속도 배율')
+    parser.add_argument('--concurrency', type=int, default=16, help='동시 웹훅 요청 수')
+    parser.add_argument('--coalesce', type=float, default=1.0, help='시그널 묶음 처리 시간 창(초, SIGNAL_COALESCE_WINDOW)')
+    parser.add_argument('--workers', type=int, default=4, help='매매 작업 워커 수 (TRADE_WORKERS)')
+    parser.add_argument('--server', choices=('sync', 'async'), default='sync',
+                        help='웹서버 (sync: webserver.py, async: async_server.py)')
+    parser.add_argument('--latency', type=float, default=0.02, help='가짜 업비트 응답 지연(초)')
+    parser.add_argument('--jitter', type=float, default=0.01, help='가짜 업비트 응답 지연 편차(초)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='가짜 업비트 5xx 응답 비율')
+    parser.add_argument('--fill-delay', type=float, default=0.2, help='주문 체결까지 걸리는 시간(초)')
+    parser.add_argument('--timeout', type=float, default=60.0, help='매매 작업 완료 대기 시간(초)')
+    parser.add_argument('--spans', action='store_true', help='구간(span)별 평균 처리 시간 출력')
+    parser.add_argument('--json', help='결과를 JSON 파일로 저장')
+    args = parser.parse_args()
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    report = run(args)
+    print_report(report)
+    if args.spans:
+        print_spans(report['metrics'])
+
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
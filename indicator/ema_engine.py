@@ -0,0 +1,175 @@
+import threading
+from typing import Iterable, Optional
+
+"""
+# EMA 레짐(Regime) 엔진
+
+50EMA / 200EMA를 캔들이 마감될 때마다 O(1)로 갱신합니다.
+최초 1회만 과거 종가로 시드(seed)하고, 이후에는 pandas나 네트워크 호출 없이 현재 레짐을 계산합니다.
+
+- EMA 계산식은 pandas의 ewm(span=N, adjust=False)과 동일
+  EMA_0 = close_0
+  EMA_t = alpha * close_t + (1 - alpha) * EMA_{t-1}  (alpha = 2 / (N + 1))
+- 티커별로 고정 크기의 상태(EmaState)만 유지하므로 티커 수가 늘어도 티커당 메모리는 일정
+- 상태를 체크포인트로 저장(export) / 복원(restore)하여 재시작 후 마지막 캔들 이후만 반영
+"""
+
+EMA_CROSS_UP = 'EMA_cross_up'
+EMA_CROSS_DOWN = 'EMA_cross_down'
+
+
+class EmaState:
+    __slots__ = ('ema_fast', 'ema_slow', 'count', 'last_ts')
+
+    def __init__(self):
+        self.ema_fast = 0.0
+        self.ema_slow = 0.0
+        self.count = 0  # 반영된 (마감)캔들 수
+        self.last_ts = None  # 마지막으로 반영된 캔들 시각
+
+    @property
+    def spread(self) -> float:
+        return self.ema_fast - self.ema_slow
+
+    def to_dict(self) -> dict:
+        return {
+            'ema_fast': self.ema_fast,
+            'ema_slow': self.ema_slow,
+            'spread': self.spread,
+            'count': self.count,
+            'last_ts': self.last_ts,
+        }
+
+
+class EmaRegimeEngine:
+    """
+    티커별 EMA 레짐 엔진.
+
+    Args:
+        fast_span (int): 빠른 EMA 기간 (기본 50)
+        slow_span (int): 느린 EMA 기간 (기본 200)
+    """
+
+    def __init__(self, fast_span: int = 50, slow_span: int = 200):
+        self.fast_span = fast_span
+        self.slow_span = slow_span
+        self._alpha_fast = 2 / (fast_span + 1)
+        self._alpha_slow = 2 / (slow_span + 1)
+
+        self._states = {}  # ticker -> EmaState
+        self._lock = threading.Lock()
+
+    def _apply(self, state: EmaState, close: float):
+        if state.count == 0:
+            state.ema_fast = close
+            state.ema_slow = close
+        else:
+            state.ema_fast += self._alpha_fast * (close - state.ema_fast)
+            state.ema_slow += self._alpha_slow * (close - state.ema_slow)
+        state.count += 1
+
+    def seed(self, ticker: str, closes: Iterable[float], last_ts=None) -> EmaState:
+        """
+        과거 (마감)캔들 종가로 상태를 초기화합니다. 오래된 캔들부터 순서대로 전달해야 합니다.
+        """
+        state = EmaState()
+        for close in closes:
+            self._apply(state, float(close))
+        state.last_ts = last_ts
+
+        with self._lock:
+            self._states[ticker] = state
+        return state
+
+    def update(self, ticker: str, close: float, ts=None) -> EmaState:
+        """
+        마감된 캔들 1개를 반영합니다. 이미 반영된 시각(ts 이하)의 캔들은 무시합니다.
+        """
+        with self._lock:
+            state = self._states.get(ticker)
+            if state is None:
+                state = self._states[ticker] = EmaState()
+
+            if ts is not None and state.last_ts is not None and ts <= state.last_ts:
+                return state
+
+            self._apply(state, float(close))
+            if ts is not None:
+                state.last_ts = ts
+            return state
+
+    def get_state(self, ticker: str) -> Optional[EmaState]:
+        return self._states.get(ticker)
+
+    def is_ready(self, ticker: str) -> bool:
+        # 느린 EMA 기간 이상의 캔들이 반영되어야 유효한 값으로 본다.
+        state = self._states.get(ticker)
+        return state is not None and state.count >= self.slow_span
+
+    def regime(self, ticker: str, price: Optional[float] = None) -> Optional[str]:
+        """
+        현재 레짐을 계산합니다.
+
+        Args:
+            ticker (str): 티커
+            price (Optional[float]): 진행 중인 캔들의 현재가. 전달하면 이 가격으로 캔들이 마감된다고 가정하여 계산 (상태는 변경하지 않음)
+
+        Returns:
+            Optional[str]: EMA_cross_up / EMA_cross_down 또는 None (데이터 부족)
+        """
+        if not self.is_ready(ticker):
+            return None
+
+        state = self._states[ticker]
+        ema_fast, ema_slow = state.ema_fast, state.ema_slow
+        if price is not None:
+            ema_fast += self._alpha_fast * (price - ema_fast)
+            ema_slow += self._alpha_slow * (price - ema_slow)
+
+        return EMA_CROSS_UP if ema_fast > ema_slow else EMA_CROSS_DOWN
+
+    def cross_check(self, ticker: str, alert_value: str) -> Optional[bool]:
+        """
+        TradingView에서 받은 EMA_cross 값과 로컬 레짐이 같은지 확인합니다.
+
+        Returns:
+            Optional[bool]: 일치 여부 또는 None (로컬 데이터 부족)
+        """
+        local_regime = self.regime(ticker)
+        if local_regime is None:
+            return None
+        return local_regime == alert_value
+
+    def tickers(self) -> list:
+        return list(self._states)
+
+    def export(self) -> dict:
+        # 체크포인트 저장용 상태 (EMA 기간이 다르면 복원하지 않음)
+        with self._lock:
+            states = {ticker: [state.ema_fast, state.ema_slow, state.count, state.last_ts]
+                      for ticker, state in self._states.items()}
+        return {'fast_span': self.fast_span, 'slow_span': self.slow_span, 'states': states}
+
+    def restore(self, data: dict) -> int:
+        """
+        export()로 저장한 상태를 복원합니다. 이미 계산된 티커는 덮어쓰지 않습니다.
+
+        Returns:
+            int: 복원한 티커 수
+        """
+        if data.get('fast_span') != self.fast_span or data.get('slow_span') != self.slow_span:
+            return 0
+
+        restored = 0
+        with self._lock:
+            for ticker, (ema_fast, ema_slow, count, last_ts) in data.get('states', {}).items():
+                if ticker in self._states:
+                    continue
+                state = self._states[ticker] = EmaState()
+                state.ema_fast, state.ema_slow, state.count, state.last_ts = ema_fast, ema_slow, count, last_ts
+                restored += 1
+        return restored
+
+    def discard(self, ticker: str):
+        with self._lock:
+            self._states.pop(ticker, None)
@@ -0,0 +1,116 @@
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+"""
+# 벡터화 지표 (Vectorized Indicators)
+
+과거 데이터 전체에 대한 지표를 NumPy 배열 연산으로 계산합니다. (백테스트용)
+
+- ema(): pandas ewm(span, adjust=False) / EmaRegimeEngine과 같은 값 (첫 값으로 시작)
+  재귀식을 블록 단위의 닫힌 식(cumsum)으로 계산하여 파이썬 반복문 없이 처리
+- rsi(): Wilder RSI
+- stoch_rsi(): Stochastic RSI (%K, %D)
+"""
+
+# 블록 안에서 (1 - alpha)^-n 이 이 값을 넘지 않도록 블록 크기를 정한다. (float64 정밀도 유지)
+_MAX_BLOCK_SCALE = 1e12
+
+
+def ema(values: np.ndarray, span: int = None, alpha: float = None) -> np.ndarray:
+    """
+    지수 이동 평균. y[0] = x[0], y[i] = y[i-1] + alpha * (x[i] - y[i-1])
+
+    Args:
+        values (np.ndarray): 오래된 순서의 값
+        span (int): 기간 (alpha = 2 / (span + 1))
+        alpha (float): 평활 계수 (span 대신 지정)
+    """
+    x = np.asarray(values, dtype=np.float64)
+    out = np.empty_like(x)
+    if len(x) == 0:
+        return out
+
+    alpha = 2 / (span + 1) if alpha is None else alpha
+    decay = 1.0 - alpha
+    if decay <= 0:
+        out[:] = x
+        return out
+
+    block = max(1, min(len(x), int(math.log(_MAX_BLOCK_SCALE) / -math.log(decay))))
+    powers = decay ** np.arange(1, block + 1)  # decay^1 .. decay^block
+    scaled_weights = alpha / decay ** np.arange(block)  # alpha * decay^-j
+
+    out[0] = prev = x[0]
+    start = 1
+    while start < len(x):
+        chunk = x[start:start + block]
+        n = len(chunk)
+        # y[i] = decay^(i+1) * prev + sum_{j<=i} alpha * decay^(i-j) * x[j]
+        out[start:start + n] = powers[:n] * (prev + np.cumsum(chunk * scaled_weights[:n]) / decay)
+        prev = out[start + n - 1]
+        start += n
+    return out
+
+
+def rsi(closes: np.ndarray, period: int = 14) -> np.ndarray:
+    """
+    Wilder RSI (0 ~ 100). 첫 값은 50으로 둡니다.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    delta = np.diff(closes, prepend=closes[:1])
+    gain = ema(np.clip(delta, 0, None), alpha=1 / period)
+    loss = ema(np.clip(-delta, 0, None), alpha=1 / period)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = 100 - 100 / (1 + gain / loss)
+    result[loss == 0] = 100.0
+    result[(gain == 0) & (loss == 0)] = 50.0
+    return result
+
+
+def rolling_min_max(values: np.ndarray, window: int) -> tuple:
+    """
+    window 구간의 최소 / 최대값. 앞쪽 window-1 개는 가능한 구간으로 계산합니다.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    padded = np.concatenate([np.full(window - 1, values[0]), values])
+    windows = sliding_window_view(padded, window)
+    return windows.min(axis=1), windows.max(axis=1)
+
+
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    # 단순 이동 평균. 앞쪽 window-1 개는 가능한 구간의 평균
+    values = np.asarray(values, dtype=np.float64)
+    cumsum = np.concatenate([[0.0], np.cumsum(values)])
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(end - window, 0)
+    return (cumsum[end] - cumsum[start]) / (end - start)
+
+
+def stoch_rsi(closes: np.ndarray, rsi_period: int = 14, stoch_period: int = 14, k: int = 3, d: int = 3) -> tuple:
+    """
+    Stochastic RSI.
+
+    Returns:
+        tuple: (%K, %D) 0 ~ 100
+    """
+    rsi_values = rsi(closes, rsi_period)
+    low, high = rolling_min_max(rsi_values, stoch_period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stoch = np.where(high > low, (rsi_values - low) / (high - low) * 100, 50.0)
+    percent_k = sma(stoch, k)
+    return percent_k, sma(percent_k, d)
+
+
+def cross_over(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # a가 b를 상향 돌파한 위치 (첫 번째 값은 False)
+    above = a > b
+    result = np.zeros(len(a), dtype=bool)
+    result[1:] = above[1:] & ~above[:-1]
+    return result
+
+
+def cross_under(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return cross_over(b, a)
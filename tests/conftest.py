@@ -0,0 +1,94 @@
+import os, socket, sys, tempfile, time
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'bench'))
+
+from fake_upbit import FakeUpbitServer, FakeUpbitState
+
+"""
+# 테스트 공통 설정
+
+벤치마크와 같이 가짜 업비트 서버(bench/fake_upbit.py)에 연결하여 실제 거래소 없이 실행합니다.
+
+- 프로젝트 모듈은 import 시점에 환경변수를 읽으므로, 테스트 모듈을 불러오기 전에 가짜 업비트 서버를 띄우고 환경변수를 설정
+- 상대 경로 파일(logs/, data/)은 임시 디렉토리에 만듦
+- 메일 알림은 aiosmtpd로 띄운 로컬 SMTP 서버(smtp_server fixture)로 확인
+"""
+
+MARKETS = ['KRW-DOGE', 'KRW-BTC']
+
+fake_state = FakeUpbitState(markets=MARKETS, latency=0.0, jitter=0.0, fill_delay=0.3)
+fake_server = FakeUpbitServer(fake_state).start()
+
+WORK_DIR = tempfile.mkdtemp(prefix='tradehook-test-')
+os.environ['UPBIT_API_URL'] = fake_server.url
+os.environ['UPBIT_WS_ENABLED'] = '0'
+os.environ['STATE_BACKEND_URL'] = 'memory://'
+os.environ['CANDLE_STORE_DIR'] = os.path.join(WORK_DIR, 'candles')
+os.environ['NOTIFY_SPOOL_DIR'] = os.path.join(WORK_DIR, 'notify_spool')
+os.environ['TRADE_JOURNAL_PATH'] = os.path.join(WORK_DIR, 'trade_journal.db')
+# 모듈의 기본 알림 채널은 로컬의 닫힌 포트로 보내서 바로 실패(스풀 기록)하도록 한다.
+os.environ['SMTP_SERVER'] = '127.0.0.1'
+os.environ['SMTP_PORT'] = '9'
+os.environ['SMTP_USE_SSL'] = '0'
+os.chdir(WORK_DIR)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until(condition, timeout: float = 5.0, interval: float = 0.02) -> bool:
+    # condition()이 참이 될 때까지 대기 (백그라운드 스레드의 처리 결과 확인용)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(interval)
+    return condition()
+
+
+@pytest.fixture
+def fake_upbit() -> FakeUpbitState:
+    # 테스트마다 주문 / 요청 기록을 비운 가짜 업비트 상태
+    with fake_state._lock:
+        fake_state.orders.clear()
+        fake_state.identifiers.clear()
+        fake_state.order_counts.clear()
+    fake_state.requests.clear()
+    fake_state.error_rate = 0.0
+    return fake_state
+
+
+class _SmtpHandler:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return '250 OK'
+
+
+@pytest.fixture
+def smtp_server():
+    """
+    로컬 SMTP 서버 (aiosmtpd). handler.messages에 받은 메일(envelope)이 쌓입니다.
+
+    Returns:
+        tuple: (handler, port)
+    """
+    controller_module = pytest.importorskip('aiosmtpd.controller')
+    handler = _SmtpHandler()
+    port = free_port()
+    controller = controller_module.Controller(handler, hostname='127.0.0.1', port=port)
+    controller.start()
+    try:
+        yield handler, port
+    finally:
+        controller.stop()
@@ -0,0 +1,104 @@
+import threading
+
+from account.account_cache import AccountCache
+from account.models import AccountSnapshot
+
+
+class FakeAccount:
+    # 조회를 멈춰 둘 수 있는 계좌 조회 함수 (조회 중에 들어온 주문 / 체결 재현용)
+    def __init__(self, balances: dict):
+        self.balances = balances
+        self.release = threading.Event()
+        self.release.set()
+        self.started = threading.Event()
+
+    def __call__(self) -> AccountSnapshot:
+        self.started.set()
+        self.release.wait(5)
+        return AccountSnapshot.from_list([{'currency': currency, 'balance': balance, 'locked': '0',
+                                           'avg_buy_price': '0', 'unit_currency': 'KRW'}
+                                          for currency, balance in self.balances.items()])
+
+
+def balance(cache: AccountCache, currency: str) -> str:
+    return cache.get().get(currency).balance
+
+
+def test_reservation_is_kept_until_a_later_fetch():
+    account = FakeAccount({'KRW': '100000'})
+    cache = AccountCache(fetch=account, fetch_async=None)
+    assert balance(cache, 'KRW') == '100000'
+
+    with cache.reserve('KRW', 30000) as reservation:
+        assert balance(cache, 'KRW') == '70000'
+        reservation.settle()  # 주문 접수
+
+    # 접수 후 조회 결과에 주문이 반영되면 차감 내역은 버림
+    account.balances['KRW'] = '70000'
+    cache.refresh()
+    assert balance(cache, 'KRW') == '70000'
+
+
+def test_reservation_is_released_when_order_is_not_accepted():
+    cache = AccountCache(fetch=FakeAccount({'KRW': '100000'}), fetch_async=None)
+    cache.get()
+
+    try:
+        with cache.reserve('KRW', 30000):
+            assert balance(cache, 'KRW') == '70000'
+            raise RuntimeError('order rejected')
+    except RuntimeError:
+        pass
+    assert balance(cache, 'KRW') == '100000'
+
+
+def test_fetch_started_before_patch_keeps_the_patch():
+    account = FakeAccount({'KRW': '100000'})
+    cache = AccountCache(fetch=account, fetch_async=None)
+    cache.get()
+    old_fetched_at = cache.get().fetched_at
+
+    # 조회 중에 차감 -> 조회 결과(주문 전 잔고)에 다시 반영하고, 새 스냅샷을 사용
+    account.release.clear()
+    account.started.clear()
+    refresh = threading.Thread(target=cache.refresh)
+    refresh.start()
+    assert account.started.wait(5)
+    cache.reserve('KRW', 30000)
+    account.release.set()
+    refresh.join(5)
+
+    snapshot = cache.get()
+    assert snapshot.get('KRW').balance == '70000'
+    assert snapshot.fetched_at > old_fetched_at
+
+
+def test_reservation_is_refused_when_balance_is_short():
+    cache = AccountCache(fetch=FakeAccount({'KRW': '100000'}), fetch_async=None)
+    cache.get()
+
+    # 같은 스냅샷을 보고 동시에 매수해도 잔고를 넘겨 차감하지 않음
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.reserve('KRW', 30000))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    reserved = [reservation for reservation in results if reservation is not None]
+    assert len(reserved) == 3
+    assert balance(cache, 'KRW') == '10000'
+    assert cache.reserve('USDT', 1) is None
+
+
+def test_short_fetch_result_is_not_hidden():
+    account = FakeAccount({'KRW': '100000'})
+    cache = AccountCache(fetch=account, fetch_async=None)
+    cache.get()
+
+    # 차감 후 조회 결과(e.g. 다른 곳에서 출금)가 차감 금액보다 적으면 0으로 맞추지 않고 이후 차감을 거부
+    assert cache.reserve('KRW', 80000) is not None
+    account.balances['KRW'] = '50000'
+    cache.refresh()
+    assert balance(cache, 'KRW') == '-30000'
+    assert cache.reserve('KRW', 1) is None
@@ -0,0 +1,52 @@
+import threading, time
+
+import numpy as np
+
+from conftest import wait_until
+from upbit_data.candle_store import CANDLE_DTYPE
+from upbit_data.candle_stream import CandleStream
+
+MARKET = 'KRW-DOGE'
+
+
+class SlowCandles:
+    # 멈춰 둘 수 있는 1분봉 REST 조회 (종가 1.5로 고정)
+    def __init__(self):
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, market: str, since: int, until: int) -> np.ndarray:
+        self.release.wait(5)
+        return np.array([(ts, 1, 2, 0.5, 1.5, 10, 15) for ts in range(since, until, 60)], dtype=CANDLE_DTYPE)
+
+
+def test_backfill_does_not_block_trades_and_keeps_order():
+    base = (int(time.time()) // 3600 - 2) * 3600
+    fetch = SlowCandles()
+    stream = CandleStream([MARKET], use_websocket=False)
+    stream._fetch_minutes = fetch
+    published = []
+    stream.subscribe(lambda market, unit, bar: published.append((unit, int(bar['ts']), float(bar['close']))))
+
+    state = stream._markets[MARKET]
+    with stream._lock:
+        backfill = stream._begin_backfill(MARKET, state, base + 600)
+    stream._finish_backfill(MARKET, *backfill)
+    assert state.last_ts == base + 540
+
+    # 연결 시점에 진행 중이던 분봉(base + 600)은 마감 시 REST로 다시 조회 (조회는 멈춰 둠)
+    fetch.release.clear()
+    state.complete_from = base + 630
+    stream.on_trade(MARKET, 3.0, 1, (base + 605) * 1000)
+    start = time.perf_counter()
+    stream.on_trade(MARKET, 4.0, 1, (base + 665) * 1000)
+    stream.on_trade(MARKET, 5.0, 1, (base + 725) * 1000)
+    assert time.perf_counter() - start < 1
+    assert len(stream.candles(MARKET, 1)) == 10  # 조회 중에도 캔들 조회 가능
+
+    fetch.release.set()
+    assert wait_until(lambda: state.last_ts == base + 660)
+
+    minutes = [(ts, close) for unit, ts, close in published if unit == 1]
+    assert minutes[-2:] == [(base + 600, 1.5), (base + 660, 4.0)]  # 업비트 분봉 -> 체결로 만든 분봉 순서
+    assert [ts for ts, _ in minutes] == sorted({ts for ts, _ in minutes})
@@ -0,0 +1,59 @@
+from utils.dedup_cache import DedupCache
+from utils.state_backend import SqliteStateBackend
+
+
+def test_duplicate_within_window():
+    cache = DedupCache(window=30)
+
+    assert cache.check_and_set('DOGEKRW_buy_buy', now=100.0) is False
+    assert cache.check_and_set('DOGEKRW_buy_buy', now=110.0) is True
+    assert cache.check_and_set('DOGEKRW_sell_sell', now=110.0) is False
+    # 시간 창이 지나면 만료되어 다시 처리
+    assert cache.check_and_set('DOGEKRW_buy_buy', now=130.0) is False
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['expirations']) == (1, 3, 1)
+
+
+def test_oldest_key_is_evicted_over_max_size():
+    cache = DedupCache(window=30, max_size=2, shards=1)
+
+    for i, key in enumerate(['a', 'b', 'c']):
+        assert cache.check_and_set(key, now=float(i)) is False
+
+    assert len(cache) == 2
+    assert cache.stats()['evictions'] == 1
+    assert cache.check_and_set('a', now=3.0) is False  # 제거된 키는 다시 처리
+    assert cache.check_and_set('c', now=3.0) is True
+
+
+def test_export_and_restore():
+    cache = DedupCache(window=30)
+    cache.check_and_set('DOGEKRW_buy_buy')
+
+    restored = DedupCache(window=30)
+    assert restored.restore(cache.export()) == 1
+    assert restored.check_and_set('DOGEKRW_buy_buy') is True
+
+    # 저장한 뒤 시간 창보다 오래 지난 키는 복원하지 않음
+    expired = {key: ts - 31 for key, ts in cache.export().items()}
+    assert DedupCache(window=30).restore(expired) == 0
+
+
+def test_sqlite_backend_shares_keys_between_instances(tmp_path):
+    path = str(tmp_path / 'state.db')
+    first, second = SqliteStateBackend(path), SqliteStateBackend(path)
+
+    assert first.check_and_set('DOGEKRW_buy_buy', 30) is False
+    assert second.check_and_set('DOGEKRW_buy_buy', 30) is True
+    assert second.check_and_set('DOGEKRW_sell_sell', 30) is False
+
+
+def test_webhook_ignores_resent_alert():
+    import webserver
+
+    client = webserver.app.test_client()
+    alert = {'ticker': 'DOGEKRW', 'value': 'EMA_cross_up'}  # 주문 대상이 아닌 값 (주문 작업 없음)
+
+    assert client.post('/webhook', json=alert).get_json()['status'] == 'ignored'
+    assert client.post('/webhook', json=alert).get_json()['status'] == 'duplicate_ignored'
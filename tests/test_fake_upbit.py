@@ -0,0 +1,23 @@
+import pytest
+
+from conftest import wait_until
+from trading.trade import buy_market, get_order
+from utils.upbit_client import UpbitAPIError
+
+
+def test_order_fills_after_delay(fake_upbit):
+    order = buy_market('KRW-DOGE', '10000', 'th-test-fill')
+    assert order.is_accepted
+    assert get_order(uuid=order.uuid).state == 'wait'
+
+    assert wait_until(lambda: get_order(uuid=order.uuid).state == 'done')
+    assert get_order(identifier='th-test-fill').uuid == order.uuid
+
+
+def test_duplicate_identifier_is_rejected(fake_upbit):
+    buy_market('KRW-DOGE', '10000', 'th-test-duplicate')
+    with pytest.raises(UpbitAPIError) as error:
+        buy_market('KRW-DOGE', '10000', 'th-test-duplicate')
+
+    assert error.value.status_code == 400
+    assert fake_upbit.order_counts[('KRW-DOGE', 'bid')] == 1
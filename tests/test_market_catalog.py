@@ -0,0 +1,46 @@
+from conftest import wait_until
+from upbit_data.market_catalog import MarketCatalog
+
+
+def loaded_catalog(**kwargs) -> MarketCatalog:
+    catalog = MarketCatalog(**kwargs)
+    catalog.load()
+    catalog._started = True  # 백그라운드 갱신 스레드 없이 처음 보는 마켓 조회만 사용
+    return catalog
+
+
+def test_chance_is_loaded_only_for_listed_markets(fake_upbit):
+    catalog = loaded_catalog()
+    assert catalog.is_listed('KRW-DOGE')
+    assert not catalog.is_listed('KRW-NOPE')
+
+    # 마켓 목록에 없는 마켓은 기본값만 반환하고 주문 가능 정보를 조회하지 않음
+    for _ in range(5):
+        assert not catalog.get('KRW-NOPE').has_chance
+    assert fake_upbit.requests['/v1/orders/chance'] == 0
+
+    catalog.get('KRW-DOGE')
+    assert wait_until(lambda: catalog.get('KRW-DOGE').has_chance)
+    assert fake_upbit.requests['/v1/orders/chance'] == 1
+
+
+def test_failed_chance_is_not_retried_until_ttl(fake_upbit):
+    catalog = loaded_catalog(chance_retry=60)
+    calls = []
+
+    def load_chance(market):
+        calls.append(market)
+        raise RuntimeError('chance failed')
+
+    catalog.load_chance = load_chance
+
+    catalog.get('KRW-DOGE')
+    assert wait_until(lambda: 'KRW-DOGE' in catalog._failed)
+    for _ in range(5):
+        catalog.get('KRW-DOGE')
+    assert calls == ['KRW-DOGE']
+
+    # 재시도 시각이 지나면 다시 조회
+    catalog._failed['KRW-DOGE'] = 0
+    catalog.get('KRW-DOGE')
+    assert wait_until(lambda: len(calls) == 2)
@@ -0,0 +1,74 @@
+import os
+from email import message_from_bytes
+from email.header import decode_header, make_header
+
+from conftest import free_port, wait_until
+from utils.email_utils import EmailChannel
+from utils.notifier import Notifier, digest
+
+
+def email_channel(port: int) -> EmailChannel:
+    return EmailChannel(server='127.0.0.1', port=port, use_ssl=False, sender='bot@example.com', password='',
+                        receiver='me@example.com')
+
+
+def subject(envelope) -> str:
+    return str(make_header(decode_header(message_from_bytes(envelope.content)['Subject'])))
+
+
+def test_digest():
+    items = [{'title': '매수', 'message': 'KRW-DOGE 매수', 'created_at': 0},
+             {'title': '매도', 'message': 'KRW-BTC 매도', 'created_at': 1}]
+
+    assert digest(items[:1]) == ('매수', 'KRW-DOGE 매수')
+    title, message = digest(items)
+    assert title.startswith('[TradeHook] 알림 2건 - 매수')
+    assert 'KRW-DOGE 매수' in message and 'KRW-BTC 매도' in message
+
+
+def test_notifications_are_sent_as_one_digest(smtp_server, tmp_path):
+    handler, port = smtp_server
+    notifier = Notifier([email_channel(port)], spool_dir=str(tmp_path), coalesce_window=0.3)
+    notifier.start()
+
+    for i in range(3):
+        notifier.notify(f'알림 {i}', f'내용 {i}')
+
+    assert wait_until(lambda: notifier.stats()['sent'] == 3)
+    assert len(handler.messages) == 1
+    assert '알림 3건' in subject(handler.messages[0])
+    assert notifier.stats()['spooled'] == 0
+
+
+def test_failed_notifications_are_spooled_and_replayed(smtp_server, tmp_path):
+    handler, port = smtp_server
+    # 처음에는 닫힌 포트로 보내서 실패 -> 스풀에 기록
+    channel = email_channel(free_port())
+    notifier = Notifier([channel], spool_dir=str(tmp_path), coalesce_window=0.1, retry_interval=0.5)
+    notifier.start()
+
+    notifier.notify('매수', 'KRW-DOGE 매수')
+    notifier.notify('매도', 'KRW-DOGE 매도')
+
+    spool_path = os.path.join(str(tmp_path), 'email.jsonl')
+    assert wait_until(lambda: notifier.stats()['spooled'] == 2)
+    assert os.path.exists(spool_path)
+
+    # 메일 서버가 돌아오면 다음 재전송 주기에 스풀의 알림을 보내고 스풀 파일을 지운다.
+    channel.port = port
+    assert wait_until(lambda: notifier.stats()['sent'] == 2)
+    assert len(handler.messages) == 1
+    assert '알림 2건' in subject(handler.messages[0])
+    assert wait_until(lambda: not os.path.exists(spool_path))
+
+
+def test_notify_spools_when_queue_is_full(tmp_path):
+    channel = email_channel(free_port())
+    notifier = Notifier([channel], spool_dir=str(tmp_path), queue_size=1)  # start() 하지 않아서 큐에 남음
+
+    notifier.notify('1', 'queued')
+    notifier.notify('2', 'spooled')
+
+    assert notifier.stats() == {'queued': 1, 'sent': 0, 'failed': 0, 'spooled': 1}
+    with open(os.path.join(str(tmp_path), 'email.jsonl'), encoding='utf-8') as f:
+        assert '"spooled"' in f.read()
@@ -0,0 +1,72 @@
+import pytest
+
+from trading.models import Order
+from trading.order_tracker import OrderTracker, OrderTrackTimeout, EVENT_PARTIAL, EVENT_DONE, EVENT_TIMEOUT
+from trading.trade import sell_market
+
+
+def test_polling_tracks_order_until_done(fake_upbit):
+    # WebSocket 없이 개별 주문 조회(/v1/order) 폴링만으로 체결 확인
+    tracker = OrderTracker(use_websocket=False)
+    order = sell_market('KRW-DOGE', '10', 'th-test-track')
+
+    events = []
+    filled = tracker.track(order.uuid, callback=lambda event, o: events.append(event), timeout=5).result(timeout=5)
+
+    assert filled.state == 'done'
+    assert filled.executed_volume == '10.0'
+    assert events == [EVENT_DONE]
+    assert fake_upbit.requests['/v1/order'] >= 2  # 체결 전에 조회한 뒤 다시 폴링
+    assert tracker.pending() == []
+
+
+def test_partial_fill_events(fake_upbit):
+    states = iter([('wait', '0'), ('wait', '3'), ('wait', '3'), ('done', '10')])
+
+    def fetch_order(order_uuid: str) -> Order:
+        state, executed_volume = next(states)
+        return Order.from_dict({'uuid': order_uuid, 'side': 'ask', 'state': state, 'market': 'KRW-DOGE',
+                                'executed_volume': executed_volume})
+
+    events = []
+    tracker = OrderTracker(use_websocket=False, fetch_order=fetch_order)
+    filled = tracker.track('order-partial', callback=lambda event, o: events.append(event), timeout=5).result(timeout=5)
+
+    assert filled.executed_volume == '10'
+    assert events == [EVENT_PARTIAL, EVENT_DONE]
+
+
+def test_timeout_when_order_never_fills():
+    def fetch_order(order_uuid: str) -> Order:
+        return Order.from_dict({'uuid': order_uuid, 'side': 'ask', 'state': 'wait', 'market': 'KRW-DOGE'})
+
+    events = []
+    tracker = OrderTracker(use_websocket=False, fetch_order=fetch_order)
+    future = tracker.track('order-stuck', callback=lambda event, o: events.append(event), timeout=0.5)
+
+    with pytest.raises(OrderTrackTimeout):
+        future.result(timeout=5)
+    assert events == [EVENT_TIMEOUT]
+    assert tracker.pending() == []
+
+
+def test_polling_retries_after_fetch_error():
+    calls = []
+
+    def fetch_order(order_uuid: str) -> Order:
+        calls.append(order_uuid)
+        if len(calls) == 1:
+            raise ConnectionError('temporary')
+        return Order.from_dict({'uuid': order_uuid, 'side': 'bid', 'state': 'cancel', 'market': 'KRW-DOGE'})
+
+    tracker = OrderTracker(use_websocket=False, fetch_order=fetch_order)
+    assert tracker.track('order-retry', timeout=5).result(timeout=5).state == 'cancel'
+    assert len(calls) == 2
+
+
+def test_final_event_before_track_is_kept():
+    # 추적을 등록하기 전에 도착한 최종 이벤트(WebSocket)는 조회 없이 바로 완료
+    tracker = OrderTracker(use_websocket=False, fetch_order=lambda order_uuid: pytest.fail('unexpected poll'))
+    tracker._on_order(Order.from_dict({'uuid': 'order-early', 'side': 'ask', 'state': 'done', 'market': 'KRW-DOGE'}))
+
+    assert tracker.track('order-early', timeout=5).result(timeout=1).state == 'done'
@@ -0,0 +1,38 @@
+import pytest
+
+from upbit_data.price_feed import PriceFeed
+from utils.convert_utils import get_trade_prices
+from utils.upbit_client import UpbitAPIError
+
+LISTED = {'KRW-DOGE', 'KRW-BTC'}
+
+
+def test_unknown_market_rejects_whole_batch(fake_upbit):
+    # 업비트와 같이 없는 마켓이 섞이면 묶음 전체가 404
+    with pytest.raises(UpbitAPIError) as excinfo:
+        get_trade_prices(['KRW-DOGE', 'KRW-NOPE'])
+    assert excinfo.value.status_code == 404
+
+
+def test_unlisted_market_does_not_break_listed_prices(fake_upbit):
+    feed = PriceFeed(use_websocket=False, is_listed=lambda market: market in LISTED)
+
+    assert feed.get_price('KRW-NOPE') == (None, None)
+    assert 'KRW-NOPE' not in feed._markets
+
+    price, age = feed.get_price('KRW-DOGE')
+    assert price == fake_upbit.prices['KRW-DOGE']
+    assert age is not None
+    assert feed._markets == {'KRW-DOGE'}
+
+    # 오래된 가격을 다시 조회할 때도 없는 마켓은 묶음에 넣지 않음
+    feed.refresh(extra=['KRW-NOPE', 'KRW-BTC'])
+    assert feed.get_price('KRW-BTC', max_age=60)[0] == fake_upbit.prices['KRW-BTC']
+
+
+def test_unlisted_market_is_fetched_on_its_own(fake_upbit):
+    # 카탈로그가 아직 비어 있어도 (e.g. 시작 직후) 실제 마켓은 따로 조회하여 가격을 반환
+    feed = PriceFeed(use_websocket=False, is_listed=lambda market: False)
+
+    assert feed.get_price('KRW-DOGE')[0] == fake_upbit.prices['KRW-DOGE']
+    assert feed._markets == set()
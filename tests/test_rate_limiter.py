@@ -0,0 +1,37 @@
+from utils.rate_limiter import TokenBucket, UpbitRateLimiter, PRIORITY_HIGH, PRIORITY_LOW
+from utils.upbit_client import UpbitCall
+
+
+def test_background_requests_leave_the_reserve():
+    bucket = TokenBucket(rate=4, reserve=2)
+
+    # low 요청은 여유분(reserve)을 남기고 멈춤
+    low = 0
+    while bucket.try_acquire(PRIORITY_LOW):
+        low += 1
+    assert low == 2
+
+    # 남겨 둔 토큰은 high 요청(주문 / 매매 경로)만 사용
+    assert bucket.try_acquire(PRIORITY_HIGH)
+    assert bucket.try_acquire(PRIORITY_HIGH)
+    assert not bucket.try_acquire(PRIORITY_HIGH)
+
+
+def test_low_remaining_req_slows_the_bucket():
+    bucket = TokenBucket(rate=10)
+    assert bucket.acquire() < 0.01
+
+    # 서버가 알려준 남은 요청 수가 0이면 토큰이 다시 찰 때까지(1 / rate초) 기다림
+    bucket.observe_remaining(0)
+    assert bucket.acquire() >= 0.08
+
+
+def test_every_response_calibrates_the_limiter(monkeypatch):
+    # 헤지 요청은 먼저 온 응답을 사용하고 늦게 온 응답은 버리지만, 두 응답 모두 남은 요청 수에 반영
+    limiter = UpbitRateLimiter()
+    monkeypatch.setattr('utils.upbit_client.get_rate_limiter', lambda: limiter)
+    call = UpbitCall('GET', '/v1/ticker', PRIORITY_HIGH, max_retries=0, backoff=0, hedge=True)
+
+    call.observe(200, {'Remaining-Req': 'group=ticker; min=599; sec=9'}, 0.01)
+    call.observe(200, {'Remaining-Req': 'group=ticker; min=598; sec=0'}, 0.02)
+    assert not limiter.try_acquire('ticker', PRIORITY_HIGH)
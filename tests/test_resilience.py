@@ -0,0 +1,125 @@
+import time
+
+import pytest
+import requests
+
+from utils.rate_limiter import group_for
+from utils.resilience import (CircuitBreaker, CircuitOpenError, DeadlineExceeded, LatencyTracker, deadline,
+                              get_circuit_breaker, CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN)
+from utils.upbit_client import UpbitAPIError, UpbitClient
+
+
+def open_breaker(failures: int = 3, reset_timeout: float = 0.05) -> CircuitBreaker:
+    breaker = CircuitBreaker('test', failure_threshold=failures, reset_timeout=reset_timeout)
+    for _ in range(failures):
+        breaker.allow()
+        breaker.record_failure()
+    return breaker
+
+
+def test_circuit_opens_after_consecutive_failures():
+    breaker = CircuitBreaker('test', failure_threshold=3, reset_timeout=60)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CIRCUIT_CLOSED
+    breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    assert breaker.stats()['opened'] == 1
+
+
+def test_half_open_allows_a_single_probe():
+    breaker = open_breaker()
+    time.sleep(0.06)
+
+    breaker.allow()  # 시험 요청
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    # 시험 요청의 결과가 나올 때까지 다른 요청은 보내지 않음
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CIRCUIT_CLOSED
+    breaker.allow()
+
+
+def test_failed_probe_opens_the_circuit_again():
+    breaker = open_breaker()
+    time.sleep(0.06)
+
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+    assert breaker.stats()['opened'] == 2
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+
+def test_deadline_expiry_skips_the_request(fake_upbit):
+    client = UpbitClient(max_retries=0, hedge=False)
+
+    with deadline(0):
+        with pytest.raises(DeadlineExceeded):
+            client.get('/v1/ticker', {'markets': 'KRW-DOGE'})
+    assert fake_upbit.requests['/v1/ticker'] == 0
+
+    # 응답이 늦으면 남은 시간만큼만 기다림
+    fake_upbit.latency = 0.5
+    try:
+        started = time.monotonic()
+        with deadline(0.1):
+            with pytest.raises(requests.Timeout):
+                client.get('/v1/ticker', {'markets': 'KRW-DOGE'})
+        assert time.monotonic() - started < 0.4
+    finally:
+        fake_upbit.latency = 0
+        get_circuit_breaker(group_for('GET', '/v1/ticker')).record_success()
+
+
+def test_open_circuit_stops_upbit_requests(fake_upbit, monkeypatch):
+    client = UpbitClient(max_retries=0, hedge=False)
+    breaker = get_circuit_breaker(group_for('GET', '/v1/ticker'))
+    monkeypatch.setattr(breaker, 'failure_threshold', 2)
+    monkeypatch.setattr(breaker, 'reset_timeout', 0.05)
+    breaker.record_success()  # 이전 테스트의 실패(e.g. 타임아웃) 초기화
+
+    fake_upbit.error_rate = 1.0
+    try:
+        for _ in range(2):
+            with pytest.raises(UpbitAPIError):
+                client.get('/v1/ticker', {'markets': 'KRW-DOGE'})
+        assert breaker.state == CIRCUIT_OPEN
+
+        # 차단 중에는 요청을 보내지 않음
+        with pytest.raises(CircuitOpenError):
+            client.get('/v1/ticker', {'markets': 'KRW-DOGE'})
+        assert fake_upbit.requests['/v1/ticker'] == 2
+
+        # 시험 요청이 성공하면 다시 열림
+        fake_upbit.error_rate = 0
+        time.sleep(0.06)
+        assert client.get('/v1/ticker', {'markets': 'KRW-DOGE'})[0]['market'] == 'KRW-DOGE'
+        assert breaker.state == CIRCUIT_CLOSED
+    finally:
+        breaker.record_success()
+
+
+def test_latency_tracker_p95():
+    tracker = LatencyTracker(size=100, min_samples=20)
+    for _ in range(19):
+        tracker.observe(0.01)
+    assert tracker.p95() is None  # 응답 수가 부족하면 헤지하지 않음
+
+    for i in range(81):
+        tracker.observe(0.01 if i < 76 else 1.0)
+    assert tracker.p95() == 0.01
+
+    # 최근 응답만 사용 (오래된 응답은 밀려남)
+    for _ in range(100):
+        tracker.observe(0.2)
+    assert tracker.p95() == 0.2
@@ -0,0 +1,84 @@
+from decimal import Decimal
+
+from conftest import wait_until
+from replay import Alert, expected_orders
+from trading.signal_coalescer import SignalCoalescer, WINDOW_NETTED, WINDOW_SUBMITTED
+
+
+class Submits:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, ticker: str, side: str, value: str, job_id=None):
+        self.calls.append((ticker, side, value, job_id))
+
+
+def order_fee(ticker: str, side: str) -> tuple:
+    return 'KRW', Decimal('25') if side == 'buy' else Decimal('30')
+
+
+def test_opposite_signals_are_netted():
+    submit = Submits()
+    coalescer = SignalCoalescer(submit, window=0.2, order_fee=order_fee)
+
+    window_id = coalescer.add('DOGEKRW', 'buy', 'buy')
+    assert coalescer.add('DOGEKRW', 'sell', 'sell') == window_id
+    assert coalescer.get(window_id)['status'] == 'pending'
+
+    assert wait_until(lambda: coalescer.get(window_id)['status'] == WINDOW_NETTED)
+    assert submit.calls == []
+
+    stats = coalescer.stats()
+    assert (stats['orders'], stats['orders_saved']) == (0, 2)
+    assert stats['fees_saved'] == {'KRW': 55.0}
+
+
+def test_same_side_signals_become_one_order():
+    submit = Submits()
+    coalescer = SignalCoalescer(submit, window=0.2, order_fee=order_fee)
+
+    window_id = coalescer.add('DOGEKRW', 'buy', 'buy_1')
+    coalescer.add('DOGEKRW', 'buy', 'buy_2')
+    coalescer.add('DOGEKRW', 'sell', 'sell_1')
+    other_id = coalescer.add('BTCKRW', 'sell', 'sell_1')
+
+    assert wait_until(lambda: len(submit.calls) == 2)
+    assert sorted(submit.calls) == [('BTCKRW', 'sell', 'sell_1', other_id),
+                                    ('DOGEKRW', 'buy', 'buy_1,buy_2,sell_1', window_id)]
+    assert coalescer.get(window_id)['status'] == WINDOW_SUBMITTED
+
+    stats = coalescer.stats()
+    assert (stats['orders'], stats['orders_saved']) == (2, 2)
+    assert stats['fees_saved'] == {'KRW': 55.0}  # 매수 1건 + 매도 1건
+
+
+def test_no_window_submits_each_signal():
+    submit = Submits()
+    coalescer = SignalCoalescer(submit, window=0)
+
+    coalescer.add('DOGEKRW', 'buy', 'buy')
+    coalescer.add('DOGEKRW', 'sell', 'sell')
+    assert coalescer.add('DOGEKRW', 'ema_cross_up', 'EMA_cross_up') is None
+
+    assert [call[1] for call in submit.calls] == ['buy', 'sell']
+    assert coalescer.stats()['ignored'] == 1
+
+
+def test_bench_expected_orders_follow_netting():
+    alerts = [Alert(0.0, 'DOGEKRW', 'buy', 0), Alert(0.05, 'DOGEKRW', 'buy', 0),  # 재전송
+              Alert(0.5, 'DOGEKRW', 'sell', 1), Alert(0.6, 'BTCKRW', 'buy', 2), Alert(3.0, 'BTCKRW', 'sell', 3)]
+    convert = {'DOGEKRW': 'KRW-DOGE', 'BTCKRW': 'KRW-BTC'}.get
+
+    assert expected_orders(alerts, convert, window=30) == {
+        ('KRW-DOGE', 'bid'): 1, ('KRW-DOGE', 'ask'): 1, ('KRW-BTC', 'bid'): 1, ('KRW-BTC', 'ask'): 1}
+    assert expected_orders(alerts, convert, window=30, coalesce_window=1.0) == {
+        ('KRW-BTC', 'bid'): 1, ('KRW-BTC', 'ask'): 1}
+
+
+def test_order_fee_uses_market_rules():
+    import webserver
+
+    quote, fee = webserver.order_fee('DOGEKRW', 'buy')
+    info = webserver.get_market_catalog().get('KRW-DOGE')
+    assert quote == 'KRW'
+    assert fee == webserver.order_amount(info) * info.bid_fee
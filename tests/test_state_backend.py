@@ -0,0 +1,145 @@
+import socketserver, threading, time
+
+import pytest
+
+from utils.state_backend import InMemoryStateBackend, RedisError, RedisStateBackend, _RespConnection
+
+
+class FakeRedis(socketserver.ThreadingTCPServer):
+    # 상태 저장소가 사용하는 명령만 처리하는 RESP 서버 (drop_replies: 처리한 뒤 응답하지 않고 연결을 끊을 명령 수)
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _RespHandler)
+        self.data = {}
+        self.hashes = {}
+        self.commands = []
+        self.drop_replies = 0
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def run(self, args: list):
+        command = args[0].upper()
+        self.commands.append(command)
+        if command == 'SET':
+            key, value, options = args[1], args[2], [arg.upper() for arg in args[3:]]
+            expires_at = time.time() + int(options[options.index('PX') + 1]) / 1000 if 'PX' in options else None
+            current = self.data.get(key)
+            if 'NX' in options and current is not None and (current[1] is None or current[1] > time.time()):
+                return None
+            self.data[key] = (value, expires_at)
+            return 'OK'
+        if command == 'GET':
+            current = self.data.get(args[1])
+            return current[0] if current is not None else None
+        if command == 'HSET':
+            self.hashes.setdefault(args[1], {})[args[2]] = args[3]
+            return 1
+        if command == 'HGET':
+            return self.hashes.get(args[1], {}).get(args[2])
+        if command == 'HGETALL':
+            return [item for pair in self.hashes.get(args[1], {}).items() for item in pair]
+        raise ValueError(f'unknown command {command}')
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server: FakeRedis = self.server
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:-2])):
+                length = int(self.rfile.readline()[1:-2])
+                args.append(self.rfile.read(length + 2)[:-2].decode('utf-8'))
+
+            with server.lock:
+                try:
+                    reply = server.run(args)
+                except ValueError as e:
+                    reply = e
+                if server.drop_replies > 0:
+                    server.drop_replies -= 1
+                    return  # 명령은 처리했지만 응답 전에 연결이 끊김
+            self.wfile.write(self._encode(reply))
+
+    def _encode(self, reply) -> bytes:
+        if reply is None:
+            return b'$-1\r\n'
+        if isinstance(reply, Exception):
+            return b'-ERR %s\r\n' % str(reply).encode('utf-8')
+        if isinstance(reply, int):
+            return b':%d\r\n' % reply
+        if isinstance(reply, list):
+            return b'*%d\r\n' % len(reply) + b''.join(self._encode(item) for item in reply)
+        if reply == 'OK':
+            return b'+OK\r\n'
+        data = reply.encode('utf-8')
+        return b'$%d\r\n%s\r\n' % (len(data), data)
+
+
+@pytest.fixture
+def fake_redis():
+    server = FakeRedis()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_resp_connection_replies(fake_redis):
+    conn = _RespConnection('127.0.0.1', fake_redis.port, 0, None, timeout=2)
+    try:
+        assert conn.execute('SET', 'key', 'value') == 'OK'
+        assert conn.execute('GET', 'key') == 'value'
+        assert conn.execute('GET', 'missing') is None
+        assert conn.execute('HSET', 'hash', 'field', '1') == 1
+        assert conn.execute('HGETALL', 'hash') == ['field', '1']
+        with pytest.raises(RedisError):
+            conn.execute('UNKNOWN')
+    finally:
+        conn.close()
+
+
+def test_redis_backend_dedup_and_regimes(fake_redis):
+    first = RedisStateBackend(port=fake_redis.port)
+    second = RedisStateBackend(port=fake_redis.port)
+
+    assert first.check_and_set('DOGEKRW_buy_buy', 30) is False
+    assert second.check_and_set('DOGEKRW_buy_buy', 30) is True
+
+    first.set_regime('KRW-DOGE', 'up')
+    assert second.get_regime('KRW-DOGE') == 'up'
+    assert second.all_regimes() == {'KRW-DOGE': 'up'}
+
+
+def test_resent_set_after_lost_reply_is_not_a_duplicate(fake_redis):
+    backend = RedisStateBackend(port=fake_redis.port)
+    assert backend.get_regime('KRW-DOGE') is None  # 연결
+
+    # SET은 처리되었지만 응답 전에 연결이 끊김 -> 다시 연결하여 보낸 SET은 nil
+    fake_redis.drop_replies = 1
+    assert backend.check_and_set('DOGEKRW_buy_buy', 30) is False
+    assert fake_redis.commands[-3:] == ['SET', 'SET', 'GET']
+
+    # 실제로 다시 보낸 시그널은 중복
+    assert backend.check_and_set('DOGEKRW_buy_buy', 30) is True
+
+
+def test_memory_backend_honours_ttl():
+    backend = InMemoryStateBackend(window=30)
+
+    assert backend.check_and_set('short', 0.05) is False
+    assert backend.check_and_set('short', 0.05) is True
+    assert backend.check_and_set('long', 30) is False
+    time.sleep(0.1)
+
+    # ttl이 지난 키만 다시 처리
+    assert backend.check_and_set('short', 0.05) is False
+    assert backend.check_and_set('long', 30) is True
+    assert backend.stats()['hits'] == 2
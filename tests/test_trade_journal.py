@@ -0,0 +1,112 @@
+import sqlite3
+
+import pytest
+
+from conftest import wait_until
+from trading.trade import buy_market, get_order
+from trading.trade_journal import (TradeJournal, JournalWriteError, EVENT_SIGNAL, EVENT_SUBMIT, EVENT_ACCEPTED,
+                                   EVENT_DONE, EVENT_FAILED)
+
+
+def test_pending_orders_survive_restart(tmp_path):
+    path = str(tmp_path / 'journal.db')
+    journal = TradeJournal(path)
+    journal.record(EVENT_SIGNAL, 'th-a', 'DOGEKRW', 'buy', key='DOGEKRW_buy_buy')
+    journal.record(EVENT_SUBMIT, 'th-a', 'KRW-DOGE', 'bid', wait=True, price='10000')
+    journal.record(EVENT_SUBMIT, 'th-b', 'KRW-DOGE', 'ask', wait=True)
+    journal.record(EVENT_ACCEPTED, 'th-b', order_uuid='uuid-b')
+    journal.record(EVENT_SUBMIT, 'th-c', 'KRW-BTC', 'bid', wait=True)
+    journal.record(EVENT_ACCEPTED, 'th-c', 'KRW-BTC', 'bid', 'uuid-c')
+    journal.record(EVENT_DONE, 'th-c', 'KRW-BTC', 'bid', 'uuid-c')
+    journal.close()
+
+    restarted = TradeJournal(path)
+    pending = {order['identifier']: order for order in restarted.pending()}
+    assert sorted(pending) == ['th-a', 'th-b']
+    assert pending['th-a']['kind'] == EVENT_SUBMIT
+    assert (pending['th-b']['kind'], pending['th-b']['uuid'], pending['th-b']['side']) == (EVENT_ACCEPTED, 'uuid-b',
+                                                                                          'ask')
+    assert restarted.get('th-c') is None  # 끝난 주문은 불러오지 않음
+    assert list(restarted.recent_signals(60)) == ['DOGEKRW_buy_buy']
+    restarted.close()
+
+
+def test_commit_failure_is_raised_to_waiter(tmp_path):
+    path = str(tmp_path / 'journal.db')
+    journal = TradeJournal(path)
+    with sqlite3.connect(path) as conn:
+        conn.execute('DROP TABLE journal')
+
+    with pytest.raises(JournalWriteError):
+        journal.record(EVENT_SUBMIT, 'th-fail', 'KRW-DOGE', 'bid', wait=True)
+
+    assert journal.get('th-fail')['kind'] == EVENT_FAILED
+    stats = journal.stats()
+    assert (stats['failures'], stats['records'], stats['pending']) == (1, 0, 0)
+    journal.close()
+
+
+def test_reconcile_orders_after_restart(fake_upbit, tmp_path, monkeypatch):
+    import webserver
+
+    # 재시작 전: th-sent는 주문까지 보냈고(응답 기록 전 종료), th-unsent는 주문 요청 기록만 남음
+    journal = TradeJournal(str(tmp_path / 'journal.db'))
+    journal.record(EVENT_SUBMIT, 'th-sent', 'KRW-DOGE', 'bid', wait=True)
+    journal.record(EVENT_SUBMIT, 'th-unsent', 'KRW-DOGE', 'bid', wait=True)
+    order = buy_market('KRW-DOGE', '10000', 'th-sent')
+    assert wait_until(lambda: get_order(uuid=order.uuid).state == 'done')
+    monkeypatch.setattr(webserver, 'trade_journal', journal)
+
+    assert webserver.reconcile_orders() == {EVENT_DONE: 1, EVENT_FAILED: 1}
+    assert wait_until(lambda: journal.get('th-sent')['kind'] == EVENT_DONE)
+    assert journal.get('th-sent')['uuid'] == order.uuid
+    assert journal.get('th-unsent')['kind'] == EVENT_FAILED
+    assert journal.pending() == []
+    # 재전송된 시그널은 이미 접수된 주문으로 처리
+    assert webserver.already_submitted('KRW-DOGE', 'th-sent')
+    journal.close()
+
+
+def test_only_duplicate_identifier_error_means_order_exists(fake_upbit):
+    import webserver
+    from utils.upbit_client import UpbitAPIError
+
+    buy_market('KRW-DOGE', '50000', 'signal-dup')
+    with pytest.raises(UpbitAPIError) as excinfo:
+        buy_market('KRW-DOGE', '50000', 'signal-dup')
+    assert webserver.order_error_action(excinfo.value, 'KRW-DOGE', 'signal-dup',
+                                        webserver.NO_RESPONSE_ERRORS) == webserver.ORDER_EXISTS
+
+    # 다른 400 거부(e.g. 잔고 부족)는 접수되지 않은 주문
+    rejected = UpbitAPIError(400, {'error': {'name': 'insufficient_funds_bid', 'message': '주문가능한 금액이 부족합니다.'}})
+    assert webserver.order_error_action(rejected, 'KRW-DOGE', 'signal-funds',
+                                        webserver.NO_RESPONSE_ERRORS) == webserver.ORDER_NOT_ACCEPTED
+
+
+def test_settle_order_error(fake_upbit, tmp_path, monkeypatch):
+    import webserver
+    from utils.upbit_client import UpbitAPIError
+
+    journal = TradeJournal(str(tmp_path / 'journal.db'))
+    monkeypatch.setattr(webserver, 'trade_journal', journal)
+
+    # 재시작 전에 접수된 주문 (identifier 중복) -> 접수 기록만 남기고 다시 처리하지 않음
+    order = buy_market('KRW-DOGE', '10000', 'th-exists')
+    duplicate = UpbitAPIError(400, {'error': {'name': 'duplicate_identifier', 'message': 'identifier 중복'}})
+    assert webserver.settle_order_error(webserver.ORDER_EXISTS, duplicate, 'KRW-DOGE', 'bid', 'th-exists',
+                                        existing=order) is None
+    assert journal.get('th-exists')['uuid'] == order.uuid
+
+    # 응답 없이 접수된 주문 -> 조회한 주문을 사용
+    timeout = webserver.NO_RESPONSE_ERRORS[0]('read timeout')
+    assert webserver.settle_order_error(webserver.ORDER_UNKNOWN, timeout, 'KRW-DOGE', 'bid', 'th-sent',
+                                        existing=order) is order
+
+    # 400 거부(e.g. 잔고 부족)는 중복이 아님 -> 조회하지 않고 실패로 기록
+    rejected = UpbitAPIError(400, {'error': {'name': 'insufficient_funds_bid', 'message': '주문가능한 금액이 부족합니다.'}})
+    action = webserver.order_error_action(rejected, 'KRW-DOGE', 'th-rejected', webserver.NO_RESPONSE_ERRORS)
+    assert not webserver.needs_order_lookup(action, 'th-rejected')
+    with pytest.raises(UpbitAPIError):
+        webserver.settle_order_error(action, rejected, 'KRW-DOGE', 'bid', 'th-rejected')
+    assert wait_until(lambda: (journal.get('th-rejected') or {}).get('kind') == EVENT_FAILED)
+    journal.close()
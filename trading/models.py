@@ -0,0 +1,82 @@
+from typing import Optional
+
+"""
+# 주문 레코드
+
+업비트 주문 응답(JSON)을 담는 가벼운 레코드입니다.
+금액/수량은 정밀도 유지를 위해 업비트가 보내준 문자열 그대로 보관합니다.
+"""
+
+
+class Order:
+    __slots__ = ('uuid', 'market', 'side', 'ord_type', 'state', 'price', 'volume', 'remaining_volume',
+                 'executed_volume', 'paid_fee', 'trades_count', 'identifier', 'created_at')
+
+    def __init__(self, uuid: Optional[str], market: str, side: str, ord_type: str, state: str,
+                 price: Optional[str] = None, volume: Optional[str] = None, remaining_volume: Optional[str] = None,
+                 executed_volume: Optional[str] = None, paid_fee: Optional[str] = None, trades_count: int = 0,
+                 identifier: Optional[str] = None, created_at: Optional[str] = None):
+        self.uuid = uuid
+        self.market = market
+        self.side = side
+        self.ord_type = ord_type
+        self.state = state
+        self.price = price
+        self.volume = volume
+        self.remaining_volume = remaining_volume
+        self.executed_volume = executed_volume
+        self.paid_fee = paid_fee
+        self.trades_count = trades_count
+        self.identifier = identifier
+        self.created_at = created_at
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Order':
+        return cls(
+            uuid=data.get('uuid'),
+            market=data.get('market', ''),
+            side=data.get('side', ''),
+            ord_type=data.get('ord_type', ''),
+            state=data.get('state', ''),
+            price=data.get('price'),
+            volume=data.get('volume'),
+            remaining_volume=data.get('remaining_volume'),
+            executed_volume=data.get('executed_volume'),
+            paid_fee=data.get('paid_fee'),
+            trades_count=data.get('trades_count') or 0,
+            identifier=data.get('identifier'),
+            created_at=data.get('created_at'),
+        )
+
+    @classmethod
+    def from_ws(cls, data: dict) -> 'Order':
+        # 업비트 WebSocket(myOrder) 메시지 -> Order
+        return cls(
+            uuid=data.get('uuid'),
+            market=data.get('code', ''),
+            side=(data.get('ask_bid') or '').lower(),
+            ord_type=data.get('order_type', ''),
+            state=data.get('state', ''),
+            price=_to_str(data.get('price')),
+            volume=_to_str(data.get('volume')),
+            remaining_volume=_to_str(data.get('remaining_volume')),
+            executed_volume=_to_str(data.get('executed_volume')),
+            paid_fee=_to_str(data.get('paid_fee')),
+            trades_count=data.get('trades_count') or 0,
+            identifier=data.get('identifier'),
+        )
+
+    @property
+    def is_final(self) -> bool:
+        # done: 전체 체결, cancel: 취소 (시장가 매수는 잔량이 cancel 처리될 수 있음)
+        return self.state in ('done', 'cancel')
+
+    @property
+    def is_accepted(self) -> bool:
+        # 시장가 주문이므로 uuid가 있으면 정상적으로 접수된 것으로 본다.
+        return bool(self.uuid)
+
+
+def _to_str(value) -> Optional[str]:
+    # WebSocket 메시지는 숫자로 오므로 REST 응답과 같이 문자열로 맞춘다.
+    return None if value is None else str(value)
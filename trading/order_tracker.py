@@ -0,0 +1,252 @@
+import json, os, threading, time, uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from trading.models import Order
+from trading.trade import get_order
+from utils.upbit_client import get_upbit_client
+
+try:
+    import websocket  # websocket-client (없으면 폴링만 사용)
+except ImportError:
+    websocket = None
+
+"""
+# 주문 체결 추적 (Order Tracker)
+
+주문 uuid 기준으로 체결 상태를 추적합니다.
+
+- 업비트 Private WebSocket(myOrder)을 사용할 수 있으면 체결 이벤트를 바로 반영
+- WebSocket을 사용할 수 없거나 이벤트가 누락되는 경우를 대비하여 개별 주문 조회(/v1/order)를
+  점점 간격을 늘리며(adaptive backoff) 폴링
+- 주문마다 최대 대기 시간(hard timeout)이 있으며, 초과 시 OrderTrackTimeout으로 종료
+
+track()은 Future를 반환하며 최종 상태(done / cancel)의 Order로 완료됩니다.
+callback(event, order)을 전달하면 partial(부분 체결) / done / cancel / timeout 이벤트마다 호출합니다.
+"""
+
+UPBIT_WS_URL = os.getenv('UPBIT_WS_URL', 'wss://api.upbit.com/websocket/v1')
+UPBIT_WS_ENABLED = os.getenv('UPBIT_WS_ENABLED', '1') == '1'
+
+# 주문 체결 최대 대기 시간(초)
+ORDER_TRACK_TIMEOUT = float(os.getenv('ORDER_TRACK_TIMEOUT', '30'))
+
+# 폴링 간격(초): 최초 간격에서 BACKOFF 배수로 늘려 최대 간격까지
+POLL_INITIAL_INTERVAL = 0.2
+POLL_MAX_INTERVAL = 2.0
+POLL_BACKOFF = 1.5
+
+# WebSocket이 연결되어 있을 때는 폴링을 누락 대비용으로만 사용
+WS_SAFETY_POLL_INTERVAL = 2.0
+
+EVENT_PARTIAL = 'partial'
+EVENT_DONE = 'done'
+EVENT_CANCEL = 'cancel'
+EVENT_TIMEOUT = 'timeout'
+
+
+class OrderTrackTimeout(TimeoutError):
+    pass
+
+
+class _TrackedOrder:
+    __slots__ = ('uuid', 'future', 'callback', 'deadline', 'next_poll', 'interval', 'executed_volume')
+
+    def __init__(self, order_uuid: str, callback: Optional[Callable], timeout: float, first_poll: float):
+        now = time.monotonic()
+        self.uuid = order_uuid
+        self.future = Future()
+        self.callback = callback
+        self.deadline = now + timeout
+        self.next_poll = now + first_poll
+        self.interval = first_poll
+        self.executed_volume = None
+
+
+class OrderTracker:
+    """
+    주문 체결 추적기.
+
+    Args:
+        use_websocket (bool): Private WebSocket(myOrder) 사용 여부
+        ws_url (str): WebSocket 주소
+        fetch_order (Callable): 개별 주문 조회 함수 (uuid -> Order)
+    """
+
+    def __init__(self, use_websocket: bool = UPBIT_WS_ENABLED, ws_url: str = UPBIT_WS_URL,
+                 fetch_order: Callable = None):
+        self._use_websocket = use_websocket and websocket is not None
+        self._ws_url = ws_url.rstrip('/') + '/private'
+        self._fetch_order = fetch_order or (lambda order_uuid: get_order(uuid=order_uuid))
+
+        self._cond = threading.Condition()
+        self._tracked = {}  # uuid -> _TrackedOrder
+        self._recent_final = OrderedDict()  # 추적 등록 전에 도착한 최종 이벤트 (uuid -> Order)
+        self._ws_connected = False
+        self._started = False
+
+    def start(self):
+        with self._cond:
+            if self._started:
+                return
+            self._started = True
+
+        threading.Thread(target=self._poll_loop, name='order-tracker-poll', daemon=True).start()
+        if self._use_websocket:
+            threading.Thread(target=self._ws_loop, name='order-tracker-ws', daemon=True).start()
+
+    @property
+    def ws_connected(self) -> bool:
+        return self._ws_connected
+
+    def track(self, order_uuid: str, callback: Optional[Callable] = None,
+              timeout: float = ORDER_TRACK_TIMEOUT) -> Future:
+        """
+        주문 추적을 시작합니다.
+
+        Args:
+            order_uuid (str): 주문 uuid
+            callback (Optional[Callable]): callback(event, order) - partial / done / cancel / timeout
+            timeout (float): 최대 대기 시간(초)
+
+        Returns:
+            Future: 최종 상태의 Order (시간 초과 시 OrderTrackTimeout)
+        """
+        self.start()
+
+        first_poll = WS_SAFETY_POLL_INTERVAL if self._ws_connected else POLL_INITIAL_INTERVAL
+        tracked = _TrackedOrder(order_uuid, callback, timeout, first_poll)
+
+        with self._cond:
+            final_order = self._recent_final.pop(order_uuid, None)
+            if final_order is None:
+                self._tracked[order_uuid] = tracked
+                self._cond.notify()
+
+        if final_order is not None:
+            self._finish(tracked, final_order)
+        return tracked.future
+
+    def pending(self) -> list:
+        with self._cond:
+            return list(self._tracked)
+
+    # ========== 상태 반영 ==========
+
+    def _on_order(self, order: Order):
+        with self._cond:
+            tracked = self._tracked.get(order.uuid)
+            if tracked is None:
+                if order.is_final:
+                    self._recent_final[order.uuid] = order
+                    while len(self._recent_final) > 1000:
+                        self._recent_final.popitem(last=False)
+                return
+            if order.is_final:
+                del self._tracked[order.uuid]
+
+        if order.is_final:
+            self._finish(tracked, order)
+        elif order.executed_volume != tracked.executed_volume:
+            tracked.executed_volume = order.executed_volume
+            if order.executed_volume and float(order.executed_volume) > 0:
+                self._notify(tracked, EVENT_PARTIAL, order)
+
+    def _finish(self, tracked: _TrackedOrder, order: Order):
+        self._notify(tracked, EVENT_DONE if order.state == 'done' else EVENT_CANCEL, order)
+        if not tracked.future.done():
+            tracked.future.set_result(order)
+
+    def _expire(self, tracked: _TrackedOrder):
+        self._notify(tracked, EVENT_TIMEOUT, None)
+        if not tracked.future.done():
+            tracked.future.set_exception(OrderTrackTimeout(f'주문 체결 확인 시간 초과: {tracked.uuid}'))
+
+    @staticmethod
+    def _notify(tracked: _TrackedOrder, event: str, order: Optional[Order]):
+        if tracked.callback is None:
+            return
+        try:
+            tracked.callback(event, order)
+        except Exception:
+            pass
+
+    # ========== 폴링 ==========
+
+    def _poll_loop(self):
+        while True:
+            with self._cond:
+                while not self._tracked:
+                    self._cond.wait()
+
+                now = time.monotonic()
+                expired = [t for t in self._tracked.values() if t.deadline <= now]
+                for tracked in expired:
+                    del self._tracked[tracked.uuid]
+                due = [t for t in self._tracked.values() if t.next_poll <= now]
+
+                # 처리할 주문이 없으면 가장 가까운 폴링/만료 시각까지 대기 (새 주문이 등록되면 깨어남)
+                if not due and not expired:
+                    wake_at = min(min(t.next_poll, t.deadline) for t in self._tracked.values())
+                    self._cond.wait(timeout=wake_at - now)
+                    continue
+
+            for tracked in expired:
+                self._expire(tracked)
+
+            for tracked in due:
+                try:
+                    self._on_order(self._fetch_order(tracked.uuid))
+                except Exception:
+                    pass  # 다음 폴링에서 재시도
+
+                max_interval = WS_SAFETY_POLL_INTERVAL if self._ws_connected else POLL_MAX_INTERVAL
+                tracked.interval = min(tracked.interval * POLL_BACKOFF, max_interval)
+                tracked.next_poll = time.monotonic() + tracked.interval
+
+    # ========== WebSocket (myOrder) ==========
+
+    def _ws_loop(self):
+        def on_open(ws):
+            self._ws_connected = True
+            ws.send(json.dumps([{"ticket": uuid.uuid4().hex}, {"type": "myOrder"}, {"format": "DEFAULT"}]))
+
+        def on_message(ws, message):
+            try:
+                data = json.loads(message)
+            except ValueError:
+                return
+            if data.get('type') == 'myOrder' and data.get('uuid'):
+                self._on_order(Order.from_ws(data))
+
+        def on_close(ws, *args):
+            self._ws_connected = False
+
+        while True:
+            headers = get_upbit_client().auth_headers()
+            ws_app = websocket.WebSocketApp(
+                self._ws_url,
+                header=[f"Authorization: {headers['Authorization']}"],
+                on_open=on_open,
+                on_message=on_message,
+                on_close=on_close,
+                on_error=lambda ws, error: None,
+            )
+            # 연결이 끊기면 (JWT를 새로 만들어) 재연결
+            ws_app.run_forever(ping_interval=60, ping_timeout=10)
+            self._ws_connected = False
+            time.sleep(5)
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_order_tracker() -> OrderTracker:
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                _tracker = OrderTracker()
+    return _tracker
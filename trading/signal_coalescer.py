@@ -0,0 +1,212 @@
+import contextvars, os, threading, time, uuid
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Callable, Optional
+
+from utils.convert_utils import market_label
+from utils.metrics import inc
+
+"""
+# 시그널 묶음 처리 (Signal Coalescer)
+
+티커별로 짧은 시간(window) 동안 들어온 매매 시그널을 모아서, 시간 창마다 최대 1건의 주문으로 상계(netting)합니다.
+
+- 같은 티커에 함께 들어온 여러 매수 시그널은 매수 1건으로 처리
+- 매수 직후 매도처럼 서로 반대인 시그널은 상계되어 주문하지 않음 (왕복 수수료 절약)
+- 매수(+1) / 매도(-1) 합계의 부호로 방향을 정하고, 주문 크기는 기존과 같이 고정 (quote별 1회 주문 금액)
+- 매매 시그널(buy / sell)이 아닌 값(e.g. EMA_cross_*)은 주문 대상이 아니므로 모으지 않음
+- 줄어든 주문 수와 절약한 수수료(추정, 마켓의 주문 금액 / 수수료율로 계산하여 quote 화폐별)를 집계
+"""
+
+# 시그널을 모으는 시간 창(초). 0이면 모으지 않고 시그널마다 바로 주문
+SIGNAL_COALESCE_WINDOW = float(os.getenv('SIGNAL_COALESCE_WINDOW', '1'))
+
+SIDE_BUY = 'buy'
+SIDE_SELL = 'sell'
+
+# 시간 창 상태
+WINDOW_PENDING = 'pending'
+WINDOW_SUBMITTED = 'submitted'
+WINDOW_NETTED = 'netted'  # 상계되어 주문하지 않음
+
+
+def signal_side(signal: str) -> Optional[str]:
+    # 시그널(소문자) -> 매매 방향. process_trade와 같이 buy / sell 만 주문 대상
+    return signal if signal in (SIDE_BUY, SIDE_SELL) else None
+
+
+class _Window:
+    __slots__ = ('window_id', 'ticker', 'values', 'sides', 'deadline', 'context', 'status', 'job_id')
+
+    def __init__(self, window_id: str, ticker: str, deadline: float):
+        self.window_id = window_id
+        self.ticker = ticker
+        self.values = []
+        self.sides = []
+        self.deadline = deadline
+        # 첫 시그널을 받은 요청의 컨텍스트(로그 correlation id 등)에서 주문을 등록한다.
+        self.context = contextvars.copy_context()
+        self.status = WINDOW_PENDING
+        self.job_id = None
+
+    def to_dict(self) -> dict:
+        return {'window_id': self.window_id, 'ticker': self.ticker, 'values': list(self.values),
+                'status': self.status, 'job_id': self.job_id}
+
+
+class SignalCoalescer:
+    """
+    티커별 시그널 묶음 처리기.
+
+    Args:
+        submit (Callable): 주문 작업 등록 함수. submit(ticker, side, value, job_id=...) 형태로 호출
+        window (float): 시그널을 모으는 시간(초)
+        order_fee (Callable): 주문 1건의 예상 수수료. order_fee(ticker, side) -> (quote, 수수료) 형태로 호출
+            (절약한 수수료 계산용, 없으면 계산하지 않음)
+        history_size (int): 상태 조회용으로 보관할 완료된 시간 창 수
+        make_id (Callable): 시간 창 id 생성 함수. make_id(ticker, signal, value) 형태로 첫 시그널로 호출 (기본: 임의의 uuid)
+    """
+
+    def __init__(self, submit: Callable, window: float = SIGNAL_COALESCE_WINDOW, order_fee: Optional[Callable] = None,
+                 history_size: int = 1000, make_id: Optional[Callable] = None):
+        self._submit = submit
+        self._make_id = make_id or (lambda ticker, signal, value: uuid.uuid4().hex)
+        self.window = window
+        self._order_fee = order_fee
+        self._history_size = history_size
+
+        self._cond = threading.Condition()
+        self._open = {}  # ticker -> 진행 중인 _Window
+        self._history = OrderedDict()  # window_id -> 완료된 _Window
+        self._started = False
+
+        self.signals = 0
+        self.ignored = 0  # 매매 시그널이 아니어서 무시
+        self.windows = 0
+        self.orders = 0
+        self.orders_saved = 0
+        self.fees_saved = {}  # quote -> 절약한 수수료 (Decimal)
+
+    def start(self):
+        with self._cond:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._flush_loop, name='signal-coalescer', daemon=True).start()
+
+    def add(self, ticker: str, signal: str, value: str) -> Optional[str]:
+        """
+        시그널을 티커의 현재 시간 창에 추가합니다.
+
+        Returns:
+            Optional[str]: 시간 창 id (주문이 등록되면 작업 id로 사용). 매매 시그널이 아니면 None
+        """
+        side = signal_side(signal)
+        with self._cond:
+            self.signals += 1
+            if side is None:
+                self.ignored += 1
+                return None
+
+            window = self._open.get(ticker)
+            if window is None:
+                window_id = self._make_id(ticker, signal, value)
+                window = self._open[ticker] = _Window(window_id, ticker, time.monotonic() + self.window)
+                self.windows += 1
+            window.values.append(value)
+            window.sides.append(side)
+
+            if self.window > 0:
+                self._cond.notify()
+                immediate = False
+            else:
+                del self._open[ticker]
+                immediate = True
+
+        if immediate:
+            self._flush(window)
+        else:
+            self.start()
+        return window.window_id
+
+    def get(self, window_id: str) -> Optional[dict]:
+        with self._cond:
+            window = self._history.get(window_id)
+            if window is None:
+                window = next((w for w in self._open.values() if w.window_id == window_id), None)
+            return window.to_dict() if window else None
+
+    # ========== 상계 / 주문 등록 ==========
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while not self._open:
+                    self._cond.wait()
+
+                now = time.monotonic()
+                due = [window for window in self._open.values() if window.deadline <= now]
+                if not due:
+                    self._cond.wait(timeout=min(window.deadline for window in self._open.values()) - now)
+                    continue
+                for window in due:
+                    del self._open[window.ticker]
+
+            for window in due:
+                self._flush(window)
+
+    def _flush(self, window: _Window):
+        net = sum(1 if side == SIDE_BUY else -1 for side in window.sides)
+        side = SIDE_BUY if net > 0 else SIDE_SELL if net < 0 else None
+
+        if side is not None:
+            window.job_id = window.window_id
+            window.context.run(self._submit, window.ticker, side, ','.join(window.values), job_id=window.job_id)
+
+        saved = len(window.sides) - (1 if side else 0)
+        fees = {}
+        if saved:
+            inc('tradehook_orders_saved_total', 'Orders saved by signal netting.', amount=saved,
+                ticker=market_label(window.ticker))
+            fees = self._saved_fees(window, side)
+
+        with self._cond:
+            window.status = WINDOW_SUBMITTED if side else WINDOW_NETTED
+            self.orders += 1 if side else 0
+            self.orders_saved += saved
+            for quote, fee in fees.items():
+                self.fees_saved[quote] = self.fees_saved.get(quote, Decimal('0')) + fee
+
+            self._history[window.window_id] = window
+            while len(self._history) > self._history_size:
+                self._history.popitem(last=False)
+
+    def _saved_fees(self, window: _Window, side: Optional[str]) -> dict:
+        # 주문하지 않은 시그널의 예상 수수료 합계 (quote -> 수수료), 남은 1건(side)은 주문하므로 제외
+        if self._order_fee is None:
+            return {}
+
+        fees = {}
+        for saved_side in (SIDE_BUY, SIDE_SELL):
+            count = window.sides.count(saved_side) - (1 if side == saved_side else 0)
+            if count <= 0:
+                continue
+            try:
+                quote, fee = self._order_fee(window.ticker, saved_side)
+            except Exception:
+                continue  # 마켓 규칙을 알 수 없는 티커는 집계하지 않음
+            fees[quote] = fees.get(quote, Decimal('0')) + fee * count
+        return fees
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'window': self.window,
+                'pending': len(self._open),
+                'signals': self.signals,
+                'ignored': self.ignored,
+                'windows': self.windows,
+                'orders': self.orders,
+                'orders_saved': self.orders_saved,
+                'fees_saved': {quote: float(fee) for quote, fee in self.fees_saved.items()},
+            }
@@ -1,14 +1,10 @@
-import requests, jwt, uuid, hashlib, os
-import pandas as pd
-from urllib.parse import urlencode, unquote
-from dotenv import load_dotenv
+from trading.models import Order
+from utils.upbit_client import get_upbit_client
+# asyncio 클라이언트(aiohttp)는 asyncio 서버에서만 사용하므로 *_async 함수 안에서 불러온다. (동기 서버 기동 시간)
 
-load_dotenv()
-
-# Authorization
-# Key: access_key, secret_key
-access_key = os.getenv('ACCESS_KEY', '')
-secret_key = os.getenv('SECRET_KEY', '')
+orders_path = '/v1/orders'
+open_orders_path = '/v1/orders/open'
+order_path = '/v1/order'
 
 """
 # 주문하기
@@ -47,76 +43,68 @@ URL: https://docs.upbit.com/reference/%EC%A3%BC%EB%AC%B8%ED%95%98%EA%B8%B0
 """
 
 
-def buy_market(market: str, price: int) -> pd.DataFrame:
+def _buy_market_params(market: str, price: str, identifier: str = None) -> dict:
     if not market or not price:
         raise ValueError(f'[market, price] 파라미터는 필수입니다.')
 
-    buy_market_url = 'https://api.upbit.com/v1/orders'
     buy_market_params = {
         "market": market,
         "side": "bid",
         "ord_type": "price",  # 시장가 주문
         "price": price,
     }
-    bm_query_string = unquote(urlencode(buy_market_params, doseq=True)).encode("utf-8")
-    bm_hash = hashlib.sha512()
-    bm_hash.update(bm_query_string)
-    bm_query_hash = bm_hash.hexdigest()
-
-    bm_payload = {
-        "access_key": access_key,
-        "nonce": str(uuid.uuid4()),
-        "query_hash": bm_query_hash,
-        "query_hash_alg": "SHA512"
-    }
-
-    bm_jwt_token = jwt.encode(bm_payload, secret_key)
-    bm_authorization = 'Bearer {}'.format(bm_jwt_token)
-    bm_headers = {
-        "Authorization": bm_authorization
-    }
-
-    buy_market_order_data = pd.DataFrame.from_dict(
-        requests.post(buy_market_url, json=buy_market_params, headers=bm_headers).json(), orient='index').T
-
-    return buy_market_order_data
+    # 같은 identifier의 주문은 업비트에서 거부되므로 재전송된 시그널의 중복 주문을 막을 수 있다.
+    if identifier:
+        buy_market_params["identifier"] = identifier
+    return buy_market_params
 
 
-def sell_market(market: str, volume: str) -> pd.DataFrame:
+def _sell_market_params(market: str, volume: str, identifier: str = None) -> dict:
     if not market or not volume:
         raise ValueError(f'[market, volume] 파라미터는 필수입니다.')
 
-    sell_market_url = 'https://api.upbit.com/v1/orders'
     sell_market_params = {
         "market": market,
         "side": "ask",
         "ord_type": "market",  # 시장가 주문
         "volume": volume,
     }
-    sm_query_string = unquote(urlencode(sell_market_params, doseq=True)).encode("utf-8")
-    sm_hash = hashlib.sha512()
-    sm_hash.update(sm_query_string)
-    sm_query_hash = sm_hash.hexdigest()
-
-    sm_payload = {
-        "access_key": access_key,
-        "nonce": str(uuid.uuid4()),
-        "query_hash": sm_query_hash,
-        "query_hash_alg": "SHA512"
-    }
+    if identifier:
+        sell_market_params["identifier"] = identifier
+    return sell_market_params
 
-    sm_jwt_token = jwt.encode(sm_payload, secret_key)
-    sm_authorization = 'Bearer {}'.format(sm_jwt_token)
-    bm_headers = {
-        "Authorization": sm_authorization
-    }
 
-    sell_market_order_data = pd.DataFrame.from_dict(
-        requests.post(sell_market_url, json=sell_market_params, headers=bm_headers).json(), orient='index').T
+def buy_market(market: str, price: str, identifier: str = None) -> Order:
+    buy_market_params = _buy_market_params(market, price, identifier)
+
+    buy_market_order_data = Order.from_dict(get_upbit_client().post(orders_path, buy_market_params))
+
+    return buy_market_order_data
+
+
+def sell_market(market: str, volume: str, identifier: str = None) -> Order:
+    sell_market_params = _sell_market_params(market, volume, identifier)
+
+    sell_market_order_data = Order.from_dict(get_upbit_client().post(orders_path, sell_market_params))
 
     return sell_market_order_data
 
 
+# asyncio 서버용 (async_server.py)
+async def buy_market_async(market: str, price: str, identifier: str = None) -> Order:
+    from utils.async_upbit_client import get_async_upbit_client
+
+    buy_market_params = _buy_market_params(market, price, identifier)
+    return Order.from_dict(await get_async_upbit_client().post(orders_path, buy_market_params))
+
+
+async def sell_market_async(market: str, volume: str, identifier: str = None) -> Order:
+    from utils.async_upbit_client import get_async_upbit_client
+
+    sell_market_params = _sell_market_params(market, volume, identifier)
+    return Order.from_dict(await get_async_upbit_client().post(orders_path, sell_market_params))
+
+
 """
 # 체결 대기 주문 (Open Order) 조회
 URL: https://docs.upbit.com/reference/%EB%8C%80%EA%B8%B0-%EC%A3%BC%EB%AC%B8-%EC%A1%B0%ED%9A%8C
@@ -153,7 +141,7 @@ URL: https://docs.upbit.com/reference/%EB%8C%80%EA%B8%B0-%EC%A3%BC%EB%AC%B8-%EC%
 """
 
 
-def get_open_order(market: str, state: str) -> pd.DataFrame:
+def _open_order_params(market: str, state: str) -> dict:
     if not market:
         raise ValueError(f'[market] 파라미터는 필수입니다.')
 
@@ -161,33 +149,61 @@ def get_open_order(market: str, state: str) -> pd.DataFrame:
     if not state:
         state = 'wait'
 
-    open_order_url = 'https://api.upbit.com/v1/orders/open'
-    open_order_params = {
+    return {
         "market": market,
         "state": state
     }
-    oo_query_string = unquote(urlencode(open_order_params, doseq=True)).encode("utf-8")
-    oo_hash = hashlib.sha512()
-    oo_hash.update(oo_query_string)
-    oo_query_hash = oo_hash.hexdigest()
-
-    oo_payload = {
-        "access_key": access_key,
-        "nonce": str(uuid.uuid4()),
-        "query_hash": oo_query_hash,
-        "query_hash_alg": "SHA512"
-    }
 
-    oo_jwt_token = jwt.encode(oo_payload, secret_key)
-    oo_authorization = 'Bearer {}'.format(oo_jwt_token)
-    oo_headers = {
-        "Authorization": oo_authorization
-    }
 
-    open_order_data = pd.DataFrame(
-        requests.get(open_order_url, json=open_order_params, headers=oo_headers).json())
+def get_open_order(market: str, state: str) -> list:
+    open_order_params = _open_order_params(market, state)
+
+    open_order_data = [Order.from_dict(item) for item in
+                       get_upbit_client().get(open_orders_path, open_order_params, auth=True)]
 
     return open_order_data
 
-# oo_result = get_open_order('KRW-DOGE', 'wait')
-# print(oo_result)
+
+async def get_open_order_async(market: str, state: str) -> list:
+    from utils.async_upbit_client import get_async_upbit_client
+
+    open_order_params = _open_order_params(market, state)
+    return [Order.from_dict(item) for item in
+            await get_async_upbit_client().get(open_orders_path, open_order_params, auth=True)]
+
+
+"""
+# 개별 주문 조회
+URL: https://docs.upbit.com/reference/%EA%B0%9C%EB%B3%84-%EC%A3%BC%EB%AC%B8-%EC%A1%B0%ED%9A%8C
+
+[GET] https://api.upbit.com/v1/order
+
+## Request
+- uuid: 주문 UUID
+- identifier: 조회용 사용자 지정 값 (uuid 혹은 identifier 둘 중 하나는 필수)
+
+## Response
+- 주문하기 응답과 동일 (+ trades: 체결 목록)
+"""
+
+
+def _order_params(uuid: str = None, identifier: str = None) -> dict:
+    if not uuid and not identifier:
+        raise ValueError(f'[uuid, identifier] 중 하나는 필수입니다.')
+
+    return {"uuid": uuid} if uuid else {"identifier": identifier}
+
+
+def get_order(uuid: str = None, identifier: str = None) -> Order:
+    order_params = _order_params(uuid, identifier)
+
+    order_data = Order.from_dict(get_upbit_client().get(order_path, order_params, auth=True))
+
+    return order_data
+
+
+async def get_order_async(uuid: str = None, identifier: str = None) -> Order:
+    from utils.async_upbit_client import get_async_upbit_client
+
+    order_params = _order_params(uuid, identifier)
+    return Order.from_dict(await get_async_upbit_client().get(order_path, order_params, auth=True))
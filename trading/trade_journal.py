@@ -0,0 +1,300 @@
+import asyncio, hashlib, json, os, queue, sqlite3, threading, time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from utils.log_utils import setup_logging
+
+"""
+# 매매 저널 (Trade Journal)
+
+시그널 수신 -> 주문 요청 -> 주문 접수(uuid) -> 체결 상태를 순서대로 기록하는 추가 전용(append-only) 저널입니다.
+
+- SQLite WAL 모드 파일 (TRADE_JOURNAL_PATH, 기본 data/trade_journal.db)
+- 기록은 큐에 넣기만 하고, writer 스레드가 쌓인 기록을 한 트랜잭션으로 묶어서 커밋 (group commit)
+- 주문 요청(submit)은 커밋될 때까지 기다린 뒤 주문 (write-ahead). 프로세스가 죽어도 어떤 주문을 보냈는지 남음
+- 주문에는 시그널로 정해지는 identifier를 붙이므로, 재시작 후 같은 시그널이 다시 와도 업비트에서 중복 주문이 거부됨
+- 기동 시 끝나지 않은 주문(pending)을 업비트 주문 조회로 확인하여 최종 상태를 기록 (reconcile)
+- asyncio 서버는 record_async()로 이벤트 루프를 막지 않고 커밋을 기다림
+
+synchronous=NORMAL 이므로 프로세스 장애에는 안전하고, 전원 장애 시에는 마지막 커밋 일부가 유실될 수 있습니다.
+커밋에 실패하면 기다리는 쪽(record(wait=True) / record_async)에 JournalWriteError가 발생하므로, 주문 요청은 보내지 않습니다.
+"""
+
+logger = setup_logging(__name__)
+
+TRADE_JOURNAL_PATH = os.getenv('TRADE_JOURNAL_PATH', 'data/trade_journal.db')
+
+# writer 스레드가 한 트랜잭션에 기록하는 최대 건수
+JOURNAL_BATCH_SIZE = 256
+
+# 기록 종류
+EVENT_SIGNAL = 'signal'  # 시그널 수신 (중복 검사 통과)
+EVENT_SUBMIT = 'submit'  # 주문 요청 직전
+EVENT_ACCEPTED = 'accepted'  # 주문 접수 (uuid)
+EVENT_OPEN = 'open'  # 기동 시 확인한 체결 대기 주문
+EVENT_DONE = 'done'  # 체결 완료
+EVENT_CANCEL = 'cancel'  # 취소 (시장가 매수는 남은 금액이 취소되며 종료)
+EVENT_FAILED = 'failed'  # 주문 전 실패 혹은 업비트에 주문이 없음
+
+ORDER_EVENTS = (EVENT_SUBMIT, EVENT_ACCEPTED, EVENT_OPEN, EVENT_DONE, EVENT_CANCEL, EVENT_FAILED)
+PENDING_EVENTS = (EVENT_SUBMIT, EVENT_ACCEPTED, EVENT_OPEN)
+
+
+def order_identifier(ticker: str, value: str, window: float, at: Optional[float] = None) -> str:
+    """
+    시그널로 정해지는 주문 identifier.
+
+    같은 (티커, 값)의 시그널이 window(초) 단위 구간 안에서 다시 오면(재전송) 같은 identifier가 됩니다.
+    중복 검사로 같은 시그널은 window 이상 떨어져서 처리되므로, 서로 다른 시그널은 다른 구간에 속합니다.
+    """
+    bucket = int((time.time() if at is None else at) // window)
+    digest = hashlib.sha1(f'{ticker}|{value}|{bucket}'.encode('utf-8')).hexdigest()
+    return f'th-{digest[:32]}'
+
+
+class JournalWriteError(Exception):
+    # 저널 커밋 실패 (write-ahead 기록이 남지 않았으므로 주문하지 않음)
+    pass
+
+
+class _Entry:
+    __slots__ = ('row', 'committed', 'on_commit', 'error')
+
+    def __init__(self, row: tuple, wait: bool, on_commit: Optional[Callable] = None):
+        self.row = row
+        self.committed = threading.Event() if wait else None
+        self.on_commit = on_commit  # on_commit(error): 커밋(성공 시 error는 None) 후 writer 스레드에서 호출
+        self.error: Optional[Exception] = None
+
+
+class TradeJournal:
+    """
+    매매 저널.
+
+    Args:
+        path (str): SQLite 파일 경로
+        history_size (int): 메모리에 보관할 주문별 마지막 상태 수
+    """
+
+    _STOP = object()
+
+    def __init__(self, path: str = TRADE_JOURNAL_PATH, history_size: int = 10000):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._history_size = history_size
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._orders = OrderedDict()  # identifier -> 마지막 주문 기록
+
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS journal (id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL, '
+                     'kind TEXT NOT NULL, identifier TEXT, ticker TEXT, side TEXT, uuid TEXT, detail TEXT)')
+        conn.execute('CREATE INDEX IF NOT EXISTS journal_identifier ON journal (identifier)')
+        conn.execute('CREATE INDEX IF NOT EXISTS journal_kind_ts ON journal (kind, ts)')
+        self._load_pending(conn)
+        self._read_conn = conn
+
+        self.records = 0
+        self.commits = 0
+        self.commit_seconds = 0.0
+        self.failures = 0  # 실패한 커밋 수
+
+        self._thread = threading.Thread(target=self._run, name='trade-journal', daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    # ========== 기록 ==========
+
+    def record(self, kind: str, identifier: Optional[str] = None, ticker: Optional[str] = None,
+               side: Optional[str] = None, order_uuid: Optional[str] = None, wait: bool = False, **detail):
+        """
+        기록을 추가합니다.
+
+        Args:
+            kind (str): 기록 종류 (EVENT_*)
+            wait (bool): 커밋될 때까지 대기 (주문 요청 전 write-ahead 기록)
+            detail: 추가 정보 (JSON으로 저장)
+
+        Raises:
+            JournalWriteError: wait인 경우 커밋 실패
+        """
+        entry = self._add(kind, identifier, ticker, side, order_uuid, wait, None, detail)
+        if entry.committed is not None:
+            entry.committed.wait()
+            if entry.error is not None:
+                raise entry.error
+
+    async def record_async(self, kind: str, identifier: Optional[str] = None, ticker: Optional[str] = None,
+                           side: Optional[str] = None, order_uuid: Optional[str] = None, **detail):
+        """
+        record(wait=True)의 asyncio 버전. 이벤트 루프를 막지 않고 커밋될 때까지 기다립니다.
+
+        Raises:
+            JournalWriteError: 커밋 실패
+        """
+        loop = asyncio.get_running_loop()
+        committed = loop.create_future()
+
+        def settle(error: Optional[Exception]):
+            if committed.done():
+                return
+            if error is None:
+                committed.set_result(None)
+            else:
+                committed.set_exception(error)
+
+        def on_commit(error: Optional[Exception]):
+            loop.call_soon_threadsafe(settle, error)
+
+        self._add(kind, identifier, ticker, side, order_uuid, False, on_commit, detail)
+        await committed
+
+    def _add(self, kind: str, identifier: Optional[str], ticker: Optional[str], side: Optional[str],
+             order_uuid: Optional[str], wait: bool, on_commit: Optional[Callable], detail: dict) -> _Entry:
+        now = time.time()
+        row = (now, kind, identifier, ticker, side, order_uuid,
+               json.dumps(detail, ensure_ascii=False, default=str) if detail else None)
+
+        if identifier and kind in ORDER_EVENTS:
+            with self._lock:
+                previous = self._orders.pop(identifier, {})
+                self._orders[identifier] = {
+                    'identifier': identifier, 'kind': kind, 'ts': now,
+                    'ticker': ticker or previous.get('ticker'), 'side': side or previous.get('side'),
+                    'uuid': order_uuid or previous.get('uuid'),
+                }
+                while len(self._orders) > self._history_size:
+                    self._orders.popitem(last=False)
+
+        entry = _Entry(row, wait, on_commit)
+        self._queue.put(entry)
+        return entry
+
+    def _run(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < JOURNAL_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(entry is self._STOP for entry in batch)
+            entries = [entry for entry in batch if entry is not self._STOP]
+            if entries:
+                error = self._commit(conn, entries)
+                if error is not None:
+                    self._forget_failed(entries)
+                for entry in entries:
+                    entry.error = error
+                    if entry.committed is not None:
+                        entry.committed.set()
+                    if entry.on_commit is not None:
+                        entry.on_commit(error)
+            if stop:
+                conn.close()
+                return
+
+    def _commit(self, conn: sqlite3.Connection, entries: list) -> Optional[JournalWriteError]:
+        # 한 트랜잭션으로 기록. 실패하면 기다리는 쪽에 전달할 에러를 반환 (실패한 묶음은 기록 수 / 커밋 수에 포함하지 않음)
+        start = time.perf_counter()
+        try:
+            conn.execute('BEGIN')
+            conn.executemany('INSERT INTO journal (ts, kind, identifier, ticker, side, uuid, detail) '
+                             'VALUES (?, ?, ?, ?, ?, ?, ?)', [entry.row for entry in entries])
+            conn.execute('COMMIT')
+        except sqlite3.Error as e:
+            logger.error("Trade journal commit failed (%d records): %s", len(entries), e)
+            self.failures += 1
+            try:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+            except sqlite3.Error:
+                pass
+            return JournalWriteError(f'매매 저널 기록 실패: {e}')
+
+        self.records += len(entries)
+        self.commits += 1
+        self.commit_seconds += time.perf_counter() - start
+        return None
+
+    def _forget_failed(self, entries: list):
+        # 커밋하지 못한 write-ahead 기록(주문 요청)은 주문하지 않으므로, 메모리의 주문 상태를 failed로 변경
+        with self._lock:
+            for entry in entries:
+                identifier, kind = entry.row[2], entry.row[1]
+                waiting = entry.committed is not None or entry.on_commit is not None
+                order = self._orders.get(identifier) if identifier else None
+                if waiting and order is not None and order['kind'] == kind:
+                    order['kind'] = EVENT_FAILED
+
+    def close(self, timeout: float = 5.0):
+        # 남은 기록을 모두 커밋하고 종료
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join(timeout)
+
+    # ========== 조회 ==========
+
+    def _load_pending(self, conn: sqlite3.Connection):
+        # 마지막 기록이 끝나지 않은 상태(submit / accepted / open)인 주문의 기록을 순서대로 다시 반영
+        order_kinds = ','.join('?' * len(ORDER_EVENTS))
+        pending_kinds = ','.join('?' * len(PENDING_EVENTS))
+        rows = conn.execute(
+            f'SELECT identifier, kind, ts, ticker, side, uuid FROM journal WHERE kind IN ({order_kinds}) '
+            f'AND identifier IN (SELECT j.identifier FROM journal j JOIN (SELECT MAX(id) AS id FROM journal '
+            f'WHERE identifier IS NOT NULL AND kind IN ({order_kinds}) GROUP BY identifier) last ON j.id = last.id '
+            f'WHERE j.kind IN ({pending_kinds})) ORDER BY id',
+            ORDER_EVENTS + ORDER_EVENTS + PENDING_EVENTS).fetchall()
+
+        for identifier, kind, ts, ticker, side, order_uuid in rows:
+            previous = self._orders.get(identifier, {})
+            self._orders[identifier] = {
+                'identifier': identifier, 'kind': kind, 'ts': ts,
+                'ticker': ticker or previous.get('ticker'), 'side': side or previous.get('side'),
+                'uuid': order_uuid or previous.get('uuid'),
+            }
+
+    def get(self, identifier: str) -> Optional[dict]:
+        # 주문의 마지막 기록 (메모리에 보관 중인 주문만)
+        with self._lock:
+            order = self._orders.get(identifier)
+            return dict(order) if order else None
+
+    def pending(self) -> list:
+        with self._lock:
+            return [dict(order) for order in self._orders.values() if order['kind'] in PENDING_EVENTS]
+
+    def recent_signals(self, window: float) -> dict:
+        """
+        window(초) 이내에 수신한 시그널의 중복 검사 키와 수신 시각(epoch 초). 재시작 시 중복 검사 복원용
+        """
+        rows = self._read_conn.execute('SELECT ts, detail FROM journal WHERE kind = ? AND ts >= ?',
+                                       (EVENT_SIGNAL, time.time() - window)).fetchall()
+        signals = {}
+        for ts, detail in rows:
+            key = json.loads(detail).get('key') if detail else None
+            if key:
+                signals[key] = ts
+        return signals
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = sum(1 for order in self._orders.values() if order['kind'] in PENDING_EVENTS)
+        return {
+            'path': self.path,
+            'records': self.records,
+            'commits': self.commits,
+            'avg_batch': round(self.records / self.commits, 2) if self.commits else 0.0,
+            'avg_commit_ms': round(self.commit_seconds / self.commits * 1000, 3) if self.commits else 0.0,
+            'failures': self.failures,
+            'pending': pending,
+        }
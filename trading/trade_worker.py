@@ -0,0 +1,216 @@
+import asyncio, contextvars, threading, time, uuid
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+"""
+# 매매 작업 큐 (Trade Worker Pool)
+
+웹훅 요청 스레드에서 매매를 직접 수행하지 않고, 작업(Job)으로 등록한 뒤 백그라운드 워커에서 처리합니다.
+
+- 같은 티커의 작업은 등록된 순서대로 하나씩(직렬) 처리
+- 다른 티커의 작업은 워커 수만큼 병렬로 처리
+- 작업 상태: queued -> running -> done / failed
+- 작업은 등록한 스레드의 컨텍스트(contextvars, e.g. 로그 correlation id)에서 실행
+- AsyncTradeWorkerPool: 같은 규칙으로 작업을 asyncio 이벤트 루프의 Task로 실행 (async_server.py)
+"""
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+
+class TradeJob:
+    __slots__ = ('job_id', 'ticker', 'args', 'context', 'status', 'error', 'created_at', 'started_at',
+                 'finished_at')
+
+    def __init__(self, ticker: str, args: tuple, job_id: Optional[str] = None):
+        self.job_id = job_id or uuid.uuid4().hex
+        self.ticker = ticker
+        self.args = args
+        self.context = contextvars.copy_context()
+        self.status = JOB_QUEUED
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self) -> dict:
+        return {
+            'job_id': self.job_id,
+            'ticker': self.ticker,
+            'args': list(self.args),
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class TradeWorkerPool:
+    """
+    티커별로 직렬화되는 매매 작업 풀.
+
+    Args:
+        handler (Callable): 작업을 처리할 함수. handler(ticker, *args) 형태로 호출
+        max_workers (int): 동시에 처리할 수 있는 최대 작업 수 (= 서로 다른 티커 수)
+        history_size (int): 완료된 작업을 상태 조회용으로 보관할 최대 개수
+    """
+
+    def __init__(self, handler: Callable, max_workers: int = 4, history_size: int = 1000):
+        self._handler = handler
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='trade-worker')
+        self._history_size = history_size
+
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()  # job_id -> TradeJob (등록 순서 유지)
+        self._pending = {}  # ticker -> deque[TradeJob] (실행 대기 중인 작업)
+        self._active = set()  # 현재 작업이 실행 중(또는 실행 예약)인 티커
+
+    def submit(self, ticker: str, *args, job_id: Optional[str] = None) -> TradeJob:
+        job = TradeJob(ticker, args, job_id)
+
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._trim_history()
+
+            # 같은 티커의 작업이 진행 중이면 대기열에 넣고, 아니면 바로 실행
+            if ticker in self._active:
+                self._pending.setdefault(ticker, deque()).append(job)
+                return job
+
+            self._active.add(ticker)
+
+        self._start(job)
+        return job
+
+    def _start(self, job: TradeJob):
+        self._executor.submit(self._run, job)
+
+    def _run(self, job: TradeJob):
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+
+        try:
+            job.context.run(self._handler, job.ticker, *job.args)
+            job.status = JOB_DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = JOB_FAILED
+        finally:
+            job.finished_at = time.time()
+            self._schedule_next(job.ticker)
+
+    def _schedule_next(self, ticker: str):
+        with self._lock:
+            queue = self._pending.get(ticker)
+            if not queue:
+                self._pending.pop(ticker, None)
+                self._active.discard(ticker)
+                return
+
+            next_job = queue.popleft()
+            if not queue:
+                del self._pending[ticker]
+
+        self._start(next_job)
+
+    def _trim_history(self):
+        # 보관 개수를 넘으면 오래된 완료 작업부터 제거 (대기/실행 중인 작업은 유지)
+        if len(self._jobs) <= self._history_size:
+            return
+
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self._history_size:
+                break
+            if self._jobs[job_id].status in (JOB_DONE, JOB_FAILED):
+                del self._jobs[job_id]
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    def list_jobs(self, status: Optional[str] = None) -> list:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.to_dict() for job in jobs if status is None or job.status == status]
+
+    def stats(self) -> dict:
+        counts = {JOB_QUEUED: 0, JOB_RUNNING: 0, JOB_DONE: 0, JOB_FAILED: 0}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return counts
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+class AsyncTradeWorkerPool(TradeWorkerPool):
+    """
+    asyncio 이벤트 루프에서 실행되는 매매 작업 풀.
+
+    TradeWorkerPool과 같이 같은 티커의 작업은 순서대로, 다른 티커의 작업은 동시에 처리합니다.
+    작업마다 스레드를 쓰지 않으므로 하나의 스레드에서 수천 건의 작업(주로 업비트 응답 대기)을 동시에 진행할 수 있습니다.
+
+    Args:
+        handler (Callable): 작업을 처리할 코루틴 함수. await handler(ticker, *args) 형태로 호출
+        max_concurrency (int): 동시에 처리할 수 있는 최대 작업 수
+        history_size (int): 완료된 작업을 상태 조회용으로 보관할 최대 개수
+    """
+
+    def __init__(self, handler: Callable, max_concurrency: int = 1000, history_size: int = 1000):
+        self._handler = handler
+        self._max_concurrency = max_concurrency
+        self._history_size = history_size
+
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._pending = {}
+        self._active = set()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks = set()  # 실행 중인 Task (GC 되지 않도록 참조 유지)
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        # 작업을 실행할 이벤트 루프 지정 (submit은 다른 스레드에서 호출해도 됨)
+        self._loop = loop
+
+    def _start(self, job: TradeJob):
+        if self._loop is None:
+            raise RuntimeError('이벤트 루프가 지정되지 않았습니다. (start(loop) 호출 필요)')
+        self._loop.call_soon_threadsafe(self._create_task, job)
+
+    def _create_task(self, job: TradeJob):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        # create_task는 현재 컨텍스트를 복사하므로, 작업을 등록한 요청의 컨텍스트에서 Task를 만든다.
+        task = job.context.run(self._loop.create_task, self._run_async(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_async(self, job: TradeJob):
+        async with self._semaphore:
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+
+            try:
+                await self._handler(job.ticker, *job.args)
+                job.status = JOB_DONE
+            except Exception as e:
+                job.error = str(e)
+                job.status = JOB_FAILED
+            finally:
+                job.finished_at = time.time()
+                self._schedule_next(job.ticker)
+
+    def shutdown(self, wait: bool = True):
+        # 남은 Task 취소 (다른 스레드에서 호출할 수 있음)
+        if self._loop is not None and not self._loop.is_closed():
+            for task in list(self._tasks):
+                self._loop.call_soon_threadsafe(task.cancel)
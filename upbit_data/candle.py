@@ -1,7 +1,9 @@
-import requests
-import pandas as pd
+import numpy as np
 
-headers = {"Accept": "application/json"}
+from upbit_data.candle_store import get_candle_store, to_records, KST_OFFSET, PAGE_SIZE
+from upbit_data.resampler import resample, bucket_start, check_unit, BASE_UNIT
+from utils.rate_limiter import PRIORITY_LOW
+# asyncio 클라이언트(aiohttp)는 asyncio 서버에서만 사용하므로 *_async 함수 안에서 불러온다. (동기 서버 기동 시간)
 
 """
 # 캔들 정보 조회 [분(Minutes) 기준]
@@ -34,61 +36,76 @@ URL: https://docs.upbit.com/reference/%EB%B6%84minute-%EC%BA%94%EB%93%A4-1
 
 
 # 분 기준 캔들정보 가져오기
-def get_min_candle_data(market: str, minute: int):
-    candle_min_url = f'https://api.upbit.com/v1/candles/minutes/{minute}'
-
-    # 모든 캔들정보를 여기에 담는다.
-    candle_all_data = None
-    last_time = None
-
-    # 5번 호출하여 1,000개의 데이터를 만든다.
-    # 한번 호출 시, {minute}분 간격으로 200개씩 데이터를 가져온다.
-    # 이 데이터는 {minute} X 200
-    for i in range(5):
-        if i == 0:
-            candle_min_params = {
-                "market": market,
-                "count": 200
-            }
-        else:
-            candle_min_params = {
-                "market": market,
-                "to": last_time,
-                "count": 200
-            }
-        candle_min_data = pd.DataFrame(
-            requests.get(candle_min_url, params=candle_min_params, headers=headers).json())
-
-        if candle_min_data.empty or len(candle_min_data) == 0:
-            raise ValueError('캔들정보가 비어 있습니다.')
-
-        candle_min_data['date'] = candle_min_data.candle_date_time_kst.str.split('T').str[0]
-        candle_min_data['time'] = candle_min_data.candle_date_time_kst.str.split('T').str[1]
-        # candle_min_data.drop(['candle_date_time_utc', 'candle_date_time_kst', 'timestamp'], axis=1, inplace=True)
-
-        # 라이브러리에서 활용할 수 있도록 컬럼 값 형태 변경
-        candle_min_data['open'] = candle_min_data['opening_price']  # 시가
-        candle_min_data['close'] = candle_min_data['trade_price']  # 종가
-        candle_min_data['high'] = candle_min_data['high_price']  # 고가
-        candle_min_data['low'] = candle_min_data['low_price']  # 저가
-        candle_min_data['volume'] = candle_min_data['candle_acc_trade_volume']  # 거래량
-
-        # 헷갈리지 않도록 변경 전 컬럼 값은 삭제
-        candle_min_data.drop(['opening_price', 'trade_price', 'high_price', 'low_price', 'candle_acc_trade_volume'],
-                             axis=1,
-                             inplace=True)
-
-        # last_time 설정
-        # 순회하면서 다음 번 호출 시 파라미터의 'to'에 해당 값이 세팅됩니다.
-        last_time = candle_min_data['candle_date_time_utc'].iloc[-1]
-
-        if candle_all_data is None:
-            candle_all_data = candle_min_data
-        else:
-            candle_all_data = pd.concat([candle_all_data, candle_min_data], ignore_index=True)
-
-    # 데이터가 역순(최신순)이기 때문에 시간순으로 순서를 변경해야 한다.
-    candle_all_data.sort_values(by='candle_date_time_kst', inplace=True)
-    candle_all_data.drop_duplicates(subset=['candle_date_time_kst'], keep='last')  # 중복된 데이터 제거
+# 로컬 캔들 저장소에 없는 (최신) 캔들만 업비트에서 조회한 뒤, 저장소에서 최근 {count}개를 읽어온다.
+def get_min_candle_data(market: str, minute: int, count: int = 1000):
+    candle_store = get_candle_store()
+    candle_store.sync(market, minute, count)
+
+    rows = candle_store.tail(market, minute, count)
+    if len(rows) == 0:
+        raise ValueError('캔들정보가 비어 있습니다.')
+
+    return candles_to_dataframe(market, minute, rows)
+
+
+# 기준 분봉(기본 1분봉)으로 만든 분 기준 캔들정보 가져오기
+# 여러 분봉 단위를 사용해도 업비트 조회 / 저장은 기준 분봉 하나만 한다. (get_min_candle_data와 같은 형식)
+def get_resampled_candle_data(market: str, minute: int, count: int = 1000, base_unit: int = BASE_UNIT):
+    check_unit(minute, base_unit)
+
+    # 첫 구간은 일부만 있을 수 있으므로 한 구간만큼 더 읽고 버린다.
+    base_count = (count + 1) * (minute // base_unit)
+
+    candle_store = get_candle_store()
+    candle_store.sync(market, base_unit, base_count)
+
+    rows = candle_store.tail(market, base_unit, base_count)
+    bars = resample(rows, minute, base_unit)
+    if len(bars) and bucket_start(int(rows['ts'][0]), minute) != rows['ts'][0]:
+        bars = bars[1:]
+    if len(bars) == 0:
+        raise ValueError('캔들정보가 비어 있습니다.')
+
+    return candles_to_dataframe(market, minute, bars[-count:])
+
+
+# 캔들 레코드 배열(시간 오름차순) -> DataFrame (분석용 컬럼)
+def candles_to_dataframe(market: str, minute: int, rows: np.ndarray):
+    # pandas는 import 비용이 커서(기동 시간) DataFrame이 필요한 경우에만 불러온다.
+    import pandas as pd
+
+    candle_date_time_utc = np.datetime_as_string(rows['ts'].astype('datetime64[s]'))
+    candle_date_time_kst = np.datetime_as_string((rows['ts'] + KST_OFFSET).astype('datetime64[s]'))
+
+    # 시간순(오름차순)으로 정렬되어 있고, 같은 시각의 중복 캔들은 저장소에서 제거된 상태
+    candle_all_data = pd.DataFrame({
+        'market': market,
+        'candle_date_time_utc': candle_date_time_utc,
+        'candle_date_time_kst': candle_date_time_kst,
+        'candle_acc_trade_price': rows['value'],
+        'unit': minute,
+    })
+    candle_all_data['date'] = candle_all_data.candle_date_time_kst.str.split('T').str[0]
+    candle_all_data['time'] = candle_all_data.candle_date_time_kst.str.split('T').str[1]
+
+    # 라이브러리에서 활용할 수 있도록 컬럼 값 형태 변경
+    candle_all_data['open'] = rows['open']  # 시가
+    candle_all_data['close'] = rows['close']  # 종가
+    candle_all_data['high'] = rows['high']  # 고가
+    candle_all_data['low'] = rows['low']  # 저가
+    candle_all_data['volume'] = rows['volume']  # 거래량
 
     return candle_all_data
+
+
+# 분 기준 캔들 1페이지(최대 200개) 조회 (asyncio 서버용)
+# 캔들 저장소 레코드 배열(시간 오름차순)로 반환한다.
+async def get_min_candles_async(market: str, minute: int, count: int = PAGE_SIZE, to: str = None) -> np.ndarray:
+    from utils.async_upbit_client import get_async_upbit_client
+
+    params = {"market": market, "count": min(count, PAGE_SIZE)}
+    if to:
+        params["to"] = to
+
+    candles = await get_async_upbit_client().get(f'/v1/candles/minutes/{minute}', params, priority=PRIORITY_LOW)
+    return to_records(candles)
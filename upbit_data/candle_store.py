@@ -0,0 +1,232 @@
+import os, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from utils.rate_limiter import PRIORITY_LOW
+from utils.upbit_client import get_upbit_client
+
+"""
+# 캔들 저장소 (Candle Store)
+
+분봉 데이터를 마켓/단위별 바이너리 파일(고정 크기 레코드, 시간 오름차순)로 디스크에 저장합니다.
+
+- 파일: {CANDLE_STORE_DIR}/{market}_{unit}.bin
+- 읽기: np.memmap으로 파일을 매핑하여 시간 범위를 복사 없이(zero-copy) 슬라이스
+- 갱신: 마지막으로 저장된 캔들 이후의 데이터만 조회
+- 최초 적재(backfill): 시간 구간별 페이지를 병렬로 조회 (주문보다 낮은 우선순위로 요청 수 제한 적용)
+
+레코드의 ts는 캔들 기준 시각(candle_date_time_utc)의 epoch 초입니다.
+"""
+
+CANDLE_STORE_DIR = os.getenv('CANDLE_STORE_DIR', 'data/candles')
+
+CANDLE_DTYPE = np.dtype([
+    ('ts', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+    ('value', '<f8'),  # 누적 거래 금액
+])
+
+# 업비트 캔들 조회 시 한 번에 가져올 수 있는 최대 개수
+PAGE_SIZE = 200
+
+# 최초 적재 시 마켓별 동시 요청 수 / 전체 동시 요청 수
+BACKFILL_WORKERS = 4
+MAX_INFLIGHT_REQUESTS = 8
+
+KST_OFFSET = 9 * 3600
+
+
+def to_records(candles: list) -> np.ndarray:
+    """
+    업비트 캔들 응답(list[dict])을 시간 오름차순의 레코드 배열로 변환합니다.
+    """
+    if not candles:
+        return np.empty(0, dtype=CANDLE_DTYPE)
+
+    rows = np.empty(len(candles), dtype=CANDLE_DTYPE)
+    rows['ts'] = np.array([c['candle_date_time_utc'] for c in candles], dtype='datetime64[s]').astype('<i8')
+    rows['open'] = [c['opening_price'] for c in candles]
+    rows['high'] = [c['high_price'] for c in candles]
+    rows['low'] = [c['low_price'] for c in candles]
+    rows['close'] = [c['trade_price'] for c in candles]
+    rows['volume'] = [c['candle_acc_trade_volume'] for c in candles]
+    rows['value'] = [c.get('candle_acc_trade_price', 0.0) for c in candles]
+
+    return _sort_unique(rows)
+
+
+def merge_records(pages: list) -> np.ndarray:
+    pages = [page for page in pages if len(page)]
+    if not pages:
+        return np.empty(0, dtype=CANDLE_DTYPE)
+    return _sort_unique(np.concatenate(pages))
+
+
+def _sort_unique(rows: np.ndarray) -> np.ndarray:
+    # 시간순 정렬 후 같은 시각의 중복 캔들 제거
+    rows.sort(order='ts')
+    _, unique_idx = np.unique(rows['ts'], return_index=True)
+    return rows[unique_idx]
+
+
+def format_utc(ts) -> str:
+    return str(np.datetime64(int(ts), 's'))
+
+
+class CandleStore:
+    """
+    마켓/단위별 분봉 저장소.
+
+    Args:
+        root (str): 저장 디렉토리
+    """
+
+    def __init__(self, root: str = CANDLE_STORE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+        self._locks = {}  # (market, unit) -> Lock
+        self._locks_guard = threading.Lock()
+        self._maps = {}  # (market, unit) -> (파일 크기, memmap)
+        self._inflight = threading.BoundedSemaphore(MAX_INFLIGHT_REQUESTS)
+
+    def _path(self, market: str, unit: int) -> str:
+        return os.path.join(self.root, f'{market}_{unit}.bin')
+
+    def _lock(self, market: str, unit: int) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((market, unit), threading.Lock())
+
+    # ========== 읽기 ==========
+
+    def _array(self, market: str, unit: int) -> np.ndarray:
+        path = self._path(market, unit)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size == 0:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+
+        cached = self._maps.get((market, unit))
+        if cached is not None and cached[0] == size:
+            return cached[1]
+
+        mapped = np.memmap(path, dtype=CANDLE_DTYPE, mode='r', shape=(size // CANDLE_DTYPE.itemsize,))
+        self._maps[(market, unit)] = (size, mapped)
+        return mapped
+
+    def read(self, market: str, unit: int, start: Optional[int] = None, end: Optional[int] = None) -> np.ndarray:
+        """
+        [start, end] 시간 범위(epoch 초)의 캔들을 반환합니다. 반환값은 파일에 매핑된 뷰(view)입니다.
+        """
+        arr = self._array(market, unit)
+        lo = 0 if start is None else int(np.searchsorted(arr['ts'], start, side='left'))
+        hi = len(arr) if end is None else int(np.searchsorted(arr['ts'], end, side='right'))
+        return arr[lo:hi]
+
+    def tail(self, market: str, unit: int, count: int) -> np.ndarray:
+        arr = self._array(market, unit)
+        return arr[max(len(arr) - count, 0):]
+
+    def last_ts(self, market: str, unit: int) -> Optional[int]:
+        arr = self._array(market, unit)
+        return int(arr['ts'][-1]) if len(arr) else None
+
+    # ========== 쓰기 ==========
+
+    def write(self, market: str, unit: int, rows: np.ndarray) -> int:
+        """
+        저장된 마지막 캔들 이후의 데이터만 추가합니다.
+        마지막 캔들과 같은 시각의 캔들은 (진행 중이던 캔들이므로) 덮어씁니다.
+
+        Returns:
+            int: 새로 추가된 캔들 수
+        """
+        if len(rows) == 0:
+            return 0
+
+        with self._lock(market, unit):
+            path = self._path(market, unit)
+            last = self.last_ts(market, unit)
+
+            if last is not None:
+                rows = rows[rows['ts'] >= last]
+                if len(rows) and rows['ts'][0] == last:
+                    with open(path, 'r+b') as f:
+                        f.seek(-CANDLE_DTYPE.itemsize, os.SEEK_END)
+                        f.write(rows[:1].tobytes())
+                    rows = rows[1:]
+
+            if len(rows):
+                with open(path, 'ab') as f:
+                    f.write(np.ascontiguousarray(rows, dtype=CANDLE_DTYPE).tobytes())
+
+            # 덮어쓴 경우 크기가 같아도 다시 매핑하도록 캐시 제거
+            self._maps.pop((market, unit), None)
+            return len(rows)
+
+    # ========== 업비트 동기화 ==========
+
+    def _fetch_page(self, market: str, unit: int, to: Optional[str] = None) -> np.ndarray:
+        params = {"market": market, "count": PAGE_SIZE}
+        if to:
+            params["to"] = to
+
+        # 여러 마켓을 동시에 적재하더라도 전체 동시 요청 수를 넘지 않도록 제한
+        # 초당 요청 수는 업비트 클라이언트의 요청 수 제한(candles 그룹, 낮은 우선순위)으로 조절
+        with self._inflight:
+            candles = get_upbit_client().get(f'/v1/candles/minutes/{unit}', params, priority=PRIORITY_LOW)
+        return to_records(candles)
+
+    def _fetch_pages(self, market: str, unit: int, pages: int) -> np.ndarray:
+        # 페이지별 조회 구간을 현재 시각 기준으로 미리 계산하여 병렬로 조회한다.
+        unit_sec = unit * 60
+        next_candle_ts = (int(time.time()) // unit_sec + 1) * unit_sec
+        to_list = [format_utc(next_candle_ts - i * PAGE_SIZE * unit_sec) for i in range(pages)]
+
+        if pages == 1:
+            return self._fetch_page(market, unit, to_list[0])
+
+        with ThreadPoolExecutor(max_workers=min(BACKFILL_WORKERS, pages)) as executor:
+            results = list(executor.map(lambda to: self._fetch_page(market, unit, to), to_list))
+
+        return merge_records(results)
+
+    def sync(self, market: str, unit: int, count: int = 1000) -> int:
+        """
+        업비트에서 저장소에 없는 캔들만 조회하여 저장합니다.
+
+        Args:
+            market (str): 마켓 (e.g. KRW-DOGE)
+            unit (int): 분 단위
+            count (int): 저장소가 비어 있을 때 적재할 캔들 수
+
+        Returns:
+            int: 새로 추가된 캔들 수
+        """
+        last = self.last_ts(market, unit)
+        if last is None:
+            missing = count
+        else:
+            # 마지막 캔들(진행 중이었을 수 있음)부터 현재 캔들까지
+            missing = (int(time.time()) - last) // (unit * 60) + 1
+
+        rows = self._fetch_pages(market, unit, max(-(-missing // PAGE_SIZE), 1))
+        return self.write(market, unit, rows)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_candle_store() -> CandleStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CandleStore()
+    return _store
@@ -0,0 +1,403 @@
+import json, os, threading, time, uuid
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+from upbit_data.candle_store import CANDLE_DTYPE, PAGE_SIZE, to_records, merge_records, format_utc
+from upbit_data.price_feed import UPBIT_WS_URL, UPBIT_WS_ENABLED
+from upbit_data.resampler import CandleResampler, bucket_start, RESAMPLE_UNITS, BASE_UNIT
+from utils.log_utils import setup_logging
+from utils.metrics import inc
+from utils.rate_limiter import PRIORITY_LOW
+from utils.upbit_client import get_upbit_client
+
+try:
+    import websocket  # websocket-client (없으면 REST 보충과 직접 넣은 체결만 사용)
+except ImportError:
+    websocket = None
+
+"""
+# 실시간 캔들 스트림 (Candle Stream)
+
+업비트 체결(trade) WebSocket을 구독하여 체결마다 진행 중인 1분봉을 갱신하고, 마감된 봉을 마켓/단위별 고정 크기 링 버퍼에 보관합니다.
+
+- 1분봉 마감: 다음 분의 체결이 들어오거나, 분이 끝나고 CANDLE_CLOSE_GRACE초가 지나면 (타이머 스레드)
+- 3/5/10/15/30/60/240분봉은 마감된 1분봉으로 만듦 (upbit_data/resampler.py), 거래가 없는 구간도 시간이 지나면 마감
+- 봉이 마감되면 subscribe()로 등록한 콜백을 callback(market, unit, bar) 형태로 호출 (EMA 엔진 갱신 등)
+- 링 버퍼: 단위별 최근 CANDLE_BUFFER_SIZE개 (np.ndarray, CANDLE_DTYPE)
+- 기동 / 재연결 시 빠진 1분봉만 REST(/v1/candles/minutes/1)로 조회하여 채움 (주문보다 낮은 우선순위)
+- 연결 전의 체결이 빠졌을 수 있는 분봉(연결 시점에 진행 중이던 분봉)은 마감 시 REST로 다시 조회
+- REST 조회는 lock 밖에서 하고, 조회하는 동안 마감된 봉은 보충한 봉 다음에 순서대로 반영 (체결 처리 / 조회를 막지 않음)
+
+같은 시각의 봉은 한 번만 발행되며, 시간 오름차순으로 발행됩니다.
+"""
+
+logger = setup_logging(__name__)
+
+# 마켓/단위별로 보관할 마감된 봉 수
+CANDLE_BUFFER_SIZE = int(os.getenv('CANDLE_BUFFER_SIZE', '1000'))
+
+# 분이 끝난 뒤 늦게 도착하는 체결을 기다리는 시간(초)
+CANDLE_CLOSE_GRACE = float(os.getenv('CANDLE_CLOSE_GRACE', '2'))
+
+# 재연결 시 REST로 채울 최대 1분봉 수 (더 오래 끊겼으면 상위 단위 봉은 다음 구간부터 다시 만듦)
+CANDLE_BACKFILL_MAX = int(os.getenv('CANDLE_BACKFILL_MAX', '1000'))
+
+
+class CandleRing:
+    """
+    고정 크기 캔들 링 버퍼 (가장 오래된 봉부터 덮어씀).
+
+    Args:
+        size (int): 보관할 봉 수
+    """
+
+    def __init__(self, size: int = CANDLE_BUFFER_SIZE):
+        self.size = size
+        self._rows = np.zeros(size, dtype=CANDLE_DTYPE)
+        self._count = 0  # 지금까지 추가된 봉 수
+
+    def __len__(self):
+        return min(self._count, self.size)
+
+    def append(self, rows: np.ndarray):
+        for row in rows[-self.size:]:
+            self._rows[self._count % self.size] = row
+            self._count += 1
+
+    def last_ts(self) -> Optional[int]:
+        return int(self._rows['ts'][(self._count - 1) % self.size]) if self._count else None
+
+    def to_array(self, count: Optional[int] = None) -> np.ndarray:
+        # 시간 오름차순 (복사본)
+        n = len(self) if count is None else min(count, len(self))
+        idx = np.arange(self._count - n, self._count) % self.size
+        return self._rows[idx]
+
+
+class _Market:
+    __slots__ = ('current', 'last_ts', 'since', 'complete_from', 'rings', 'backfills', 'backfilled', 'held')
+
+    def __init__(self, units: tuple, size: int):
+        self.current = None  # 진행 중인 1분봉 [ts, open, high, low, close, volume, value]
+        self.last_ts = None  # 마지막으로 마감된 1분봉 시각
+        self.since = None  # 상위 단위 봉을 빠짐없이 만들 수 있는 첫 시각 (처음 채운 구간의 시작)
+        self.complete_from = 0  # 이 시각(epoch 초) 이전에 시작한 분봉은 체결이 빠졌을 수 있음
+        self.rings = {unit: CandleRing(size) for unit in units}
+        self.backfills = 0  # 진행 중인 REST 보충 수
+        self.backfilled = []  # REST로 조회한 1분봉 (보충이 모두 끝나면 반영)
+        self.held = []  # 보충하는 동안 마감된 1분봉 (보충한 봉 다음에 반영)
+
+
+class CandleStream:
+    """
+    업비트 체결 스트림으로 마켓별 실시간 캔들을 만듭니다.
+
+    Args:
+        markets (Iterable[str]): 구독할 마켓 목록 (e.g. ["KRW-DOGE", "KRW-BTC"])
+        units (Iterable[int]): 1분봉 외에 만들 분봉 단위
+        buffer_size (int): 마켓/단위별로 보관할 마감된 봉 수
+        use_websocket (bool): 체결 WebSocket 사용 여부
+        ws_url (str): WebSocket 주소
+        grace (float): 분이 끝난 뒤 늦게 도착하는 체결을 기다리는 시간(초)
+    """
+
+    def __init__(self, markets: Iterable[str] = (), units: Iterable[int] = RESAMPLE_UNITS,
+                 buffer_size: int = CANDLE_BUFFER_SIZE, use_websocket: bool = UPBIT_WS_ENABLED,
+                 ws_url: str = UPBIT_WS_URL, grace: float = CANDLE_CLOSE_GRACE):
+        self._resampler = CandleResampler(units, BASE_UNIT, history=1)
+        self.units = (BASE_UNIT,) + self._resampler.units
+        self.buffer_size = buffer_size
+        self.grace = grace
+        self._use_websocket = use_websocket and websocket is not None
+        self._ws_url = ws_url
+
+        self._markets = {market: _Market(self.units, buffer_size) for market in markets}
+        self._callbacks = []
+        self._lock = threading.RLock()
+        self._ws = None
+        self._started = False
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        if self._use_websocket:
+            threading.Thread(target=self._ws_loop, name='candle-stream-ws', daemon=True).start()
+        threading.Thread(target=self._timer_loop, name='candle-stream-timer', daemon=True).start()
+
+    def add_markets(self, markets: Iterable[str]):
+        with self._lock:
+            new_markets = [market for market in markets if market not in self._markets]
+            if not new_markets:
+                return
+            for market in new_markets:
+                self._markets[market] = _Market(self.units, self.buffer_size)
+        if self._ws is not None:
+            # 새 마켓은 구독 전의 분봉을 REST로 채운 뒤 구독
+            self._backfill_all(new_markets)
+            self._subscribe()
+
+    def subscribe(self, callback: Callable[[str, int, np.void], None]):
+        """
+        봉 마감 이벤트를 받을 콜백을 등록합니다. 콜백은 스트림 스레드에서 시간 순서대로 호출되므로 오래 걸리지 않아야 합니다.
+
+        Args:
+            callback (Callable): callback(market, unit, bar) - bar는 CANDLE_DTYPE 레코드 (bar['ts'], bar['close'] 등)
+        """
+        self._callbacks.append(callback)
+
+    def candles(self, market: str, unit: int, count: Optional[int] = None) -> np.ndarray:
+        # 마감된 봉 (시간 오름차순, 최대 buffer_size개)
+        with self._lock:
+            state = self._markets.get(market)
+            if state is None or unit not in state.rings:
+                return np.empty(0, dtype=CANDLE_DTYPE)
+            return state.rings[unit].to_array(count)
+
+    def current(self, market: str) -> Optional[np.void]:
+        # 진행 중인 1분봉 (없으면 None)
+        with self._lock:
+            state = self._markets.get(market)
+            if state is None or state.current is None:
+                return None
+            return np.array([tuple(state.current)], dtype=CANDLE_DTYPE)[0]
+
+    # ========== 체결 -> 1분봉 ==========
+
+    def on_trade(self, market: str, price: float, volume: float, timestamp_ms: int):
+        """
+        체결 하나를 반영합니다. (WebSocket 메시지 처리, 테스트 시 직접 호출 가능)
+        """
+        minute = timestamp_ms // 60000 * 60
+        with self._lock:
+            state = self._markets.get(market)
+            if state is None:
+                return
+
+            current = state.current
+            if current is not None and minute > current[0]:
+                self._close_minute(market, state)
+                current = None
+
+            if current is None:
+                if state.last_ts is not None and minute <= state.last_ts:
+                    return  # 이미 마감된 분봉의 늦은 체결
+                state.current = [minute, price, price, price, price, volume, price * volume]
+            elif minute == current[0]:
+                if price > current[2]:
+                    current[2] = price
+                elif price < current[3]:
+                    current[3] = price
+                current[4] = price
+                current[5] += volume
+                current[6] += price * volume
+
+    def tick(self, now: Optional[float] = None):
+        """
+        시간이 지난 봉을 마감합니다. (체결이 없는 구간, 타이머 스레드에서 1초마다 호출)
+        """
+        until = int((time.time() if now is None else now) - self.grace)
+        with self._lock:
+            for market, state in self._markets.items():
+                if state.current is not None and state.current[0] + 60 <= until:
+                    self._close_minute(market, state)
+                # 보충 중인 마켓은 빠진 1분봉을 반영한 뒤에 상위 단위 봉을 마감
+                if not state.backfills:
+                    self._publish(market, state, self._resampler.advance(market, until))
+
+    def _close_minute(self, market: str, state: _Market):
+        current, state.current = state.current, None
+        if current[0] < state.complete_from:
+            # 연결 전의 체결이 빠졌을 수 있으므로 업비트의 분봉으로 대신함 (조회 실패 시 체결로 만든 봉 사용)
+            # 조회는 별도 스레드에서 하고, 체결로 만든 봉은 보충이 끝난 뒤 업비트 분봉이 없을 때만 반영
+            backfill = self._begin_backfill(market, state, current[0] + 60)
+            if backfill is not None:
+                threading.Thread(target=self._finish_backfill, args=(market, *backfill), name='candle-backfill',
+                                 daemon=True).start()
+        self._add_minutes(market, state, np.array([tuple(current)], dtype=CANDLE_DTYPE))
+
+    def _add_minutes(self, market: str, state: _Market, rows: np.ndarray):
+        # 마감된 1분봉(시간 오름차순) 반영 -> 링 버퍼 저장 / 상위 단위 봉 마감 / 이벤트 발행
+        if state.backfills:
+            state.held.append(rows)
+            return
+        if state.last_ts is not None:
+            rows = rows[rows['ts'] > state.last_ts]
+        if len(rows) == 0:
+            return
+
+        state.last_ts = int(rows['ts'][-1])
+        closed = self._resampler.update(market, rows, since=state.since)
+        self._publish(market, state, {BASE_UNIT: rows, **closed})
+
+    def _publish(self, market: str, state: _Market, closed: dict):
+        for unit in self.units:
+            bars = closed.get(unit)
+            if bars is None or len(bars) == 0:
+                continue
+
+            ring = state.rings[unit]
+            last_ts = ring.last_ts()
+            if last_ts is not None:
+                bars = bars[bars['ts'] > last_ts]
+            ring.append(bars)
+
+            for bar in bars:
+                for callback in self._callbacks:
+                    try:
+                        callback(market, unit, bar)
+                    except Exception:
+                        logger.exception("[%s] 캔들 마감 콜백 에러", market)
+
+    # ========== REST 보충 ==========
+
+    def _backfill_all(self, markets: Optional[Iterable[str]] = None):
+        # 현재 분 이전의 빠진 1분봉을 채우고, 이후의 분봉은 연결 시점부터 체결로 만든다. (markets가 None이면 전체)
+        now = time.time()
+        minute = int(now) // 60 * 60
+        backfills = []
+        with self._lock:
+            for market in (list(self._markets) if markets is None else markets):
+                state = self._markets[market]
+                if state.current is not None and state.current[0] < minute:
+                    state.current = None  # 끊긴 동안의 체결이 빠진 분봉 (REST로 채움)
+                state.complete_from = now
+                backfill = self._begin_backfill(market, state, minute)
+                if backfill is not None:
+                    backfills.append((market, backfill))
+
+        for market, (since, until) in backfills:
+            self._finish_backfill(market, since, until)
+
+    def _begin_backfill(self, market: str, state: _Market, until: int) -> Optional[tuple]:
+        """
+        state.last_ts 이후부터 until(미포함) 이전까지의 1분봉 보충을 시작합니다. (self._lock을 잡은 상태에서 호출)
+        _finish_backfill이 끝날 때까지 이 마켓의 마감된 봉은 반영하지 않고 모아 둡니다.
+
+        Returns:
+            Optional[tuple]: 조회할 구간 (since, until). 빠진 분봉이 없으면 None
+        """
+        if state.last_ts is None or until - state.last_ts > CANDLE_BACKFILL_MAX * 60:
+            # 처음이거나 너무 오래 끊겼으면 가장 큰 단위의 현재 구간부터 채워서 상위 단위 봉을 새로 시작
+            self._resampler.discard(market)
+            since = bucket_start(until - 60, self.units[-1])
+            state.since = since
+        else:
+            since = state.last_ts + 60
+        if since >= until:
+            return None
+
+        inc('tradehook_candle_backfills_total', 'REST backfills of the candle stream.', market=market)
+        state.backfills += 1
+        return since, until
+
+    def _finish_backfill(self, market: str, since: int, until: int):
+        # lock 밖에서 조회한 뒤, 보충이 모두 끝나면 조회한 봉 -> 그동안 마감된 봉 순서로 반영
+        try:
+            rows = self._fetch_minutes(market, since, until)
+        except Exception:
+            logger.exception("[%s] 캔들 보충 조회 실패", market)
+            rows = None
+
+        with self._lock:
+            state = self._markets[market]
+            state.backfills -= 1
+            if rows is None:
+                # 빠진 분봉이 있는 구간의 상위 단위 봉을 만들지 않도록 다음 분봉부터 다시 시작
+                self._resampler.discard(market)
+                state.since = None
+            else:
+                state.backfilled.append(rows[(rows['ts'] >= since) & (rows['ts'] < until)])
+            if state.backfills:
+                return
+
+            backfilled, state.backfilled = merge_records(state.backfilled), []
+            held, state.held = state.held, []
+            self._add_minutes(market, state, backfilled)
+            for rows in held:
+                self._add_minutes(market, state, rows)
+
+    @staticmethod
+    def _fetch_minutes(market: str, since: int, until: int) -> np.ndarray:
+        pages = []
+        to = until
+        while to > since:
+            params = {"market": market, "count": PAGE_SIZE, "to": format_utc(to)}
+            rows = to_records(get_upbit_client().get(f'/v1/candles/minutes/{BASE_UNIT}', params,
+                                                     priority=PRIORITY_LOW))
+            if len(rows) == 0:
+                break
+            pages.append(rows)
+            to = int(rows['ts'][0])
+        return merge_records(pages)
+
+    # ========== WebSocket (trade) ==========
+
+    def _timer_loop(self):
+        while True:
+            time.sleep(1)
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("캔들 마감 처리 에러")
+
+    def _subscribe(self):
+        ws = self._ws
+        if ws is None:
+            return
+        try:
+            ws.send(json.dumps([
+                {"ticket": uuid.uuid4().hex},
+                {"type": "trade", "codes": sorted(self._markets), "isOnlyRealtime": True},
+                {"format": "DEFAULT"},
+            ]))
+        except Exception:
+            pass  # 재연결 시 다시 구독
+
+    def _ws_loop(self):
+        def on_open(ws):
+            inc('tradehook_candle_stream_connects_total', 'Candle stream WebSocket connections.')
+            # 구독 시점 이전의 분봉은 REST로 채운다. (끊긴 동안의 분봉 포함)
+            self._backfill_all()
+            self._ws = ws
+            self._subscribe()
+
+        def on_message(ws, message):
+            try:
+                data = json.loads(message)
+            except ValueError:
+                return
+            if data.get('type') == 'trade' and 'code' in data:
+                self.on_trade(data['code'], float(data['trade_price']), float(data['trade_volume']),
+                              int(data['trade_timestamp']))
+
+        def on_close(ws, *args):
+            self._ws = None
+
+        while True:
+            ws_app = websocket.WebSocketApp(
+                self._ws_url,
+                on_open=on_open,
+                on_message=on_message,
+                on_close=on_close,
+                on_error=lambda ws, error: None,
+            )
+            ws_app.run_forever(ping_interval=60, ping_timeout=10)
+            self._ws = None
+            time.sleep(5)
+
+
+_stream = None
+_stream_lock = threading.Lock()
+
+
+def get_candle_stream() -> CandleStream:
+    global _stream
+    if _stream is None:
+        with _stream_lock:
+            if _stream is None:
+                _stream = CandleStream()
+                _stream.start()
+    return _stream
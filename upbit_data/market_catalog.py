@@ -0,0 +1,192 @@
+import os, threading, time
+from typing import Iterable
+
+from upbit_data.models import MarketInfo
+from utils.log_utils import setup_logging
+from utils.rate_limiter import PRIORITY_LOW
+from utils.upbit_client import get_upbit_client
+
+"""
+# 마켓 카탈로그 (Market Catalog)
+
+업비트 마켓 목록(/v1/market/all)과 마켓별 주문 가능 정보(/v1/orders/chance)를 한 번 조회하여 메모리에 보관하고,
+백그라운드에서 MARKET_CATALOG_REFRESH초마다 갱신합니다.
+
+- TradingView 심볼 -> 마켓 조회는 O(1) (e.g. DOGEKRW -> KRW-DOGE, BTCUSDT -> USDT-BTC)
+- 마켓별 최소 / 최대 주문 금액, 수수료, 수량 소수점 자릿수를 미리 계산하여 보관 (매매 시 추가 조회 없음)
+- 매매 대상 마켓은 기동 시 주문 가능 정보를 조회하고, 처음 보는 마켓은 백그라운드에서 한 번 조회 (그 전에는 quote별 기본값)
+  마켓 목록에 있는 마켓만 조회하며, 조회에 실패한 마켓은 MARKET_CHANCE_RETRY초 동안 다시 조회하지 않음
+- 카탈로그를 받기 전에는 알려진 quote(USDT, KRW, BTC)로 심볼을 나눔
+"""
+
+logger = setup_logging(__name__)
+
+# 마켓 목록 / 주문 가능 정보 갱신 주기(초)
+MARKET_CATALOG_REFRESH = float(os.getenv('MARKET_CATALOG_REFRESH', '3600'))
+
+# 주문 가능 정보 조회에 실패한 마켓을 다시 조회하기까지의 시간(초)
+MARKET_CHANCE_RETRY = float(os.getenv('MARKET_CHANCE_RETRY', '300'))
+
+# 카탈로그를 받기 전에 심볼을 나눌 때 사용하는 quote 화폐 (긴 것부터 비교)
+QUOTE_CURRENCIES = ('USDT', 'KRW', 'BTC')
+
+
+def parse_symbol(symbol: str) -> str:
+    # TradingView 심볼 -> 마켓 (e.g. DOGEKRW -> KRW-DOGE), 알 수 없는 quote는 뒤 3자리로 가정
+    for quote in QUOTE_CURRENCIES:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return f'{quote}-{symbol[:-len(quote)]}'
+    return f'{symbol[-3:]}-{symbol[:-3]}'
+
+
+class MarketCatalog:
+    """
+    업비트 마켓 카탈로그.
+
+    조회(market_for, get)는 잠금 없이 dict만 읽으며, 갱신 시에는 새 dict로 통째로 교체합니다.
+
+    Args:
+        refresh_interval (float): 갱신 주기(초)
+    """
+
+    def __init__(self, refresh_interval: float = MARKET_CATALOG_REFRESH, chance_retry: float = MARKET_CHANCE_RETRY):
+        self.refresh_interval = refresh_interval
+        self.chance_retry = chance_retry
+
+        self._markets = {}  # market -> MarketInfo
+        self._symbols = {}  # TradingView 심볼 -> market
+        self._chance_markets = set()  # 주문 가능 정보를 유지할 마켓 (매매 대상 + 매매한 마켓)
+        self._pending = set()  # 주문 가능 정보를 조회 중인 마켓
+        self._failed = {}  # 주문 가능 정보 조회에 실패한 마켓 -> 다시 조회할 수 있는 시각
+        self._lock = threading.Lock()  # 갱신 직렬화
+        self._started = False
+
+    def start(self, markets: Iterable[str] = ()):
+        # markets: 기동 시 주문 가능 정보를 조회할 마켓
+        with self._lock:
+            self._chance_markets = self._chance_markets | set(markets)
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._refresh_loop, name='market-catalog', daemon=True).start()
+
+    def _refresh_loop(self):
+        while True:
+            try:
+                self.load()
+                delay = self.refresh_interval
+            except Exception as e:
+                logger.error("마켓 정보 조회 실패: %s", e)
+                delay = min(self.refresh_interval, 60)
+            time.sleep(delay)
+
+    def load(self) -> int:
+        """
+        마켓 목록과 주문 가능 정보를 다시 조회합니다.
+
+        Returns:
+            int: 마켓 수
+        """
+        data = get_upbit_client().get('/v1/market/all', {"isDetails": "false"}, priority=PRIORITY_LOW)
+        if not isinstance(data, list):
+            raise ValueError(f"예상치 못한 마켓 응답 형식: {data}")
+
+        with self._lock:
+            markets = {}
+            for item in data:
+                info = MarketInfo.from_dict(item)
+                previous = self._markets.get(info.market)
+                # 주문 가능 정보는 아래에서 다시 조회할 때까지 이전 값을 사용
+                markets[info.market] = previous if previous is not None and previous.has_chance else info
+            self._markets = markets
+            self._symbols = {info.symbol: market for market, info in markets.items()}
+
+            chance_markets = sorted(market for market in self._chance_markets if market in markets)
+
+        for market in chance_markets:
+            try:
+                self.load_chance(market)
+            except Exception as e:
+                self._chance_failed(market, e)
+
+        return len(self._markets)
+
+    def load_chance(self, market: str) -> MarketInfo:
+        # 마켓별 주문 가능 정보(수수료, 최소 / 최대 주문 금액) 조회
+        data = get_upbit_client().get('/v1/orders/chance', {"market": market}, auth=True, priority=PRIORITY_LOW)
+        with self._lock:
+            info = self._markets.get(market) or MarketInfo.from_dict({'market': market})
+            info = info.with_chance(data)
+            self._markets = {**self._markets, market: info}
+            self._chance_markets = self._chance_markets | {market}
+            self._failed.pop(market, None)
+        return info
+
+    def _chance_failed(self, market: str, error: Exception):
+        # 실패한 마켓은 MARKET_CHANCE_RETRY초 동안 다시 조회하지 않음 (매 시그널마다 인증 요청을 보내지 않도록)
+        logger.warning("[%s] 주문 가능 정보 조회 실패: %s", market, error)
+        with self._lock:
+            self._failed[market] = time.time() + self.chance_retry
+
+    def _load_chance_later(self, market: str):
+        # 처음 보는 마켓: 매매 경로를 막지 않도록 백그라운드에서 한 번 조회 (마켓 목록에 있는 마켓만)
+        with self._lock:
+            if market not in self._markets or market in self._pending:
+                return
+            if self._failed.get(market, 0) > time.time():
+                return
+            self._pending.add(market)
+
+        def run():
+            try:
+                self.load_chance(market)
+            except Exception as e:
+                self._chance_failed(market, e)
+            finally:
+                with self._lock:
+                    self._pending.discard(market)
+
+        threading.Thread(target=run, name='market-chance', daemon=True).start()
+
+    def market_for(self, symbol: str) -> str:
+        """
+        TradingView 심볼(e.g. DOGEKRW, UPBIT:BTCUSDT) 혹은 마켓(e.g. KRW-DOGE) -> 마켓
+        """
+        symbol = symbol.rpartition(':')[2].upper()
+        if '-' in symbol:
+            return symbol
+        market = self._symbols.get(symbol)
+        return market if market is not None else parse_symbol(symbol)
+
+    def get(self, market: str) -> MarketInfo:
+        """
+        마켓의 주문 규칙. 주문 가능 정보를 아직 받지 못했으면 quote별 기본값을 반환하고 백그라운드에서 조회합니다.
+        """
+        info = self._markets.get(market)
+        if info is None:
+            return MarketInfo.from_dict({'market': market})
+        if not info.has_chance and self._started:
+            self._load_chance_later(market)
+        return info
+
+    def is_listed(self, market: str) -> bool:
+        # 업비트 마켓 목록에 있는 마켓인지 (마켓 목록을 받기 전에는 매매 대상 마켓)
+        markets = self._markets
+        return market in markets if markets else market in self._chance_markets
+
+    def markets(self) -> list:
+        return list(self._markets)
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_market_catalog() -> MarketCatalog:
+    # 조회만 하는 경우(e.g. 벤치마크, 백테스트)에는 업비트를 호출하지 않도록 start()는 기동 시(webserver.boot) 호출
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = MarketCatalog()
+    return _catalog
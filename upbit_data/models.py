@@ -0,0 +1,80 @@
+from decimal import Decimal
+from typing import Optional
+
+"""
+# 마켓 레코드
+
+업비트 마켓 정보(/v1/market/all)와 주문 가능 정보(/v1/orders/chance)를 매매에 바로 쓸 수 있는 값으로 변환하여 보관합니다.
+금액 / 수수료는 정밀도 유지를 위해 Decimal로 보관합니다.
+"""
+
+# 주문 가능 정보를 받기 전에 사용하는 마켓(quote)별 기본값 (업비트 공지 기준)
+DEFAULT_MIN_TOTAL = {'KRW': Decimal('5000'), 'BTC': Decimal('0.00005'), 'USDT': Decimal('0.5')}
+DEFAULT_FEE = {'KRW': Decimal('0.0005'), 'BTC': Decimal('0.0025'), 'USDT': Decimal('0.0025')}
+
+# 주문 수량 소수점 자릿수 (업비트는 모든 마켓에서 8자리까지 허용)
+VOLUME_DECIMALS = 8
+
+
+class MarketInfo:
+    # 여러 스레드가 공유하므로 만든 뒤에는 변경하지 않음 (주문 가능 정보는 with_chance로 새로 만듦)
+    __slots__ = ('market', 'quote', 'base', 'korean_name', 'english_name', 'bid_fee', 'ask_fee', 'min_total',
+                 'max_total', 'volume_decimals', 'has_chance')
+
+    def __init__(self, market: str, quote: str, base: str, korean_name: str = '', english_name: str = '',
+                 bid_fee: Decimal = Decimal('0.0005'), ask_fee: Decimal = Decimal('0.0005'),
+                 min_total: Decimal = Decimal('5000'), max_total: Optional[Decimal] = None,
+                 volume_decimals: int = VOLUME_DECIMALS, has_chance: bool = False):
+        self.market = market  # KRW-DOGE
+        self.quote = quote  # KRW
+        self.base = base  # DOGE
+        self.korean_name = korean_name
+        self.english_name = english_name
+        self.bid_fee = bid_fee
+        self.ask_fee = ask_fee
+        self.min_total = min_total  # 최소 주문 금액 (quote 화폐)
+        self.max_total = max_total  # 최대 주문 금액 (quote 화폐)
+        self.volume_decimals = volume_decimals
+        self.has_chance = has_chance  # 주문 가능 정보(/v1/orders/chance)로 받은 값인지
+
+    @property
+    def symbol(self) -> str:
+        # TradingView 심볼 (e.g. DOGEKRW, BTCUSDT)
+        return f'{self.base}{self.quote}'
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'MarketInfo':
+        # /v1/market/all 항목 -> 기본 주문 규칙
+        market = data['market']
+        quote, _, base = market.partition('-')
+        return cls(
+            market=market,
+            quote=quote,
+            base=base,
+            korean_name=data.get('korean_name', ''),
+            english_name=data.get('english_name', ''),
+            bid_fee=DEFAULT_FEE.get(quote, Decimal('0.0025')),
+            ask_fee=DEFAULT_FEE.get(quote, Decimal('0.0025')),
+            min_total=DEFAULT_MIN_TOTAL.get(quote, Decimal('0')),
+        )
+
+    def with_chance(self, data: dict) -> 'MarketInfo':
+        # /v1/orders/chance 응답의 수수료 / 최소 / 최대 주문 금액 반영
+        market = data.get('market') or {}
+        bid = market.get('bid') or {}
+        ask = market.get('ask') or {}
+        min_totals = [Decimal(str(side['min_total'])) for side in (bid, ask) if side.get('min_total')]
+        max_total = market.get('max_total')
+        return MarketInfo(
+            market=self.market,
+            quote=self.quote,
+            base=self.base,
+            korean_name=self.korean_name,
+            english_name=self.english_name,
+            bid_fee=Decimal(str(data.get('bid_fee', self.bid_fee))),
+            ask_fee=Decimal(str(data.get('ask_fee', self.ask_fee))),
+            min_total=max(min_totals) if min_totals else self.min_total,
+            max_total=Decimal(str(max_total)) if max_total else self.max_total,
+            volume_decimals=self.volume_decimals,
+            has_chance=True,
+        )
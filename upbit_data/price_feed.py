@@ -0,0 +1,214 @@
+import json, os, threading, time, uuid
+from typing import Callable, Iterable, Optional, Tuple
+
+from upbit_data.market_catalog import get_market_catalog
+from utils.convert_utils import get_trade_prices, get_trade_prices_async
+
+try:
+    import websocket  # websocket-client (없으면 REST 조회만 사용)
+except ImportError:
+    websocket = None
+
+"""
+# 현재가 피드 (Price Feed)
+
+업비트 시세(ticker) WebSocket을 구독하여 마켓별 최신 체결가를 메모리(dict)에 보관합니다.
+
+- 조회는 O(1) (네트워크 호출 없음)
+- WebSocket 데이터가 오래되었으면(PRICE_MAX_AGE 초과) 오래된 마켓을 모아 한 번의 REST 요청(/v1/ticker?markets=A,B,C)으로 갱신
+- 가격과 함께 경과 시간(age, 초)을 반환하여 호출하는 쪽에서 오래된 가격을 거부할 수 있음
+- 마켓 카탈로그에 있는 마켓만 구독 / 묶어서 조회 (업비트는 없는 마켓이 하나라도 있으면 묶음 전체를 404로 거부)
+  카탈로그에 없는 마켓(e.g. 잘못된 알림)은 따로 조회하고 구독하지 않음
+"""
+
+UPBIT_WS_URL = os.getenv('UPBIT_WS_URL', 'wss://api.upbit.com/websocket/v1')
+UPBIT_WS_ENABLED = os.getenv('UPBIT_WS_ENABLED', '1') == '1'
+
+# 이 시간(초)보다 오래된 WebSocket 가격은 REST로 다시 조회
+PRICE_MAX_AGE = float(os.getenv('PRICE_MAX_AGE', '3'))
+
+
+class PriceFeed:
+    """
+    마켓별 최신 체결가 피드.
+
+    Args:
+        markets (Iterable[str]): 구독할 마켓 목록 (e.g. ["KRW-DOGE", "KRW-BTC"])
+        use_websocket (bool): 시세 WebSocket 사용 여부
+        ws_url (str): WebSocket 주소
+        max_age (float): REST로 다시 조회하기 전까지 허용하는 가격 경과 시간(초)
+        is_listed (Callable): 구독 / 묶음 조회할 마켓인지 (기본: 마켓 카탈로그에 있는 마켓)
+    """
+
+    def __init__(self, markets: Iterable[str] = (), use_websocket: bool = UPBIT_WS_ENABLED,
+                 ws_url: str = UPBIT_WS_URL, max_age: float = PRICE_MAX_AGE,
+                 is_listed: Optional[Callable[[str], bool]] = None):
+        self._markets = set(markets)
+        self._is_listed = is_listed or (lambda market: get_market_catalog().is_listed(market))
+        self._use_websocket = use_websocket and websocket is not None
+        self._ws_url = ws_url
+        self.max_age = max_age
+
+        self._prices = {}  # market -> (trade_price, 수신 시각)
+        self._lock = threading.Lock()
+        self._ws = None
+        self._started = False
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        if self._use_websocket:
+            threading.Thread(target=self._ws_loop, name='price-feed-ws', daemon=True).start()
+
+    def add_markets(self, markets: Iterable[str]):
+        with self._lock:
+            new_markets = set(markets) - self._markets
+            if not new_markets:
+                return
+            self._markets |= new_markets
+        self._subscribe()
+
+    def update(self, market: str, trade_price: float, received_at: Optional[float] = None):
+        self._prices[market] = (trade_price, received_at if received_at is not None else time.time())
+
+    def age(self, market: str) -> Optional[float]:
+        entry = self._prices.get(market)
+        return None if entry is None else time.time() - entry[1]
+
+    def get_price(self, market: str, max_age: Optional[float] = None) -> Tuple[Optional[float], Optional[float]]:
+        """
+        최신 체결가와 경과 시간(초)을 반환합니다. 가격이 오래되었으면 REST로 다시 조회합니다.
+
+        Returns:
+            Tuple[Optional[float], Optional[float]]: (trade_price, age) - 조회 실패 시 마지막으로 알고 있는 값
+        """
+        max_age = self.max_age if max_age is None else max_age
+        listed = self._track(market)
+
+        entry = self._prices.get(market)
+        if entry is None or time.time() - entry[1] > max_age:
+            if listed:
+                self.refresh(extra=[market])
+            else:
+                self._fetch([market])
+            entry = self._prices.get(market)
+
+        if entry is None:
+            return None, None
+        return entry[0], time.time() - entry[1]
+
+    async def get_price_async(self, market: str,
+                              max_age: Optional[float] = None) -> Tuple[Optional[float], Optional[float]]:
+        """
+        get_price()의 asyncio 버전. 가격이 오래되었으면 이벤트 루프를 막지 않고 REST로 다시 조회합니다.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        self._track(market)
+
+        entry = self._prices.get(market)
+        if entry is None or time.time() - entry[1] > max_age:
+            try:
+                prices = await get_trade_prices_async([market])
+            except Exception:
+                prices = {}  # 마지막으로 알고 있는 가격(및 경과 시간)을 그대로 사용
+
+            received_at = time.time()
+            for price_market, trade_price in prices.items():
+                self.update(price_market, trade_price, received_at)
+            entry = self._prices.get(market)
+
+        if entry is None:
+            return None, None
+        return entry[0], time.time() - entry[1]
+
+    def _track(self, market: str) -> bool:
+        # 카탈로그에 있는 마켓이면 구독 대상에 추가. 없는 마켓은 구독 / 묶음 조회하지 않음
+        if market in self._markets:
+            return True
+        if not self._is_listed(market):
+            return False
+        self.add_markets([market])
+        return True
+
+    def refresh(self, extra: Iterable[str] = ()):
+        # 오래된 마켓을 모아 한 번에 조회 (카탈로그에 없는 마켓은 묶음에 넣지 않음)
+        now = time.time()
+        with self._lock:
+            markets = set(self._markets)
+        stale = {market for market in markets
+                 if market not in self._prices or now - self._prices[market][1] > self.max_age}
+        stale |= set(extra)
+        stale = {market for market in stale if self._is_listed(market)}
+        if stale:
+            self._fetch(sorted(stale))
+
+    def _fetch(self, markets: list):
+        try:
+            prices = get_trade_prices(markets)
+        except Exception:
+            return  # 마지막으로 알고 있는 가격(및 경과 시간)을 그대로 사용
+
+        received_at = time.time()
+        for market, trade_price in prices.items():
+            self.update(market, trade_price, received_at)
+
+    # ========== WebSocket (ticker) ==========
+
+    def _subscribe(self):
+        ws = self._ws
+        if ws is None:
+            return
+        with self._lock:
+            codes = sorted(self._markets)
+        try:
+            ws.send(json.dumps([
+                {"ticket": uuid.uuid4().hex},
+                {"type": "ticker", "codes": codes, "isOnlyRealtime": True},
+                {"format": "DEFAULT"},
+            ]))
+        except Exception:
+            pass  # 재연결 시 다시 구독
+
+    def _ws_loop(self):
+        def on_open(ws):
+            self._ws = ws
+            self._subscribe()
+
+        def on_message(ws, message):
+            try:
+                data = json.loads(message)
+            except ValueError:
+                return
+            if data.get('type') == 'ticker' and 'code' in data:
+                self.update(data['code'], data['trade_price'])
+
+        def on_close(ws, *args):
+            self._ws = None
+
+        while True:
+            ws_app = websocket.WebSocketApp(
+                self._ws_url,
+                on_open=on_open,
+                on_message=on_message,
+                on_close=on_close,
+                on_error=lambda ws, error: None,
+            )
+            ws_app.run_forever(ping_interval=60, ping_timeout=10)
+            self._ws = None
+            time.sleep(5)
+
+
+_feed = None
+_feed_lock = threading.Lock()
+
+
+def get_price_feed() -> PriceFeed:
+    global _feed
+    if _feed is None:
+        with _feed_lock:
+            if _feed is None:
+                _feed = PriceFeed()
+                _feed.start()
+    return _feed
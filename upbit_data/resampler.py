@@ -0,0 +1,247 @@
+import threading
+from typing import Iterable, Optional
+
+import numpy as np
+
+from upbit_data.candle_store import CANDLE_DTYPE
+
+"""
+# 분봉 리샘플러 (Candle Resampler)
+
+하나의 기준 분봉(기본 1분봉)으로 3/5/10/15/30/60/240분봉을 만듭니다.
+분봉 단위마다 업비트에서 따로 조회 / 저장하지 않아도 되므로, 여러 단위를 사용해도 REST 요청과 저장 공간은 기준 분봉 하나만큼만 사용합니다.
+
+- 구간 경계: ts // (unit * 60) * (unit * 60) (UTC epoch 기준, 업비트 분봉의 candle_date_time_utc와 같은 시각)
+- 시가 / 종가는 구간의 첫 / 마지막 기준 분봉, 고가 / 저가는 최댓값 / 최솟값, 거래량 / 거래 금액은 합계 (NumPy reduceat)
+- 거래가 없는 구간은 업비트와 같이 캔들을 만들지 않음
+- CandleResampler: 새 기준 분봉이 들어올 때마다 진행 중인 구간만 다시 계산하고, 다음 구간의 분봉이 들어오거나
+  구간의 끝 시각이 지나면(advance) 마감된 봉을 반환
+
+결과는 캔들 저장소와 같은 레코드 배열(CANDLE_DTYPE)이며, candle.candles_to_dataframe으로 분석용 DataFrame으로 변환할 수 있습니다.
+"""
+
+BASE_UNIT = 1
+RESAMPLE_UNITS = (3, 5, 10, 15, 30, 60, 240)
+
+
+def bucket_start(ts, unit: int):
+    # 캔들 시각(epoch 초) -> unit분봉의 기준 시각
+    unit_sec = unit * 60
+    return ts // unit_sec * unit_sec
+
+
+def check_unit(unit: int, base_unit: int = BASE_UNIT):
+    # 하루(1440분)를 나누어 떨어지게 하는 단위만 업비트 분봉과 경계가 같다.
+    if unit % base_unit != 0 or 1440 % unit != 0:
+        raise ValueError(f'{base_unit}분봉으로 {unit}분봉을 만들 수 없습니다.')
+
+
+def resample(rows: np.ndarray, unit: int, base_unit: int = BASE_UNIT) -> np.ndarray:
+    """
+    기준 분봉(시간 오름차순, 같은 시각 중복 없음)을 unit분봉으로 변환합니다.
+
+    Args:
+        rows (np.ndarray): 기준 분봉 레코드 배열 (CANDLE_DTYPE)
+        unit (int): 만들 분봉 단위
+        base_unit (int): rows의 분봉 단위
+
+    Returns:
+        np.ndarray: unit분봉 레코드 배열 (CANDLE_DTYPE, 시간 오름차순)
+    """
+    check_unit(unit, base_unit)
+    if len(rows) == 0:
+        return np.empty(0, dtype=CANDLE_DTYPE)
+
+    buckets = bucket_start(rows['ts'], unit)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(rows)] - 1
+
+    bars = np.empty(len(starts), dtype=CANDLE_DTYPE)
+    bars['ts'] = buckets[starts]
+    bars['open'] = rows['open'][starts]
+    bars['high'] = np.maximum.reduceat(rows['high'], starts)
+    bars['low'] = np.minimum.reduceat(rows['low'], starts)
+    bars['close'] = rows['close'][ends]
+    bars['volume'] = np.add.reduceat(rows['volume'], starts)
+    bars['value'] = np.add.reduceat(rows['value'], starts)
+    return bars
+
+
+def _merge_latest(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    # 시간순으로 합치고, 같은 시각의 분봉은 나중에 들어온 것(진행 중이던 분봉의 갱신)을 사용
+    if len(old) == 0:
+        return np.array(new, dtype=CANDLE_DTYPE)
+    if len(new) == 1 or np.all(new['ts'][1:] > new['ts'][:-1]):
+        # 대부분의 경우: 마지막 분봉의 갱신 혹은 이후 분봉 추가
+        if new['ts'][0] > old['ts'][-1]:
+            return np.concatenate([old, new])
+        if new['ts'][0] == old['ts'][-1]:
+            return np.concatenate([old[:-1], new])
+
+    rows = np.concatenate([old, new])
+    rows = rows[np.argsort(rows['ts'], kind='stable')]
+    last = np.r_[rows['ts'][1:] != rows['ts'][:-1], True]
+    return rows[last]
+
+
+class _Series:
+    __slots__ = ('tail', 'closed', 'next_start', 'next_close')
+
+    def __init__(self, units: tuple):
+        self.tail = np.empty(0, dtype=CANDLE_DTYPE)  # 아직 마감되지 않은 구간의 기준 분봉
+        self.closed = {unit: np.empty(0, dtype=CANDLE_DTYPE) for unit in units}  # 마감된 봉
+        self.next_start = {}  # unit -> 아직 마감하지 않은 첫 구간의 기준 시각
+        self.next_close = 0  # 가장 먼저 마감되는 구간의 끝 시각
+
+
+class CandleResampler:
+    """
+    마켓별 기준 분봉을 받아서 여러 단위의 분봉을 점진적으로 만듭니다.
+
+    Args:
+        units (Iterable[int]): 만들 분봉 단위
+        base_unit (int): 입력 분봉 단위
+        history (int): 단위별로 보관할 마감된 봉 수
+    """
+
+    def __init__(self, units: Iterable[int] = RESAMPLE_UNITS, base_unit: int = BASE_UNIT, history: int = 1000):
+        self.units = tuple(sorted(set(units)))
+        for unit in self.units:
+            check_unit(unit, base_unit)
+        self.base_unit = base_unit
+        self.history = history
+
+        self._series = {}  # market -> _Series
+        self._lock = threading.Lock()
+
+    def seed(self, market: str, rows: np.ndarray) -> dict:
+        """
+        보관 중인 봉을 버리고 기준 분봉(e.g. 캔들 저장소의 tail)으로 다시 만듭니다.
+
+        Returns:
+            dict: unit -> 마감된 봉
+        """
+        with self._lock:
+            self._series.pop(market, None)
+        self.update(market, rows)
+        return {unit: self.bars(market, unit, partial=False) for unit in self.units}
+
+    def update(self, market: str, rows: np.ndarray, since: Optional[int] = None) -> dict:
+        """
+        새 기준 분봉(진행 중인 분봉의 갱신 포함)을 반영합니다.
+
+        이미 마감된 구간의 분봉은 무시하며, 처음 받은 분봉이 구간 중간에서 시작하면 그 구간은 (일부만 있으므로) 마감하지 않습니다.
+
+        Args:
+            since (Optional[int]): 처음 받는 분봉이면, 이 시각(epoch 초) 이후의 분봉을 빠짐없이 받은 것으로 봄
+
+        Returns:
+            dict: unit -> 이번에 새로 마감된 봉 (없으면 포함하지 않음)
+        """
+        if len(rows) == 0:
+            return {}
+
+        with self._lock:
+            series = self._series.get(market)
+            if series is None:
+                series = self._series[market] = _Series(self.units)
+                first_ts = int(rows['ts'].min()) if since is None else int(since)
+                for unit in self.units:
+                    start = bucket_start(first_ts, unit)
+                    series.next_start[unit] = start if start == first_ts else start + unit * 60
+                series.next_close = self._next_close(series)
+
+            floor = min(series.next_start.values())
+            rows = np.asarray(rows, dtype=CANDLE_DTYPE)
+            tail = _merge_latest(series.tail, rows[rows['ts'] >= floor])
+            if len(tail) == 0:
+                return {}
+
+            series.tail = tail
+            return self._close(series, int(tail['ts'][-1]))
+
+    def advance(self, market: str, until_ts: int) -> dict:
+        """
+        until_ts(epoch 초) 이전에 끝난 구간을 마감합니다. (다음 구간에 거래가 없어서 기준 분봉이 들어오지 않는 경우)
+
+        Returns:
+            dict: unit -> 이번에 새로 마감된 봉
+        """
+        with self._lock:
+            series = self._series.get(market)
+            if series is None:
+                return {}
+            return self._close(series, until_ts)
+
+    def _close(self, series: _Series, until_ts: int) -> dict:
+        # until_ts가 속한 구간 이전의 구간을 마감. self._lock을 잡은 상태에서 호출
+        closed = {}
+        if until_ts < series.next_close:
+            # 마감되는 구간이 없음 (대부분의 갱신)
+            return closed
+
+        tail = series.tail
+        for unit in self.units:
+            open_start = bucket_start(until_ts, unit)
+            next_start = series.next_start[unit]
+            if open_start <= next_start:
+                continue
+
+            done = tail[(tail['ts'] >= next_start) & (tail['ts'] < open_start)]
+            bars = resample(done, unit, self.base_unit)
+            if len(bars):
+                series.closed[unit] = np.concatenate([series.closed[unit], bars])[-self.history:]
+                closed[unit] = bars
+            series.next_start[unit] = open_start
+
+        series.tail = tail[tail['ts'] >= min(series.next_start.values())]
+        series.next_close = self._next_close(series)
+        return closed
+
+    def _next_close(self, series: _Series) -> int:
+        # 단위가 서로 배수가 아닐 수 있으므로(e.g. 3분봉과 10분봉) 단위별 구간 끝 시각 중 가장 이른 시각
+        return min(start + unit * 60 for unit, start in series.next_start.items())
+
+    def partial(self, market: str, unit: int) -> Optional[np.ndarray]:
+        # 진행 중인 봉 (1개짜리 레코드 배열, 없으면 None)
+        with self._lock:
+            series = self._series.get(market)
+            if series is None:
+                return None
+            rows = series.tail[series.tail['ts'] >= series.next_start[unit]]
+        bars = resample(rows, unit, self.base_unit)
+        return bars if len(bars) else None
+
+    def bars(self, market: str, unit: int, count: Optional[int] = None, partial: bool = True) -> np.ndarray:
+        """
+        unit분봉을 시간 오름차순으로 반환합니다. (partial이면 마지막에 진행 중인 봉 포함)
+        """
+        with self._lock:
+            series = self._series.get(market)
+            closed = series.closed[unit] if series is not None else np.empty(0, dtype=CANDLE_DTYPE)
+
+        current = self.partial(market, unit) if partial else None
+        bars = np.concatenate([closed, current]) if current is not None else closed
+        return bars if count is None else bars[max(len(bars) - count, 0):]
+
+    def discard(self, market: str):
+        # 기준 분봉이 빠진 경우(e.g. 긴 연결 끊김) 보관 중인 상태를 버리고 다음 분봉부터 다시 시작
+        with self._lock:
+            self._series.pop(market, None)
+
+    def markets(self) -> list:
+        with self._lock:
+            return list(self._series)
+
+
+_resampler = None
+_resampler_lock = threading.Lock()
+
+
+def get_candle_resampler() -> CandleResampler:
+    global _resampler
+    if _resampler is None:
+        with _resampler_lock:
+            if _resampler is None:
+                _resampler = CandleResampler()
+    return _resampler
@@ -0,0 +1,197 @@
+import asyncio, os, threading, time
+from typing import Optional
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from utils.metrics import span
+from utils.resilience import DeadlineExceeded, CircuitOpenError, remaining
+from utils.upbit_client import UpbitClient, UpbitCall, UPBIT_API_URL, UPBIT_HEDGE_ENABLED, access_key, secret_key
+
+"""
+# 업비트 REST 클라이언트 (asyncio)
+
+asyncio 서버(async_server.py)에서 사용하는 업비트 클라이언트입니다. 동기 클라이언트(utils/upbit_client.py)와 동작이 같습니다.
+
+- 하나의 aiohttp ClientSession(HTTP/1.1 keep-alive 커넥션 풀)을 공유
+- JWT 인증 / query_hash 서명, 엔드포인트별 타임아웃은 동기 클라이언트의 것을 그대로 사용
+- 재시도 / 기한 / 서킷 브레이커 / 헤지 판단은 동기 클라이언트와 같은 UpbitCall을 사용하고, 이 클라이언트는 전송(aiohttp)과
+  대기(asyncio.sleep)만 담당
+- 요청 수 제한은 동기 경로와 같은 버킷을 사용하고, 토큰이 없으면 이벤트 루프를 막지 않고 대기
+- 지표(처리 시간, 대기 시간, 재시도 / 429 응답 수)도 동기 클라이언트와 같은 이름으로 기록
+
+aiohttp가 설치되어 있어야 합니다. (동기 서버 webserver.py는 aiohttp 없이 동작)
+"""
+
+# 커넥션 풀 크기 (업비트 그룹별 초당 요청 수 제한이 있으므로 크게 잡을 필요는 없음)
+ASYNC_UPBIT_POOL_SIZE = int(os.getenv('ASYNC_UPBIT_POOL_SIZE', '20'))
+
+
+class AsyncUpbitClient:
+    """
+    업비트 REST API 클라이언트 (asyncio).
+
+    세션은 처음 요청하는 이벤트 루프에서 만들어지므로, 하나의 이벤트 루프에서만 사용합니다.
+
+    Args:
+        base_url (str): API 주소 (테스트 시 로컬 서버로 변경 가능)
+        access_key (str): 업비트 Access Key
+        secret_key (str): 업비트 Secret Key
+        pool_size (int): 커넥션 풀 크기
+        max_retries (int): GET 요청 최대 재시도 횟수
+        backoff (float): 재시도 백오프 기본 시간(초)
+        hedge (bool): 느린 조회 요청의 헤지 요청 사용 여부
+    """
+
+    def __init__(self, base_url: str = UPBIT_API_URL, access_key: str = access_key, secret_key: str = secret_key,
+                 pool_size: int = ASYNC_UPBIT_POOL_SIZE, max_retries: int = 3, backoff: float = 0.2,
+                 hedge: bool = UPBIT_HEDGE_ENABLED):
+        if aiohttp is None:
+            raise RuntimeError('asyncio 클라이언트를 사용하려면 aiohttp를 설치해야 합니다. (pip install aiohttp)')
+
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.hedge = hedge
+
+        # 서명 / 타임아웃 규칙은 동기 클라이언트와 공유
+        self._signer = UpbitClient(base_url, access_key, secret_key, pool_size=1)
+        self._session: Optional['aiohttp.ClientSession'] = None
+
+    def _get_session(self) -> 'aiohttp.ClientSession':
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, headers={"Accept": "application/json"})
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def request(self, method: str, path: str, params: Optional[dict] = None, auth: bool = False,
+                      priority: Optional[str] = None):
+        # 재시도를 포함한 전체 처리 시간을 엔드포인트 / HTTP 상태 코드별로 기록
+        with span('upbit.request', endpoint=path, method=method) as request_span:
+            return await self._request(method, path, params, auth, priority, request_span)
+
+    async def _request(self, method: str, path: str, params: Optional[dict], auth: bool, priority: Optional[str],
+                       request_span):
+        url = self.base_url + path
+        call = UpbitCall(method, path, priority, self.max_retries, self.backoff, self.hedge)
+
+        # aiohttp는 query 값으로 문자열만 받으므로, 서명한 것과 같은 query string을 그대로 사용
+        query = self._signer.query_string(params) if method in ('GET', 'DELETE') else ''
+        if query:
+            url = f'{url}?{query}'
+
+        while True:
+            try:
+                # 서킷이 차단되어 있으면 요청 수 제한 토큰을 쓰지 않고 바로 실패
+                call.check()
+                call.waited(await call.limiter.acquire_async(call.group, priority))
+                connect_timeout, read_timeout = call.prepare()
+            except (DeadlineExceeded, CircuitOpenError) as e:
+                request_span.tag(status=type(e).__name__)
+                raise
+
+            # prepare 이후에는 어떻게 끝나든 서킷에 결과를 기록 (시험 요청이 남아 있으면 서킷이 계속 차단됨)
+            try:
+                timeout = aiohttp.ClientTimeout(total=remaining(), sock_connect=connect_timeout,
+                                                sock_read=read_timeout)
+                if call.hedge:
+                    status, text = await self._send_hedged(call, url, params, auth, timeout)
+                else:
+                    status, text = await self._send(call, url, params, auth, timeout)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                delay = call.on_error(e)
+                if delay is None:
+                    request_span.tag(status=type(e).__name__)
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except BaseException as e:
+                call.on_abort()
+                request_span.tag(status=type(e).__name__)
+                raise
+
+            delay = call.on_response(status)
+            if delay is not None:
+                await asyncio.sleep(delay)
+                continue
+
+            request_span.tag(status=str(status))
+            return call.result(status, text)
+
+    async def _send(self, call: UpbitCall, url: str, params: Optional[dict], auth: bool,
+                    timeout: 'aiohttp.ClientTimeout') -> tuple:
+        # nonce가 매번 달라야 하므로 요청(재시도, 헤지)마다 다시 서명한다.
+        headers = self._signer.auth_headers(params) if auth else None
+        session = self._get_session()
+
+        start = time.perf_counter()
+        if call.method in ('GET', 'DELETE'):
+            response = await session.request(call.method, url, headers=headers, timeout=timeout)
+        else:
+            response = await session.request(call.method, url, json=params, headers=headers, timeout=timeout)
+        async with response:
+            text = await response.text()
+
+        call.observe(response.status, response.headers, time.perf_counter() - start)
+        return response.status, text
+
+    async def _send_hedged(self, call: UpbitCall, url: str, params: Optional[dict], auth: bool,
+                           timeout: 'aiohttp.ClientTimeout') -> tuple:
+        # 응답이 p95보다 늦으면 같은 요청을 한 번 더 보내고 먼저 온 응답을 사용 (멱등 조회만)
+        delay = call.hedge_delay()
+        if delay is None:
+            return await self._send(call, url, params, auth, timeout)
+
+        primary = asyncio.ensure_future(self._send(call, url, params, auth, timeout))
+        done, _ = await asyncio.wait([primary], timeout=delay)
+        if done or not call.start_hedge():
+            return await primary
+
+        hedged = asyncio.ensure_future(self._send(call, url, params, auth, timeout))
+
+        pending = {primary, hedged}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedged:
+                            call.hedge_won()
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            # 늦은 쪽은 취소 (커넥션은 풀로 돌아가지 않고 닫힘)
+            for task in pending:
+                task.cancel()
+
+    async def get(self, path: str, params: Optional[dict] = None, auth: bool = False, priority: Optional[str] = None):
+        return await self.request('GET', path, params=params, auth=auth, priority=priority)
+
+    async def post(self, path: str, params: Optional[dict] = None, auth: bool = True):
+        return await self.request('POST', path, params=params, auth=auth)
+
+    async def delete(self, path: str, params: Optional[dict] = None, auth: bool = True):
+        return await self.request('DELETE', path, params=params, auth=auth)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_async_upbit_client() -> AsyncUpbitClient:
+    # 프로세스 전체에서 하나의 클라이언트(커넥션 풀)를 공유한다.
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = AsyncUpbitClient()
+    return _client
@@ -0,0 +1,134 @@
+import atexit, json, os, threading, time
+from typing import Callable, Optional
+
+from utils.log_utils import setup_logging
+
+"""
+# 체크포인트 (Checkpoint)
+
+재시작(배포, 장애) 직후 바로 알림을 처리할 수 있도록, 메모리에만 있던 상태를 작은 JSON 파일로 저장하고 기동 시 복원합니다.
+
+- 저장 대상은 구간(section)별로 등록 (e.g. EMA 상태와 마지막 캔들 시각, 티커별 레짐, 중복 검사 키)
+- CHECKPOINT_INTERVAL초마다, 그리고 프로세스 종료 시 저장
+- 임시 파일에 쓴 뒤 교체(os.replace)하므로 저장 중에 종료되어도 이전 체크포인트가 유지됨
+- 파일이 없거나 읽을 수 없으면 복원 없이 시작 (처음부터 캔들을 조회하여 계산)
+"""
+
+logger = setup_logging(__name__)
+
+CHECKPOINT_PATH = os.getenv('CHECKPOINT_PATH', 'data/checkpoint.json')
+CHECKPOINT_INTERVAL = float(os.getenv('CHECKPOINT_INTERVAL', '60'))
+
+CHECKPOINT_VERSION = 1
+
+
+class Checkpoint:
+    """
+    구간별 상태 저장 / 복원.
+
+    Args:
+        path (str): 체크포인트 파일 경로
+        interval (float): 주기적으로 저장하는 간격(초). 0이면 종료 시에만 저장
+    """
+
+    def __init__(self, path: str = CHECKPOINT_PATH, interval: float = CHECKPOINT_INTERVAL):
+        self.path = path
+        self.interval = interval
+
+        self._sections = {}  # name -> (export, restore)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.saves = 0
+        self.saved_at = None
+        self.restored = {}  # name -> 복원한 항목 수
+        self.restored_age = None  # 복원한 체크포인트가 저장된 뒤 지난 시간(초)
+
+    def register(self, name: str, export: Callable[[], dict], restore: Callable[[dict], int]):
+        """
+        저장 구간을 등록합니다.
+
+        Args:
+            name (str): 구간 이름
+            export (Callable): 저장할 상태(JSON으로 변환 가능한 dict)를 반환
+            restore (Callable): 저장된 상태를 받아서 복원하고, 복원한 항목 수를 반환
+        """
+        self._sections[name] = (export, restore)
+
+    def load(self) -> dict:
+        """
+        체크포인트 파일을 읽어서 등록된 구간을 복원합니다.
+
+        Returns:
+            dict: 구간별 복원한 항목 수
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            logger.exception("체크포인트를 읽을 수 없습니다: %s", self.path)
+            return {}
+
+        if data.get('version') != CHECKPOINT_VERSION:
+            return {}
+
+        self.restored_age = time.time() - data.get('saved_at', 0)
+        sections = data.get('sections', {})
+        for name, (_, restore) in self._sections.items():
+            if name not in sections:
+                continue
+            try:
+                self.restored[name] = restore(sections[name])
+            except Exception:
+                logger.exception("체크포인트 복원 실패 (%s)", name)
+        return dict(self.restored)
+
+    def save(self):
+        sections = {}
+        for name, (export, _) in self._sections.items():
+            try:
+                sections[name] = export()
+            except Exception:
+                logger.exception("체크포인트 저장 실패 (%s)", name)
+
+        data = {'version': CHECKPOINT_VERSION, 'saved_at': time.time(), 'sections': sections}
+        tmp_path = f'{self.path}.tmp'
+
+        with self._lock:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+            self.saves += 1
+            self.saved_at = data['saved_at']
+
+    def start(self):
+        # 주기적 저장 스레드 시작, 종료 시 마지막으로 한 번 더 저장
+        if self._thread is not None:
+            return
+        atexit.register(self.stop)
+        if self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name='checkpoint', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.save()
+            except OSError:
+                logger.exception("체크포인트 저장 실패: %s", self.path)
+
+    def stop(self):
+        self._stop.set()
+        try:
+            self.save()
+        except OSError:
+            logger.exception("체크포인트 저장 실패: %s", self.path)
+
+    def stats(self) -> dict:
+        return {'path': self.path, 'saves': self.saves, 'saved_at': self.saved_at, 'restored': self.restored,
+                'restored_age': self.restored_age}
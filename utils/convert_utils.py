@@ -1,80 +1,87 @@
-from typing import Optional
-
-import requests
 from decimal import Decimal, ROUND_CEILING
 
+from upbit_data.market_catalog import get_market_catalog
+from utils.upbit_client import get_upbit_client
+# asyncio 클라이언트(aiohttp)는 asyncio 서버에서만 사용하므로 *_async 함수 안에서 불러온다. (동기 서버 기동 시간)
+
 
 def convert_trade_ticker(ticker: str):
-    # 뒤 3자리를 quote로 가정
-    quote = ticker[-3:]
-    base = ticker[:-3]
-    return f'{quote}-{base}'
+    # TradingView 심볼 -> 마켓 (e.g. DOGEKRW -> KRW-DOGE, BTCUSDT -> USDT-BTC), 마켓 카탈로그에서 O(1) 조회
+    return get_market_catalog().market_for(ticker)
+
+
+def market_label(ticker) -> str:
+    """
+    지표 태그용 마켓. 알림 값을 그대로 태그로 쓰면 보내는 쪽에서 시계열 수를 제한 없이 늘릴 수 있으므로,
+    마켓 카탈로그에 있는 마켓(매매 대상 포함)만 사용하고 나머지는 'other'로 묶습니다.
+    """
+    if not isinstance(ticker, str) or not ticker:
+        return 'other'
+    market = convert_trade_ticker(ticker)
+    return market if get_market_catalog().is_listed(market) else 'other'
+
+
+def signal_label(signal) -> str:
+    # 지표 태그용 시그널 (buy / sell / other)
+    return signal if signal in ('buy', 'sell') else 'other'
 
 
 def convert_simple_ticker(ticker: str):
-    # 뒤 3자리를 quote로 가정
-    # quote = ticker[-3:]
-    base = ticker[:-3]
-    return f'{base}'
+    # TradingView 심볼 -> 화폐 (e.g. DOGEKRW -> DOGE)
+    return convert_trade_ticker(ticker).partition('-')[2]
 
 
-def get_trade_price(ticker: str) -> Optional[float]:
+def get_trade_prices(tickers: list) -> dict:
     """
-    ticker 데이터에서 특정 마켓의 trade_price 추출.
+    여러 마켓의 trade_price를 한 번의 요청으로 조회.
 
     Args:
-        ticker (str): 마켓 이름 (예: "KRW-BTC")
+        tickers (list): 마켓 이름 목록 (예: ["KRW-BTC", "KRW-DOGE"])
 
     Returns:
-        Optional[float]: trade_price 또는 None (마켓 없음 시)
+        dict: 마켓 -> trade_price (응답에 없는 마켓은 제외)
+
+    Raises:
+        requests.RequestException: API 호출 에러
+        ValueError: 예상치 못한 응답 형식
     """
-    if not ticker:
+    if not tickers:
         raise ValueError("Ticker가 없습니다.")
 
-    url = f'https://api.upbit.com/v1/ticker?markets={ticker}'
-    headers = {"accept": "application/json"}
+    # HTTP 에러(4xx/5xx) 시 예외 발생
+    data = get_upbit_client().get('/v1/ticker', {"markets": ','.join(tickers)})
 
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # HTTP 에러(4xx/5xx) 시 예외 발생
-        data = response.json()
+    return _parse_trade_prices(data)
 
-        # data 타입 확인 및 처리 (리스트 예상)
-        if not isinstance(data, list):
-            print(f"예상치 못한 응답 형식: {type(data)}. 데이터: {data}")
-            return None
 
-        for item in data:
-            if isinstance(item, dict) and item.get('market') == ticker:
-                return item['trade_price']
+async def get_trade_prices_async(tickers: list) -> dict:
+    # get_trade_prices의 asyncio 버전 (async_server.py)
+    from utils.async_upbit_client import get_async_upbit_client
 
-        print(f"마켓 '{ticker}'을 찾을 수 없습니다.")
-        return None
+    if not tickers:
+        raise ValueError("Ticker가 없습니다.")
 
-    except requests.RequestException as e:
-        print(f"API 호출 에러: {e}")
-        return None
-    except ValueError as e:  # JSON 파싱 에러
-        print(f"JSON 파싱 에러: {e}")
-        return None
+    data = await get_async_upbit_client().get('/v1/ticker', {"markets": ','.join(tickers)})
 
+    return _parse_trade_prices(data)
 
-def calculate_min_quantity_precise(price: float, decimal_places: int = 8) -> Decimal:
-    """
-    소수점 자릿수(기본 8자리) 고려한 최소 코인 수량 계산.
-    tick 단위로 올림하여 최소 50,000 KRW 가치 보장.
 
-    Args:
-        price (float): 현재 코인 가격 (KRW)
-        decimal_places (int): 소수점 자릿수 (BTC:8, ETH:4 등 코인별 조정)
+def _parse_trade_prices(data) -> dict:
+    # data 타입 확인 및 처리 (리스트 예상)
+    if not isinstance(data, list):
+        raise ValueError(f"예상치 못한 응답 형식: {type(data)}. 데이터: {data}")
 
-    Returns:
-        Decimal: 최소 수량 (8자리 정밀도 적용)
+    return {item['market']: item['trade_price'] for item in data
+            if isinstance(item, dict) and 'market' in item and 'trade_price' in item}
+
+
+def min_quantity(price: float, decimal_places: int = 8, min_amount: Decimal = Decimal('50000')) -> Decimal:
+    """
+    min_amount(KRW) 이상의 가치가 되는 최소 코인 수량. (소수점 decimal_places 자리에서 올림)
     """
     if price <= 0:
         raise ValueError("가격은 0보다 커야 합니다.")
 
-    min_amount = Decimal('50000')
     price_dec = Decimal(str(price))  # str 변환으로 부동소수점 오류 방지
 
     tick = Decimal('10') ** -decimal_places  # tick = 0.00000001 (8자리)
@@ -82,16 +89,4 @@ def calculate_min_quantity_precise(price: float, decimal_places: int = 8) -> Dec
 
     # tick 단위로 올림: ceil(raw_q / tick) * tick
     ceiled_integral = (raw_q / tick).to_integral_value(rounding=ROUND_CEILING)
-    min_quantity = ceiled_integral * tick
-
-    actual_value = min_quantity * price_dec
-    print(f"최소 수량: {min_quantity}")
-    print(f"실제 가치: {actual_value:.2f} KRW (최소 {min_amount} KRW 이상)")
-
-    return min_quantity
-
-# btc_trade_price = get_trade_price("KRW-BTC")
-# print(btc_trade_price)
-#
-# calc_50000 = calculate_min_quantity_precise(btc_trade_price)
-# print(calc_50000)
+    return ceiled_integral * tick
@@ -0,0 +1,142 @@
+import threading, time
+from collections import OrderedDict
+from typing import Optional
+
+"""
+# 중복 시그널 캐시 (Dedup Cache)
+
+웹훅 중복 검사용 TTL-LRU 캐시입니다.
+
+- 키마다 최초 처리 시각을 저장하고, window(초)가 지나면 자동으로 만료
+- 키는 처리 시각 순서(OrderedDict)로 보관하므로 만료/초과분 제거는 앞에서부터 O(1)
+- 전체 크기 상한(max_size)을 넘으면 가장 오래된 키부터 제거
+- 키 해시로 여러 샤드(shard)에 나누어 샤드별 락만 사용 (요청 전체를 하나의 락으로 막지 않음)
+- hit / miss / eviction(크기 초과) / expiration(만료) 횟수 집계
+- 재시작 시 중복 주문을 막기 위해 만료되지 않은 키를 체크포인트로 저장(export) / 복원(restore)
+"""
+
+
+class _Shard:
+    __slots__ = ('lock', 'entries', 'max_size', 'hits', 'misses', 'evictions', 'expirations')
+
+    def __init__(self, max_size: int):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> 처리 시각 (오래된 순)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+
+class DedupCache:
+    """
+    중복 검사 캐시.
+
+    Args:
+        window (float): 중복으로 판단하는 시간 창(초)
+        max_size (int): 최대 보관 키 수
+        shards (int): 샤드 수
+    """
+
+    def __init__(self, window: float = 30, max_size: int = 10000, shards: int = 16):
+        self.window = window
+        self._shards = [_Shard(max(max_size // shards, 1)) for _ in range(shards)]
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def _expire(self, shard: _Shard, now: float):
+        entries = shard.entries
+        while entries:
+            key, processed_at = next(iter(entries.items()))
+            if now - processed_at < self.window:
+                break
+            del entries[key]
+            shard.expirations += 1
+
+    def check_and_set(self, key: str, now: Optional[float] = None) -> bool:
+        """
+        중복 여부를 확인하고, 중복이 아니면 처리 시각을 기록합니다.
+
+        Returns:
+            bool: window 이내에 이미 처리된 키면 True (중복)
+        """
+        now = time.monotonic() if now is None else now
+        shard = self._shard(key)
+
+        with shard.lock:
+            self._expire(shard, now)
+
+            if key in shard.entries:
+                shard.hits += 1
+                return True
+
+            shard.misses += 1
+            shard.entries[key] = now
+            if len(shard.entries) > shard.max_size:
+                shard.entries.popitem(last=False)
+                shard.evictions += 1
+            return False
+
+    def discard(self, key: str):
+        shard = self._shard(key)
+        with shard.lock:
+            shard.entries.pop(key, None)
+
+    def export(self) -> dict:
+        """
+        만료되지 않은 키와 처리 시각(epoch 초). 체크포인트 저장용
+        """
+        now = time.monotonic()
+        offset = time.time() - now  # monotonic -> epoch
+        entries = {}
+        for shard in self._shards:
+            with shard.lock:
+                self._expire(shard, now)
+                for key, processed_at in shard.entries.items():
+                    entries[key] = processed_at + offset
+        return entries
+
+    def restore(self, entries: dict) -> int:
+        """
+        export()로 저장한 키를 복원합니다. 재시작 사이에 지난 시간도 만료 시간에 반영됩니다.
+
+        Returns:
+            int: 복원한 (아직 만료되지 않은) 키 수
+        """
+        now = time.monotonic()
+        offset = time.time() - now
+        restored = 0
+        for key, processed_ts in entries.items():
+            processed_at = processed_ts - offset
+            if now - processed_at >= self.window:
+                continue
+
+            shard = self._shard(key)
+            with shard.lock:
+                if key not in shard.entries:
+                    shard.entries[key] = processed_at
+                    restored += 1
+
+        # 만료 / 초과분 제거는 앞에서부터 하므로 샤드별로 처리 시각 순서를 다시 맞춘다.
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries = OrderedDict(sorted(shard.entries.items(), key=lambda item: item[1]))
+                while len(shard.entries) > shard.max_size:
+                    shard.entries.popitem(last=False)
+        return restored
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def stats(self) -> dict:
+        stats = {'size': 0, 'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+        for shard in self._shards:
+            with shard.lock:
+                stats['size'] += len(shard.entries)
+                stats['hits'] += shard.hits
+                stats['misses'] += shard.misses
+                stats['evictions'] += shard.evictions
+                stats['expirations'] += shard.expirations
+        return stats
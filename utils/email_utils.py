@@ -1,12 +1,13 @@
-import smtplib, ssl, os
+import smtplib, ssl, os, threading
 from datetime import datetime
 from email.mime.text import MIMEText
 from dotenv import load_dotenv
 
 load_dotenv()
 
-SMTP_SSL_PORT = 465
-SMTP_SERVER = 'smtp.gmail.com'
+SMTP_SSL_PORT = int(os.getenv('SMTP_PORT', '465'))
+SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
+SMTP_USE_SSL = os.getenv('SMTP_USE_SSL', '1') == '1'
 
 SENDER_EMAIL = os.getenv('SENDER_EMAIL', '')
 SENDER_PASSWORD = os.getenv('SENDER_PASSWORD', '')
@@ -24,4 +25,67 @@ def send_email(title: str, send_msg: str):
         server.login(SENDER_EMAIL, SENDER_PASSWORD)
         server.sendmail(SENDER_EMAIL, RECEIVER_EMAIL, msg.as_string())
 
+
+class EmailChannel:
+    """
+    메일 알림 채널. 한 번 로그인한 SMTP 연결을 재사용하며, 끊어진 경우에만 다시 연결합니다.
+
+    Args:
+        server (str): SMTP 서버
+        port (int): SMTP 포트
+        use_ssl (bool): SMTP_SSL 사용 여부 (로컬 테스트 서버는 False)
+    """
+
+    name = 'email'
+
+    def __init__(self, server: str = SMTP_SERVER, port: int = SMTP_SSL_PORT, use_ssl: bool = SMTP_USE_SSL,
+                 sender: str = SENDER_EMAIL, password: str = SENDER_PASSWORD, receiver: str = RECEIVER_EMAIL):
+        self.server = server
+        self.port = port
+        self.use_ssl = use_ssl
+        self.sender = sender
+        self.password = password
+        self.receiver = receiver
+
+        self._smtp = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.server, self.port, context=ssl.create_default_context(), timeout=10)
+        else:
+            smtp = smtplib.SMTP(self.server, self.port, timeout=10)
+        if self.password:
+            smtp.login(self.sender, self.password)
+        return smtp
+
+    def _disconnect(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except OSError:  # smtplib.SMTPException 포함
+                pass
+            self._smtp = None
+
+    def send(self, title: str, send_msg: str):
+        msg = MIMEText(send_msg)
+        msg['Subject'] = title + ' (' + datetime.now().strftime('%Y-%m-%d %H시 %M분') + ')'
+
+        with self._lock:
+            # 연결이 끊어졌으면 한 번만 다시 연결하여 전송
+            for attempt in range(2):
+                try:
+                    if self._smtp is None:
+                        self._smtp = self._connect()
+                    self._smtp.sendmail(self.sender, self.receiver, msg.as_string())
+                    return
+                except OSError:  # smtplib.SMTPException 포함
+                    self._disconnect()
+                    if attempt == 1:
+                        raise
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
 # send_email('TEST', '메일 전송 테스트입니다.')
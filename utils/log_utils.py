@@ -0,0 +1,191 @@
+import atexit, json, logging, os, queue, threading, uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import QueueHandler, TimedRotatingFileHandler
+from typing import Optional
+
+"""
+# 로깅 (Logging)
+
+요청 / 매매 스레드에서 파일에 직접 쓰지 않도록 로그를 큐로 넘기고, 별도의 writer 스레드에서 기록합니다.
+
+- 요청 스레드: QueueHandler가 메시지를 만들고(%-style 인자 병합) 큐에 넣기만 함 (디스크 대기 없음)
+- writer 스레드: 큐에 쌓인 로그를 모아서(batch) 기록한 뒤 한 번만 flush, 자정 로테이션도 이 스레드에서 처리
+- 로그는 JSON lines 형식이며, 같은 웹훅 / 매매 작업의 로그는 같은 correlation id(cid)를 가짐
+"""
+
+LOG_FILE = os.getenv('LOG_FILE', 'logs/app.log')
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+
+# writer 스레드가 한 번에 기록하는 최대 로그 수
+LOG_BATCH_SIZE = 256
+
+_correlation_id: ContextVar[Optional[str]] = ContextVar('correlation_id', default=None)
+
+# JSON에 extra 필드로 넣지 않을 LogRecord 기본 속성
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'cid'}
+
+
+def new_correlation_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def get_correlation_id() -> Optional[str]:
+    return _correlation_id.get()
+
+
+@contextmanager
+def correlation(cid: Optional[str] = None):
+    """
+    이 블록 안에서 남기는 로그에 correlation id를 붙입니다. (cid가 없으면 새로 생성)
+    """
+    token = _correlation_id.set(cid or new_correlation_id())
+    try:
+        yield _correlation_id.get()
+    finally:
+        _correlation_id.reset(token)
+
+
+class CorrelationFilter(logging.Filter):
+    # 로그를 남긴 스레드(컨텍스트)의 correlation id를 기록에 붙인다.
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.cid = _correlation_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'cid': getattr(record, 'cid', None),
+            'msg': record.getMessage(),
+        }
+        # logger.info('...', extra={'ticker': ...}) 로 넘긴 필드
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key not in data:
+                data[key] = value
+        if record.exc_text:
+            data['exc'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class _AsyncQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 메시지 인자 병합과 예외 문자열 변환만 요청 스레드에서 하고, JSON 변환은 writer 스레드에서 한다.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class BatchFileHandler(TimedRotatingFileHandler):
+    """
+    로그 묶음을 기록한 뒤 한 번만 flush 하는 일자별 로테이션 파일 핸들러. (writer 스레드 전용)
+    """
+
+    def emit_batch(self, records: list):
+        for record in records:
+            try:
+                if self.shouldRollover(record):
+                    self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+                self.stream.write(self.format(record) + self.terminator)
+            except Exception:
+                self.handleError(record)
+        if self.stream is not None:
+            self.stream.flush()
+
+
+class LogWriter:
+    """
+    큐에 쌓인 로그를 모아서 핸들러로 기록하는 writer 스레드.
+    """
+
+    _STOP = object()
+
+    def __init__(self, log_queue: queue.SimpleQueue, handler: BatchFileHandler, batch_size: int = LOG_BATCH_SIZE):
+        self._queue = log_queue
+        self._handler = handler
+        self._batch_size = batch_size
+        self._thread: Optional[threading.Thread] = None
+
+        self.written = 0
+        self.batches = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(record is self._STOP for record in batch)
+            records = [record for record in batch if record is not self._STOP]
+            if records:
+                self._handler.emit_batch(records)
+                self.written += len(records)
+                self.batches += 1
+            if stop:
+                return
+
+    def stop(self, timeout: float = 5.0):
+        # 남은 로그를 모두 기록하고 종료
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+        self._handler.close()
+
+
+_writer: Optional[LogWriter] = None
+_writer_lock = threading.Lock()
+_queue_handler: Optional[QueueHandler] = None
+
+
+def setup_logging(name: str, filename: str = LOG_FILE, level: str = LOG_LEVEL) -> logging.Logger:
+    """
+    name 로거에 큐 핸들러를 연결합니다. writer 스레드는 프로세스에서 하나만 사용합니다.
+
+    Returns:
+        logging.Logger: 설정된 로거
+    """
+    global _writer, _queue_handler
+
+    with _writer_lock:
+        if _writer is None:
+            if os.path.dirname(filename):
+                os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+            # 일자별 로테이션, 최대 30일치 보관 (로테이션 파일명: app.log.YYYY-MM-DD.log)
+            file_handler = BatchFileHandler(filename=filename, when='midnight', interval=1, backupCount=30,
+                                            encoding='utf-8', delay=True)
+            file_handler.suffix = '%Y-%m-%d.log'
+            file_handler.setFormatter(JsonFormatter())
+
+            log_queue = queue.SimpleQueue()
+            _queue_handler = _AsyncQueueHandler(log_queue)
+            _queue_handler.addFilter(CorrelationFilter())
+
+            _writer = LogWriter(log_queue, file_handler)
+            _writer.start()
+            atexit.register(_writer.stop)
+
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    if _queue_handler not in logger.handlers:
+        logger.addHandler(_queue_handler)
+    return logger
+
@@ -0,0 +1,195 @@
+import threading, time
+from bisect import bisect_left
+from typing import Optional
+
+"""
+# 지표 (Metrics)
+
+웹훅 / 매매 / 업비트 호출 구간(span)별 처리 시간과 카운터를 모아서 Prometheus 텍스트 형식으로 제공합니다. (/metrics)
+
+- span(): with 블록의 처리 시간을 히스토그램(tradehook_span_seconds)에 기록
+  (span 이름 + 태그(endpoint, ticker, signal, status ...)별로 집계)
+- inc(): 중복 시그널, 에러, 429 응답 등 카운터 증가
+- 요청마다 리스트에 값을 쌓지 않고 고정된 버킷 카운트만 증가시키므로 운영 환경에서 계속 켜 두어도 부담이 적음
+"""
+
+# 히스토그램 버킷 (초)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+SPAN_METRIC = 'tradehook_span_seconds'
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((key, str(value)) for key, value in labels.items() if value is not None))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(label_key: tuple, extra: Optional[tuple] = None) -> str:
+    items = label_key + (extra,) if extra else label_key
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in items) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _HistogramSeries:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, size: int):
+        self.counts = [0] * size  # 버킷별 (누적이 아닌) 건수, 마지막은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram:
+    def __init__(self, name: str, description: str, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self._series = {}  # label_key -> _HistogramSeries
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets) + 1)
+            series.counts[index] += 1
+            series.sum += value
+            series.count += 1
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            snapshot = [(key, list(series.counts), series.sum, series.count)
+                        for key, series in self._series.items()]
+
+        for key, counts, total, count in sorted(snapshot):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(key, ('le', _format_value(bound)))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(key)} {total}')
+            lines.append(f'{self.name}_count{_format_labels(key)} {count}')
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values = {}  # label_key -> 값
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} counter']
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        lines.extend(f'{self.name}{_format_labels(key)} {value}' for key, value in snapshot)
+        return lines
+
+
+class Span:
+    """
+    with 블록의 처리 시간을 기록합니다. status 태그를 지정하지 않았으면 ok, 블록에서 예외가 나면 error로 기록합니다.
+
+    with span('trade.order', ticker='KRW-DOGE', signal='buy') as s:
+        ...
+        s.tag(status='rejected')
+    """
+
+    __slots__ = ('_histogram', 'name', 'labels', '_start', 'elapsed')
+
+    def __init__(self, histogram: Histogram, name: str, labels: dict):
+        self._histogram = histogram
+        self.name = name
+        self.labels = labels
+        self._start = 0.0
+        self.elapsed = 0.0
+
+    def tag(self, **labels):
+        self.labels.update(labels)
+
+    def __enter__(self) -> 'Span':
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self._start
+        self.labels.setdefault('status', 'ok' if exc_type is None else 'error')
+        self._histogram.observe(self.elapsed, span=self.name, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}  # name -> Counter | Histogram
+        self._lock = threading.Lock()
+        self.spans = self.histogram(SPAN_METRIC, 'Processing time of each stage (span) in seconds.')
+
+    def _get_or_create(self, name: str, factory):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = factory()
+        return metric
+
+    def counter(self, name: str, description: str = '') -> Counter:
+        return self._get_or_create(name, lambda: Counter(name, description or name))
+
+    def histogram(self, name: str, description: str = '', buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(name, lambda: Histogram(name, description or name, buckets))
+
+    def span(self, name: str, **labels) -> Span:
+        return Span(self.spans, name, labels)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines = []
+        for _, metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+_metrics: Optional[MetricsRegistry] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = MetricsRegistry()
+    return _metrics
+
+
+def span(name: str, **labels) -> Span:
+    return get_metrics().span(name, **labels)
+
+
+def inc(name: str, description: str = '', amount: float = 1, **labels):
+    get_metrics().counter(name, description).inc(amount, **labels)
@@ -0,0 +1,184 @@
+import json, os, queue, threading, time
+from datetime import datetime
+from typing import Optional
+
+from utils.email_utils import EmailChannel
+from utils.metrics import span
+
+"""
+# 알림 (Notifier)
+
+매매 결과 알림을 매매 경로에서 분리하여 백그라운드에서 전송합니다.
+
+- notify()는 메모리 큐(최대 NOTIFY_QUEUE_SIZE개)에 넣고 바로 반환 (큐가 가득 차면 디스크 스풀에 기록)
+- 백그라운드 스레드가 NOTIFY_COALESCE_WINDOW초 동안 모인 알림을 하나의 요약(digest) 메시지로 묶어 전송
+- 전송에 실패한 알림은 디스크 스풀(JSON lines)에 기록하고 NOTIFY_RETRY_INTERVAL초마다 재전송
+- 채널은 name 속성과 send(title, message) 메서드만 있으면 추가 가능 (e.g. 메일, 메신저)
+"""
+
+NOTIFY_QUEUE_SIZE = int(os.getenv('NOTIFY_QUEUE_SIZE', '1000'))
+NOTIFY_COALESCE_WINDOW = float(os.getenv('NOTIFY_COALESCE_WINDOW', '2'))
+NOTIFY_MAX_BATCH = int(os.getenv('NOTIFY_MAX_BATCH', '50'))
+NOTIFY_RETRY_INTERVAL = float(os.getenv('NOTIFY_RETRY_INTERVAL', '60'))
+NOTIFY_SPOOL_DIR = os.getenv('NOTIFY_SPOOL_DIR', 'data/notify_spool')
+
+
+class Notifier:
+    """
+    알림 전송기.
+
+    Args:
+        channels (list): 알림 채널 목록
+        spool_dir (str): 전송 실패 알림을 기록할 디렉토리 (채널별 파일)
+        coalesce_window (float): 알림을 모아서 보낼 시간(초)
+    """
+
+    def __init__(self, channels: list, spool_dir: str = NOTIFY_SPOOL_DIR, queue_size: int = NOTIFY_QUEUE_SIZE,
+                 coalesce_window: float = NOTIFY_COALESCE_WINDOW, max_batch: int = NOTIFY_MAX_BATCH,
+                 retry_interval: float = NOTIFY_RETRY_INTERVAL):
+        self.channels = list(channels)
+        self.spool_dir = spool_dir
+        self.coalesce_window = coalesce_window
+        self.max_batch = max_batch
+        self.retry_interval = retry_interval
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._spool_lock = threading.Lock()
+        self._started = False
+        self._start_lock = threading.Lock()
+
+        self.sent = 0
+        self.failed = 0
+        self.spooled = 0
+
+    def start(self):
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+        os.makedirs(self.spool_dir, exist_ok=True)
+        threading.Thread(target=self._send_loop, name='notifier', daemon=True).start()
+
+    def add_channel(self, channel):
+        self.channels.append(channel)
+
+    def notify(self, title: str, message: str):
+        """
+        알림을 큐에 넣습니다. (전송을 기다리지 않음)
+        """
+        item = {'title': title, 'message': message, 'created_at': time.time()}
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            for channel in self.channels:
+                self._spool(channel, [item])
+
+    # ========== 전송 ==========
+
+    def _collect(self) -> list:
+        # 첫 알림을 기다린 뒤, coalesce_window 동안 들어온 알림을 함께 모은다.
+        items = [self._queue.get(timeout=self.retry_interval)]
+        deadline = time.monotonic() + self.coalesce_window
+        while len(items) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+
+    def _send_loop(self):
+        last_retry = time.monotonic()
+        while True:
+            try:
+                items = self._collect()
+            except queue.Empty:
+                items = []
+
+            for channel in self.channels:
+                if items:
+                    self._deliver(channel, items)
+
+            if time.monotonic() - last_retry >= self.retry_interval:
+                last_retry = time.monotonic()
+                for channel in self.channels:
+                    self._retry_spool(channel)
+
+    def _deliver(self, channel, items: list) -> bool:
+        title, message = digest(items)
+        try:
+            with span('notify.send', channel=channel.name):
+                channel.send(title, message)
+            self.sent += len(items)
+            return True
+        except Exception:
+            self.failed += len(items)
+            self._spool(channel, items)
+            return False
+
+    # ========== 디스크 스풀 ==========
+
+    def _spool_path(self, channel) -> str:
+        return os.path.join(self.spool_dir, f'{channel.name}.jsonl')
+
+    def _spool(self, channel, items: list):
+        with self._spool_lock:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            with open(self._spool_path(channel), 'a', encoding='utf-8') as f:
+                for item in items:
+                    f.write(json.dumps(item, ensure_ascii=False) + '\n')
+            self.spooled += len(items)
+
+    def _retry_spool(self, channel):
+        path = self._spool_path(channel)
+        with self._spool_lock:
+            if not os.path.exists(path):
+                return
+            with open(path, encoding='utf-8') as f:
+                items = [json.loads(line) for line in f if line.strip()]
+            os.remove(path)
+
+        # 다시 실패하면 _deliver에서 스풀에 재기록
+        for start in range(0, len(items), self.max_batch):
+            if not self._deliver(channel, items[start:start + self.max_batch]):
+                for rest in range(start + self.max_batch, len(items), self.max_batch):
+                    self._spool(channel, items[rest:rest + self.max_batch])
+                break
+
+    def stats(self) -> dict:
+        return {'queued': self._queue.qsize(), 'sent': self.sent, 'failed': self.failed, 'spooled': self.spooled}
+
+
+def digest(items: list) -> tuple:
+    """
+    알림 목록을 하나의 (제목, 내용)으로 묶습니다. 1건이면 그대로 사용합니다.
+    """
+    if len(items) == 1:
+        return items[0]['title'], items[0]['message']
+
+    title = f"[TradeHook] 알림 {len(items)}건 - {items[0]['title']} 외"
+    lines = []
+    for item in items:
+        created_at = datetime.fromtimestamp(item['created_at']).strftime('%Y-%m-%d %H:%M:%S')
+        lines.append(f"[{created_at}] {item['title']}\n{item['message']}")
+    return title, '\n\n'.join(lines)
+
+
+_notifier: Optional[Notifier] = None
+_notifier_lock = threading.Lock()
+
+
+def get_notifier() -> Notifier:
+    global _notifier
+    if _notifier is None:
+        with _notifier_lock:
+            if _notifier is None:
+                _notifier = Notifier([EmailChannel()])
+                _notifier.start()
+    return _notifier
+
+
+def notify(title: str, message: str):
+    get_notifier().notify(title, message)
@@ -0,0 +1,288 @@
+import asyncio, threading, time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+"""
+# 업비트 요청 수 제한 (Rate Limiter)
+
+업비트는 요청 그룹별로 초당 요청 수를 제한하며, 응답 헤더로 남은 요청 수를 알려줍니다.
+    Remaining-Req: group=default; min=1799; sec=29
+
+- 그룹별 토큰 버킷(token bucket)으로 요청 전에 대기
+- 응답의 Remaining-Req(sec) 값으로 남은 토큰 수를 보정하고, 429 응답을 받으면 잠시 해당 그룹을 멈춤
+- 우선순위: 주문 / 매매 경로 요청(high)이 캔들, 계좌 갱신 같은 백그라운드 요청(low)보다 먼저 처리되며,
+  low 요청은 버킷에 여유분(reserve)을 남겨 둔 상태에서만 진행
+- 그룹별 대기(throttle) 횟수와 대기 시간을 기록
+- asyncio 경로(async_server.py)는 스레드를 막지 않고 같은 버킷을 await로 기다림 (acquire_async)
+"""
+
+PRIORITY_HIGH = 'high'
+PRIORITY_LOW = 'low'
+
+# 그룹별 초당 요청 수 (업비트 기준)
+GROUP_LIMITS = {
+    'order': 8,
+    'default': 30,
+    'market': 10,
+    'candles': 10,
+    'ticker': 10,
+    'trades': 10,
+    'orderbook': 10,
+}
+
+# 429 응답을 받았을 때 해당 그룹을 멈추는 시간(초)
+THROTTLED_PAUSE = 1.0
+
+_priority: ContextVar[str] = ContextVar('upbit_request_priority', default=PRIORITY_HIGH)
+
+
+@contextmanager
+def background_priority():
+    """
+    이 블록 안에서 보내는 업비트 요청은 낮은 우선순위(low)로 처리합니다.
+    """
+    token = _priority.set(PRIORITY_LOW)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+def group_for(method: str, path: str) -> str:
+    # 요청 경로 -> 업비트 요청 그룹
+    if path.startswith('/v1/candles'):
+        return 'candles'
+    if path.startswith('/v1/ticker'):
+        return 'ticker'
+    if path.startswith('/v1/market'):
+        return 'market'
+    if path.startswith('/v1/trades'):
+        return 'trades'
+    if path.startswith('/v1/orderbook'):
+        return 'orderbook'
+    if method in ('POST', 'DELETE') and path in ('/v1/orders', '/v1/order'):
+        return 'order'
+    return 'default'
+
+
+def parse_remaining_req(header: Optional[str]) -> Optional[tuple]:
+    """
+    'group=default; min=1799; sec=29' -> ('default', 29)
+    """
+    if not header:
+        return None
+
+    values = {}
+    for part in header.split(';'):
+        key, _, value = part.strip().partition('=')
+        values[key] = value
+
+    try:
+        return values['group'], int(values['sec'])
+    except (KeyError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    우선순위를 지원하는 토큰 버킷.
+
+    Args:
+        rate (float): 초당 토큰 수 (= 버킷 크기)
+        reserve (float): low 우선순위 요청이 남겨 두어야 하는 토큰 수
+    """
+
+    def __init__(self, rate: float, reserve: Optional[float] = None):
+        self.rate = rate
+        self.capacity = rate
+        self.reserve = max(1.0, rate * 0.25) if reserve is None else reserve
+
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._high_waiting = 0
+        self._cond = threading.Condition()
+
+        self.acquired = 0
+        self.throttled = 0  # 대기한 요청 수
+        self.throttled_delay = 0.0  # 누적 대기 시간(초)
+        self.max_delay = 0.0
+        self.rejected = 0  # 429 응답 수
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take(self, high: bool) -> float:
+        # 토큰을 사용했으면 0, 아니면 다시 확인하기까지 기다릴 시간(초). self._cond를 잡은 상태에서 호출
+        threshold = 1.0 if high else 1.0 + self.reserve
+        now = time.monotonic()
+        self._refill(now)
+
+        if now >= self._paused_until and self._tokens >= threshold and (high or self._high_waiting == 0):
+            self._tokens -= 1
+            return 0.0
+        return max(self._paused_until - now, (threshold - self._tokens) / self.rate, 0.001)
+
+    def _record(self, delay: float):
+        self.acquired += 1
+        if delay > 0.001:
+            self.throttled += 1
+            self.throttled_delay += delay
+            self.max_delay = max(self.max_delay, delay)
+
+    def acquire(self, priority: str = PRIORITY_HIGH) -> float:
+        """
+        토큰을 하나 사용합니다. 토큰이 없으면 대기합니다.
+
+        Returns:
+            float: 대기한 시간(초)
+        """
+        high = priority == PRIORITY_HIGH
+        start = time.monotonic()
+
+        with self._cond:
+            if high:
+                self._high_waiting += 1
+            try:
+                while True:
+                    wait_time = self._take(high)
+                    if wait_time == 0:
+                        break
+                    self._cond.wait(timeout=wait_time)
+            finally:
+                if high:
+                    self._high_waiting -= 1
+                    self._cond.notify_all()
+
+            delay = time.monotonic() - start
+            self._record(delay)
+        return delay
+
+    def try_acquire(self, priority: str = PRIORITY_HIGH) -> bool:
+        # 토큰이 있으면 사용하고 True, 없으면 기다리지 않고 False (헤지 요청 등 보내지 않아도 되는 요청)
+        with self._cond:
+            if self._take(priority == PRIORITY_HIGH) == 0:
+                self._record(0.0)
+                return True
+        return False
+
+    async def acquire_async(self, priority: str = PRIORITY_HIGH) -> float:
+        """
+        acquire()와 같지만 스레드(이벤트 루프)를 막지 않고 asyncio.sleep으로 대기합니다.
+
+        Returns:
+            float: 대기한 시간(초)
+        """
+        high = priority == PRIORITY_HIGH
+        start = time.monotonic()
+
+        with self._cond:
+            wait_time = self._take(high)
+            if wait_time == 0:
+                self._record(0.0)
+                return 0.0
+            if high:
+                self._high_waiting += 1
+
+        try:
+            while wait_time > 0:
+                await asyncio.sleep(wait_time)
+                with self._cond:
+                    wait_time = self._take(high)
+        finally:
+            with self._cond:
+                if high:
+                    self._high_waiting -= 1
+                    self._cond.notify_all()
+
+        delay = time.monotonic() - start
+        with self._cond:
+            self._record(delay)
+        return delay
+
+    def observe_remaining(self, remaining: int):
+        # 서버가 알려준 남은 요청 수보다 많이 보내지 않도록 보정
+        with self._cond:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, float(remaining))
+
+    def on_throttled(self, pause: float = THROTTLED_PAUSE):
+        with self._cond:
+            self.rejected += 1
+            self._tokens = 0.0
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'rate': self.rate,
+                'acquired': self.acquired,
+                'throttled': self.throttled,
+                'throttled_delay': round(self.throttled_delay, 3),
+                'max_delay': round(self.max_delay, 3),
+                'rejected': self.rejected,
+            }
+
+
+class UpbitRateLimiter:
+    def __init__(self, limits: Optional[dict] = None):
+        self._limits = dict(GROUP_LIMITS if limits is None else limits)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, group: str) -> TokenBucket:
+        bucket = self._buckets.get(group)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(group)
+                if bucket is None:
+                    bucket = self._buckets[group] = TokenBucket(self._limits.get(group, self._limits['default']))
+        return bucket
+
+    def acquire(self, group: str, priority: Optional[str] = None) -> float:
+        return self.bucket(group).acquire(priority or current_priority())
+
+    async def acquire_async(self, group: str, priority: Optional[str] = None) -> float:
+        return await self.bucket(group).acquire_async(priority or current_priority())
+
+    def try_acquire(self, group: str, priority: Optional[str] = None) -> bool:
+        return self.bucket(group).try_acquire(priority or current_priority())
+
+    def observe(self, group: str, response_headers) -> Optional[int]:
+        """
+        응답 헤더(Remaining-Req)로 해당 그룹의 남은 요청 수를 보정합니다.
+        """
+        parsed = parse_remaining_req(response_headers.get('Remaining-Req'))
+        if parsed is None:
+            return None
+
+        header_group, remaining = parsed
+        self.bucket(header_group or group).observe_remaining(remaining)
+        return remaining
+
+    def on_throttled(self, group: str):
+        self.bucket(group).on_throttled()
+
+    def stats(self) -> dict:
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {group: bucket.stats() for group, bucket in buckets.items()}
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> UpbitRateLimiter:
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = UpbitRateLimiter()
+    return _limiter
@@ -0,0 +1,254 @@
+import os, threading, time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+import requests
+
+from utils.metrics import inc
+
+"""
+# 업비트 호출 보호 (Resilience)
+
+업비트가 느려지거나 장애가 나도 매매 작업 스레드가 쌓이지 않고, 중복 검사 시간 창 안에 결과가 정해지도록 합니다.
+
+- 기한(deadline): 시그널마다 처리 시간 예산(e.g. 20초)을 정하면, 그 안의 업비트 호출은 남은 시간만큼만 기다림
+  (타임아웃 = min(엔드포인트 타임아웃, 남은 시간), 남은 시간이 없으면 요청하지 않고 DeadlineExceeded)
+- 서킷 브레이커: 요청 그룹(order, default, ticker, ...)별로 연속 실패(연결 실패, 타임아웃, 5xx)가 쌓이면 일정 시간 동안
+  요청하지 않고 바로 CircuitOpenError (이후 한 건만 시험 삼아 보내서 성공하면 다시 열림)
+- 지연 추적: 엔드포인트별 최근 응답 시간의 p95 (헤지 요청을 보내기 전 기다리는 시간)
+
+DeadlineExceeded / CircuitOpenError는 요청을 보내기 전에 발생하므로, 주문 요청에서 이 예외가 나면 주문은 접수되지 않은 것입니다.
+"""
+
+# 연속 실패 수가 이 값에 도달하면 서킷을 차단
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+
+# 차단 후 시험 요청을 보내기까지의 시간(초)
+CIRCUIT_RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', '10'))
+
+# p95 계산에 사용할 최근 응답 수 / 헤지를 시작하기 위한 최소 응답 수
+LATENCY_SAMPLES = 200
+LATENCY_MIN_SAMPLES = 20
+
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+CIRCUIT_HALF_OPEN = 'half_open'
+
+_deadline: ContextVar[Optional[float]] = ContextVar('upbit_request_deadline', default=None)
+
+
+class DeadlineExceeded(requests.Timeout):
+    # 처리 시간 예산을 모두 사용하여 요청하지 않음
+    pass
+
+
+class CircuitOpenError(requests.ConnectionError):
+    # 서킷이 차단되어 요청하지 않음
+    def __init__(self, group: str, retry_after: float):
+        self.group = group
+        self.retry_after = retry_after
+        super().__init__(f'Upbit circuit open ({group}), retry after {retry_after:.1f}s')
+
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    """
+    이 블록 안에서 보내는 업비트 요청은 지금부터 seconds초 안에 끝나야 합니다. (바깥 블록의 기한을 대체, None이면 기한 없음)
+
+    contextvars로 전달되므로 이 블록에서 등록한 매매 작업(스레드 / Task)에도 같은 기한이 적용됩니다.
+    """
+    token = _deadline.set(None if seconds is None else time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    # 남은 시간(초), 기한이 없으면 None
+    expires_at = _deadline.get()
+    return None if expires_at is None else expires_at - time.monotonic()
+
+
+def bounded_timeout(connect: float, read: float) -> tuple:
+    """
+    엔드포인트 타임아웃을 남은 시간 이내로 줄입니다.
+
+    Raises:
+        DeadlineExceeded: 남은 시간이 없음
+    """
+    left = remaining()
+    if left is None:
+        return connect, read
+    if left <= 0:
+        inc('tradehook_upbit_deadline_exceeded_total', 'Upbit requests skipped after the deadline.')
+        raise DeadlineExceeded('Upbit request deadline exceeded')
+    return min(connect, left), min(read, left)
+
+
+class CircuitBreaker:
+    """
+    요청 그룹별 서킷 브레이커.
+
+    Args:
+        group (str): 요청 그룹
+        failure_threshold (int): 차단할 연속 실패 수
+        reset_timeout (float): 차단 후 시험 요청까지의 시간(초)
+    """
+
+    def __init__(self, group: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.group = group
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = CIRCUIT_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+        self.opened = 0  # 차단 횟수
+        self.rejected = 0  # 차단 중 거부한 요청 수
+
+    def check(self):
+        """
+        차단 중이면 요청 수 제한 토큰을 쓰기 전에 바로 실패합니다. (시험 요청 자리는 잡지 않음)
+
+        Raises:
+            CircuitOpenError: 차단 중 (혹은 시험 요청이 진행 중)
+        """
+        with self._lock:
+            retry_after = self._rejection(time.monotonic())
+        if retry_after is not None:
+            self._reject(retry_after)
+
+    def allow(self):
+        """
+        요청을 보내기 직전에 호출합니다. 보낸 요청은 어떻게 끝나든 record_success / record_failure로 결과를 알려야 합니다.
+        (시험 요청의 결과를 알리지 않으면 서킷이 계속 차단됨)
+
+        Raises:
+            CircuitOpenError: 차단 중 (혹은 시험 요청이 진행 중)
+        """
+        with self._lock:
+            now = time.monotonic()
+            retry_after = self._rejection(now)
+            if retry_after is None:
+                if self.state == CIRCUIT_OPEN:
+                    self.state = CIRCUIT_HALF_OPEN
+                if self.state == CIRCUIT_HALF_OPEN:
+                    self._probing = True
+                return
+        self._reject(retry_after)
+
+    def _rejection(self, now: float) -> Optional[float]:
+        # 요청을 보낼 수 없으면 다시 시도할 수 있을 때까지의 시간(초), 보낼 수 있으면 None. self._lock을 잡은 상태에서 호출
+        if self.state == CIRCUIT_CLOSED:
+            return None
+        if self.state == CIRCUIT_OPEN and now - self._opened_at >= self.reset_timeout:
+            return None
+        if self.state == CIRCUIT_HALF_OPEN and not self._probing:
+            return None
+        self.rejected += 1
+        return max(self._opened_at + self.reset_timeout - now, 0.0)
+
+    def _reject(self, retry_after: float):
+        inc('tradehook_upbit_circuit_rejected_total', 'Upbit requests rejected by an open circuit.', group=self.group)
+        raise CircuitOpenError(self.group, retry_after)
+
+    def record_success(self):
+        with self._lock:
+            self.state = CIRCUIT_CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == CIRCUIT_OPEN:
+                return
+            if self.state == CIRCUIT_HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = CIRCUIT_OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+                self.opened += 1
+                opened = True
+            else:
+                opened = False
+        if opened:
+            inc('tradehook_upbit_circuit_opened_total', 'Upbit circuit breaker trips.', group=self.group)
+
+    @property
+    def is_closed(self) -> bool:
+        return self.state == CIRCUIT_CLOSED
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'state': self.state, 'failures': self._failures, 'opened': self.opened, 'rejected': self.rejected}
+
+
+class LatencyTracker:
+    """
+    엔드포인트의 최근 응답 시간과 p95.
+
+    Args:
+        size (int): 보관할 최근 응답 수
+        min_samples (int): p95를 계산하기 위한 최소 응답 수
+    """
+
+    def __init__(self, size: int = LATENCY_SAMPLES, min_samples: int = LATENCY_MIN_SAMPLES):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=size)
+        self._p95 = None
+        self._stale = 0  # p95 계산 이후 추가된 응답 수
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+            self._stale += 1
+
+    def p95(self) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            # 매번 정렬하지 않고 응답이 어느 정도 쌓였을 때만 다시 계산
+            if self._p95 is None or self._stale >= self.min_samples:
+                ordered = sorted(self._samples)
+                self._p95 = ordered[int(len(ordered) * 0.95) - 1]
+                self._stale = 0
+            return self._p95
+
+
+_breakers = {}
+_trackers = {}
+_registry_lock = threading.Lock()
+
+
+def get_circuit_breaker(group: str) -> CircuitBreaker:
+    breaker = _breakers.get(group)
+    if breaker is None:
+        with _registry_lock:
+            breaker = _breakers.get(group)
+            if breaker is None:
+                breaker = _breakers[group] = CircuitBreaker(group)
+    return breaker
+
+
+def get_latency_tracker(path: str) -> LatencyTracker:
+    tracker = _trackers.get(path)
+    if tracker is None:
+        with _registry_lock:
+            tracker = _trackers.get(path)
+            if tracker is None:
+                tracker = _trackers[path] = LatencyTracker()
+    return tracker
+
+
+def circuit_stats() -> dict:
+    with _registry_lock:
+        breakers = dict(_breakers)
+    return {group: breaker.stats() for group, breaker in breakers.items()}
@@ -0,0 +1,301 @@
+import os, socket, sqlite3, threading, time, uuid
+from abc import ABC, abstractmethod
+from typing import Optional
+from urllib.parse import urlparse
+
+from utils.dedup_cache import DedupCache
+
+"""
+# 공유 상태 저장소 (State Backend)
+
+EMA 레짐과 중복 검사 상태를 여러 프로세스(gunicorn worker) / 여러 서버에서 공유하기 위한 저장소입니다.
+
+- memory://                   : 프로세스 내 메모리 (단일 프로세스)
+- sqlite:///path/to/state.db  : SQLite WAL 모드 파일 (같은 서버의 여러 프로세스)
+- redis://host:port/db        : Redis 프로토콜(RESP) 서버 (여러 서버)
+
+중복 검사는 저장소에서 원자적으로 확인 후 기록(check-and-set)하므로, 여러 프로세스에서 같은 시그널을 동시에 받아도 한 번만 처리됩니다.
+"""
+
+STATE_BACKEND_URL = os.getenv('STATE_BACKEND_URL', 'memory://')
+
+
+class StateBackend(ABC):
+    # 호출이 파일 / 네트워크 I/O를 기다리는지 (asyncio 서버는 이벤트 루프를 막지 않도록 스레드에서 호출)
+    blocking = True
+
+    def __init__(self):
+        self._hits = 0
+        self._misses = 0
+
+    @abstractmethod
+    def _check_and_set(self, key: str, ttl: float) -> bool:
+        pass
+
+    def check_and_set(self, key: str, ttl: float) -> bool:
+        """
+        중복 여부를 확인하고, 중복이 아니면 ttl(초) 동안 유지되는 키를 기록합니다.
+
+        Returns:
+            bool: 이미 기록된 키면 True (중복)
+        """
+        duplicate = self._check_and_set(key, ttl)
+        if duplicate:
+            self._hits += 1
+        else:
+            self._misses += 1
+        return duplicate
+
+    @abstractmethod
+    def get_regime(self, ticker: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def set_regime(self, ticker: str, value: str):
+        pass
+
+    @abstractmethod
+    def all_regimes(self) -> dict:
+        pass
+
+    def export_dedup(self) -> dict:
+        # 체크포인트 저장용 중복 검사 키. 공유 저장소(sqlite, redis)는 자체적으로 유지되므로 저장하지 않는다.
+        return {}
+
+    def restore_dedup(self, entries: dict) -> int:
+        return 0
+
+    def stats(self) -> dict:
+        return {'backend': type(self).__name__, 'hits': self._hits, 'misses': self._misses}
+
+
+class InMemoryStateBackend(StateBackend):
+    blocking = False
+
+    def __init__(self, window: float = 30, max_size: int = 10000):
+        super().__init__()
+        self._max_size = max_size
+        self._dedup = DedupCache(window=window, max_size=max_size)  # 기본 ttl(window) - 체크포인트 저장 / 복원
+        self._caches = {window: self._dedup}  # ttl -> DedupCache (ttl마다 만료 시간 창이 다름)
+        self._caches_lock = threading.Lock()
+        self._regimes = {}
+
+    def _check_and_set(self, key: str, ttl: float) -> bool:
+        # ttl을 DedupCache의 window로 사용 (호출하는 쪽은 보통 하나의 ttl만 사용)
+        cache = self._caches.get(ttl)
+        if cache is None:
+            with self._caches_lock:
+                cache = self._caches.get(ttl)
+                if cache is None:
+                    cache = DedupCache(window=ttl, max_size=self._max_size)
+                    self._caches = {**self._caches, ttl: cache}
+        return cache.check_and_set(key)
+
+    def get_regime(self, ticker: str) -> Optional[str]:
+        return self._regimes.get(ticker)
+
+    def set_regime(self, ticker: str, value: str):
+        self._regimes[ticker] = value
+
+    def all_regimes(self) -> dict:
+        return dict(self._regimes)
+
+    def export_dedup(self) -> dict:
+        entries = {}
+        for cache in self._caches.values():
+            entries.update(cache.export())
+        return entries
+
+    def restore_dedup(self, entries: dict) -> int:
+        # 저장한 키에는 ttl이 없으므로 기본 ttl(window)로 복원
+        return self._dedup.restore(entries)
+
+    def stats(self) -> dict:
+        stats = {}
+        for cache in self._caches.values():
+            for name, value in cache.stats().items():
+                stats[name] = stats.get(name, 0) + value
+        return {'backend': type(self).__name__, **stats}
+
+
+class SqliteStateBackend(StateBackend):
+    """
+    SQLite(WAL) 저장소. 같은 파일을 사용하는 모든 프로세스가 상태를 공유합니다.
+    """
+
+    # 만료된 중복 검사 키를 정리하는 주기 (check_and_set 호출 횟수)
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._local = threading.local()
+        self._calls = 0
+
+        conn = self._conn()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS dedup (key TEXT PRIMARY KEY, expires_at REAL NOT NULL)')
+        conn.execute('CREATE TABLE IF NOT EXISTS regime (ticker TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                     'updated_at REAL NOT NULL)')
+
+    def _conn(self) -> sqlite3.Connection:
+        # 스레드마다 별도의 커넥션 사용 (autocommit)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _check_and_set(self, key: str, ttl: float) -> bool:
+        now = time.time()
+        conn = self._conn()
+
+        # 키가 없거나 만료된 경우에만 기록 (단일 문장이므로 프로세스 간에도 원자적)
+        cursor = conn.execute(
+            'INSERT INTO dedup (key, expires_at) VALUES (?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET expires_at = excluded.expires_at WHERE dedup.expires_at <= ?',
+            (key, now + ttl, now))
+
+        self._calls += 1
+        if self._calls % self.PURGE_EVERY == 0:
+            conn.execute('DELETE FROM dedup WHERE expires_at <= ?', (now,))
+
+        return cursor.rowcount == 0
+
+    def get_regime(self, ticker: str) -> Optional[str]:
+        row = self._conn().execute('SELECT value FROM regime WHERE ticker = ?', (ticker,)).fetchone()
+        return row[0] if row else None
+
+    def set_regime(self, ticker: str, value: str):
+        self._conn().execute(
+            'INSERT INTO regime (ticker, value, updated_at) VALUES (?, ?, ?) '
+            'ON CONFLICT(ticker) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at',
+            (ticker, value, time.time()))
+
+    def all_regimes(self) -> dict:
+        return dict(self._conn().execute('SELECT ticker, value FROM regime').fetchall())
+
+
+class RedisError(Exception):
+    pass
+
+
+class _RespConnection:
+    # Redis 프로토콜(RESP2) 최소 구현
+    def __init__(self, host: str, port: int, db: int, password: Optional[str], timeout: float):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile('rb')
+
+        if password:
+            self.execute('AUTH', password)
+        if db:
+            self.execute('SELECT', db)
+
+    def execute(self, *args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(data), data))
+        self._sock.sendall(b''.join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError('Redis connection closed')
+
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b'+':
+            return payload.decode('utf-8')
+        if prefix == b'-':
+            raise RedisError(payload.decode('utf-8'))
+        if prefix == b':':
+            return int(payload)
+        if prefix == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)[:-2]
+            return data.decode('utf-8')
+        if prefix == b'*':
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise RedisError(f'Unknown reply: {line!r}')
+
+    def close(self):
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+
+class RedisStateBackend(StateBackend):
+    """
+    Redis 프로토콜 저장소. (redis 서버 혹은 RESP 호환 서버)
+    """
+
+    def __init__(self, host: str = 'localhost', port: int = 6379, db: int = 0, password: Optional[str] = None,
+                 prefix: str = 'tradehook', timeout: float = 2.0):
+        super().__init__()
+        self._params = (host, port, db, password, timeout)
+        self._prefix = prefix
+        self._local = threading.local()
+
+    def _execute(self, *args):
+        # 끊어진 연결이면 한 번만 다시 연결하여 다시 보냄 (이미 처리된 명령이 다시 실행될 수 있음 -> 명령은 재실행해도 같은 결과여야 함)
+        conn = getattr(self._local, 'conn', None)
+        for attempt in range(2):
+            if conn is None:
+                conn = self._local.conn = _RespConnection(*self._params)
+            try:
+                return conn.execute(*args)
+            except (ConnectionError, OSError):
+                conn.close()
+                conn = self._local.conn = None
+                if attempt == 1:
+                    raise
+
+    def _check_and_set(self, key: str, ttl: float) -> bool:
+        # 키마다 고유한 값을 기록 -> 응답을 받기 전에 연결이 끊겨 다시 보낸 SET이 먼저 보낸 SET과 부딪히면(nil)
+        # 저장된 값이 이번에 기록한 값인지 확인하여 실제 시그널을 중복으로 처리하지 않음
+        redis_key = f'{self._prefix}:dedup:{key}'
+        token = uuid.uuid4().hex
+        if self._execute('SET', redis_key, token, 'NX', 'PX', int(ttl * 1000)) is not None:
+            return False
+        return self._execute('GET', redis_key) != token
+
+    def get_regime(self, ticker: str) -> Optional[str]:
+        return self._execute('HGET', f'{self._prefix}:regime', ticker)
+
+    def set_regime(self, ticker: str, value: str):
+        self._execute('HSET', f'{self._prefix}:regime', ticker, value)
+
+    def all_regimes(self) -> dict:
+        reply = self._execute('HGETALL', f'{self._prefix}:regime') or []
+        return dict(zip(reply[::2], reply[1::2]))
+
+
+def create_state_backend(url: str = STATE_BACKEND_URL, window: float = 30, max_size: int = 10000) -> StateBackend:
+    """
+    URL로 상태 저장소를 생성합니다. (memory:// | sqlite:///path | redis://[:password@]host:port/db)
+    """
+    parsed = urlparse(url)
+
+    if parsed.scheme in ('', 'memory'):
+        return InMemoryStateBackend(window=window, max_size=max_size)
+    if parsed.scheme == 'sqlite':
+        path = url[len('sqlite:///'):] if url.startswith('sqlite:///') else parsed.path
+        return SqliteStateBackend(path)
+    if parsed.scheme == 'redis':
+        db = int(parsed.path.lstrip('/') or 0)
+        return RedisStateBackend(host=parsed.hostname or 'localhost', port=parsed.port or 6379, db=db,
+                                 password=parsed.password)
+
+    raise ValueError(f'지원하지 않는 상태 저장소입니다: {url}')
@@ -0,0 +1,401 @@
+import requests, jwt, uuid, hashlib, json, os, random, time, threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional
+from urllib.parse import urlencode, unquote
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+from utils.rate_limiter import get_rate_limiter, group_for, current_priority, PRIORITY_HIGH
+from utils.metrics import get_metrics, span, inc
+from utils.resilience import (DeadlineExceeded, CircuitOpenError, bounded_timeout, remaining, get_circuit_breaker,
+                              get_latency_tracker)
+
+load_dotenv()
+
+"""
+# 업비트 REST 클라이언트
+
+모든 업비트 API 호출은 이 클라이언트를 통해 처리합니다.
+
+- 커넥션 풀(keep-alive)을 사용하는 하나의 Session을 공유하여 매 호출마다 TCP/TLS 핸드셰이크를 하지 않음
+- 엔드포인트별 (connect, read) 타임아웃 적용 (시그널별 기한이 있으면 남은 시간 이내, utils/resilience.py)
+- 멱등(GET) 요청만 지터(jitter)를 준 지수 백오프로 제한된 횟수만큼 재시도
+  (주문(POST)은 재시도하지 않으며, 응답을 받지 못하면 호출하는 쪽에서 identifier로 접수 여부를 확인)
+- 요청 그룹별 서킷 브레이커: 연속 실패 시 일정 시간 동안 요청하지 않고 바로 실패
+- 현재가 / 계좌 / 체결 대기 주문 조회는 응답이 p95보다 늦으면 같은 요청을 한 번 더 보내고(hedge) 먼저 온 응답을 사용
+- JWT 인증 / query_hash 서명을 한 곳에서 처리
+- 요청 그룹별 요청 수 제한 (utils/rate_limiter.py, 응답의 Remaining-Req 헤더로 보정)
+- 엔드포인트별 처리 시간(재시도 포함), 요청 수 제한 대기 시간, 재시도 / 429 응답 수를 지표로 기록 (utils/metrics.py)
+"""
+
+UPBIT_API_URL = os.getenv('UPBIT_API_URL', 'https://api.upbit.com')
+
+# Authorization
+# Key: access_key, secret_key
+access_key = os.getenv('ACCESS_KEY', '')
+secret_key = os.getenv('SECRET_KEY', '')
+
+# 엔드포인트별 타임아웃 (connect, read) 초
+DEFAULT_TIMEOUT = (3.05, 10)
+ENDPOINT_TIMEOUTS = {
+    '/v1/orders': (3.05, 5),
+    '/v1/orders/open': (3.05, 5),
+    '/v1/order': (3.05, 5),
+    '/v1/accounts': (3.05, 5),
+    '/v1/ticker': (3.05, 3),
+    '/v1/candles/minutes': (3.05, 10),
+}
+
+# 재시도 대상 HTTP 상태 코드 (GET 요청만 재시도)
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# 헤지 요청을 보낼 수 있는 멱등 조회 엔드포인트
+HEDGE_PATHS = ('/v1/ticker', '/v1/accounts', '/v1/orders/open')
+
+# 헤지 요청 사용 여부 / 헤지 요청 전 최소 대기 시간(초, p95가 이보다 짧아도 이만큼은 기다림)
+UPBIT_HEDGE_ENABLED = os.getenv('UPBIT_HEDGE_ENABLED', '1') == '1'
+UPBIT_HEDGE_MIN_DELAY = float(os.getenv('UPBIT_HEDGE_MIN_DELAY', '0.05'))
+
+
+class UpbitAPIError(requests.HTTPError):
+    def __init__(self, status_code: int, body, response=None):
+        self.status_code = status_code
+        self.body = body
+        super().__init__(f'Upbit API error ({status_code}): {body}', response=response)
+
+    @property
+    def name(self) -> Optional[str]:
+        # 업비트 에러 이름 (e.g. {"error": {"name": "insufficient_funds_bid", ...}}), 형식이 다르면 None
+        error = self.body.get('error') if isinstance(self.body, dict) else None
+        return error.get('name') if isinstance(error, dict) else None
+
+
+class UpbitCall:
+    """
+    업비트 요청 1건(재시도 / 헤지 포함)의 요청 수 제한, 기한, 서킷 브레이커, 재시도, 헤지 판단.
+
+    동기 클라이언트(UpbitClient)와 asyncio 클라이언트(AsyncUpbitClient)가 공유하며, 각 클라이언트는 전송(requests / aiohttp)과
+    대기(time.sleep / asyncio.sleep)만 담당합니다.
+
+    Args:
+        method (str): HTTP 메서드
+        path (str): 요청 경로
+        priority (Optional[str]): 요청 우선순위 (None이면 현재 컨텍스트의 우선순위)
+        max_retries (int): GET 요청 최대 재시도 횟수
+        backoff (float): 재시도 백오프 기본 시간(초)
+        hedge (bool): 느린 조회 요청의 헤지 요청 사용 여부
+    """
+
+    def __init__(self, method: str, path: str, priority: Optional[str], max_retries: int, backoff: float,
+                 hedge: bool):
+        self.method = method
+        self.path = path
+        self.priority = priority
+        self.group = group_for(method, path)
+        # 주문(POST)은 접수 여부를 알 수 없는 상태에서 다시 보내지 않는다. (호출하는 쪽에서 identifier로 확인)
+        self.retries = max_retries if method == 'GET' else 0
+        self.backoff = backoff
+        # 헤지 요청은 매매 경로(high)의 멱등 조회만
+        self.hedge = hedge and method == 'GET' and path in HEDGE_PATHS and \
+            (priority or current_priority()) == PRIORITY_HIGH
+        self.attempt = 0
+
+        self.limiter = get_rate_limiter()
+        self.breaker = get_circuit_breaker(self.group)
+
+    def waited(self, seconds: float):
+        # 요청 수 제한 대기 시간 기록
+        get_metrics().histogram('tradehook_rate_limit_wait_seconds',
+                                'Time spent waiting for the Upbit rate limiter in seconds.').observe(seconds,
+                                                                                                     group=self.group)
+
+    def check(self):
+        """
+        요청 수 제한 토큰을 쓰기 전에 호출합니다. (차단된 서킷에 토큰을 쓰지 않음)
+
+        Raises:
+            CircuitOpenError: 서킷이 차단되어 있음
+        """
+        self.breaker.check()
+
+    def prepare(self) -> tuple:
+        """
+        요청을 보내기 직전에 호출합니다. 남은 시간 안에서의 (connect, read) 타임아웃을 반환합니다.
+
+        이 호출이 성공하면 전송이 어떻게 끝나든 on_error / on_abort / on_response 중 하나를 호출해야 합니다.
+
+        Raises:
+            DeadlineExceeded: 남은 시간이 없음
+            CircuitOpenError: 서킷이 차단되어 있음 (혹은 시험 요청이 진행 중)
+        """
+        timeout = bounded_timeout(*UpbitClient.timeout_for(self.path))
+        self.breaker.allow()
+        return timeout
+
+    def on_error(self, error: Exception) -> Optional[float]:
+        """
+        응답을 받지 못한 경우(연결 실패, 타임아웃).
+
+        Returns:
+            Optional[float]: 재시도 전 대기 시간(초), 재시도하지 않으면 None (호출하는 쪽에서 error를 다시 발생)
+        """
+        self.breaker.record_failure()
+        return self._retry_delay()
+
+    def on_abort(self):
+        # 그 밖의 예외로 전송이 끝난 경우(e.g. 응답 본문을 읽다가 끊김, 취소), 재시도하지 않고 실패로 기록
+        self.breaker.record_failure()
+
+    def on_response(self, status: int) -> Optional[float]:
+        """
+        응답을 받은 경우. 서킷 / 429 응답을 요청 수 제한에 반영합니다. (Remaining-Req는 observe에서 반영)
+
+        Returns:
+            Optional[float]: 재시도 전 대기 시간(초), 재시도하지 않으면 None (result로 응답 처리)
+        """
+        if status >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+        if status == 429:
+            self.limiter.on_throttled(self.group)
+            inc('tradehook_upbit_throttled_total', 'Upbit 429 (Too Many Requests) responses.', group=self.group)
+
+        return self._retry_delay() if status in RETRY_STATUS else None
+
+    def _retry_delay(self) -> Optional[float]:
+        # 남은 재시도 횟수와 시간이 있으면 Full jitter 백오프(0 ~ backoff * 2^attempt, 남은 시간 이내)
+        left = remaining()
+        if self.attempt >= self.retries or (left is not None and left <= 0):
+            return None
+
+        inc('tradehook_upbit_retries_total', 'Retried Upbit requests.', endpoint=self.path)
+        delay = random.uniform(0, self.backoff * (2 ** self.attempt))
+        self.attempt += 1
+        return delay if left is None else min(delay, left)
+
+    @staticmethod
+    def result(status: int, text: str, response=None):
+        """
+        응답 본문(JSON)을 반환합니다.
+
+        Raises:
+            UpbitAPIError: 4xx / 5xx 응답
+        """
+        try:
+            body = json.loads(text)
+        except ValueError:
+            body = text
+
+        if status >= 400:
+            raise UpbitAPIError(status, body, response=response)
+        return body
+
+    def observe(self, status: int, headers, seconds: float):
+        # 받은 응답마다 호출 (헤지 요청은 먼저 온 응답과 늦게 온 응답 모두)
+        # Remaining-Req로 요청 수 제한 보정, 응답 시간은 헤지 요청 대기 시간(p95) 계산용 (서버 에러 응답은 제외)
+        self.limiter.observe(self.group, headers)
+        if status < 500:
+            get_latency_tracker(self.path).observe(seconds)
+
+    def hedge_delay(self) -> Optional[float]:
+        # 헤지 요청을 보내기 전 기다릴 시간(초), 응답 시간 기록이 부족하면 None (헤지하지 않음)
+        p95 = get_latency_tracker(self.path).p95()
+        return None if p95 is None else max(p95, UPBIT_HEDGE_MIN_DELAY)
+
+    def start_hedge(self) -> bool:
+        # 서킷이 차단 직전이거나 요청 수 여유가 없으면 헤지하지 않고 기다림
+        if not self.breaker.is_closed or not self.limiter.try_acquire(self.group, self.priority):
+            return False
+        inc('tradehook_upbit_hedged_total', 'Hedged Upbit read requests.', endpoint=self.path)
+        return True
+
+    def hedge_won(self):
+        inc('tradehook_upbit_hedge_wins_total', 'Hedged requests answered first.', endpoint=self.path)
+
+
+class UpbitClient:
+    """
+    업비트 REST API 클라이언트.
+
+    Args:
+        base_url (str): API 주소 (테스트 시 로컬 서버로 변경 가능)
+        access_key (str): 업비트 Access Key
+        secret_key (str): 업비트 Secret Key
+        pool_size (int): 커넥션 풀 크기
+        max_retries (int): GET 요청 최대 재시도 횟수
+        backoff (float): 재시도 백오프 기본 시간(초)
+        hedge (bool): 느린 조회 요청의 헤지 요청 사용 여부
+    """
+
+    def __init__(self, base_url: str = UPBIT_API_URL, access_key: str = access_key, secret_key: str = secret_key,
+                 pool_size: int = 10, max_retries: int = 3, backoff: float = 0.2, hedge: bool = UPBIT_HEDGE_ENABLED):
+        self.base_url = base_url.rstrip('/')
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.hedge = hedge
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_lock = threading.Lock()
+
+        # 재시도는 직접 처리하므로 adapter의 재시도는 사용하지 않는다.
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({"Accept": "application/json"})
+
+    @staticmethod
+    def query_string(params: Optional[dict]) -> str:
+        # 업비트 서명 규칙: unquote된 query string 사용 (배열은 key[]=a&key[]=b)
+        if not params:
+            return ''
+        return unquote(urlencode(params, doseq=True))
+
+    def auth_headers(self, params: Optional[dict] = None) -> dict:
+        payload = {
+            "access_key": self.access_key,
+            "nonce": str(uuid.uuid4()),
+        }
+
+        if params:
+            query_hash = hashlib.sha512(self.query_string(params).encode("utf-8")).hexdigest()
+            payload["query_hash"] = query_hash
+            payload["query_hash_alg"] = "SHA512"
+
+        jwt_token = jwt.encode(payload, self.secret_key)
+        return {"Authorization": 'Bearer {}'.format(jwt_token)}
+
+    @staticmethod
+    def timeout_for(path: str) -> tuple:
+        if path in ENDPOINT_TIMEOUTS:
+            return ENDPOINT_TIMEOUTS[path]
+
+        # /v1/candles/minutes/{unit} 처럼 경로 파라미터가 있는 경우
+        for prefix, timeout in ENDPOINT_TIMEOUTS.items():
+            if path.startswith(prefix + '/'):
+                return timeout
+        return DEFAULT_TIMEOUT
+
+    def request(self, method: str, path: str, params: Optional[dict] = None, auth: bool = False,
+                priority: Optional[str] = None):
+        # 재시도를 포함한 전체 처리 시간을 엔드포인트 / HTTP 상태 코드별로 기록
+        with span('upbit.request', endpoint=path, method=method) as request_span:
+            return self._request(method, path, params, auth, priority, request_span)
+
+    def _request(self, method: str, path: str, params: Optional[dict], auth: bool, priority: Optional[str],
+                 request_span):
+        url = self.base_url + path
+        call = UpbitCall(method, path, priority, self.max_retries, self.backoff, self.hedge)
+
+        while True:
+            try:
+                # 서킷이 차단되어 있으면 요청 수 제한 토큰을 쓰지 않고 바로 실패
+                call.check()
+                # 요청 그룹별 초당 요청 수 제한 (우선순위 미지정 시 현재 컨텍스트의 우선순위)
+                call.waited(call.limiter.acquire(call.group, priority))
+                timeout = call.prepare()
+            except (DeadlineExceeded, CircuitOpenError) as e:
+                request_span.tag(status=type(e).__name__)
+                raise
+
+            # prepare 이후에는 어떻게 끝나든 서킷에 결과를 기록 (시험 요청이 남아 있으면 서킷이 계속 차단됨)
+            try:
+                if call.hedge:
+                    response = self._send_hedged(call, url, params, auth, timeout)
+                else:
+                    response = self._send(call, url, params, auth, timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                delay = call.on_error(e)
+                if delay is None:
+                    request_span.tag(status=type(e).__name__)
+                    raise
+                time.sleep(delay)
+                continue
+            except BaseException as e:
+                call.on_abort()
+                request_span.tag(status=type(e).__name__)
+                raise
+
+            delay = call.on_response(response.status_code)
+            if delay is not None:
+                time.sleep(delay)
+                continue
+
+            request_span.tag(status=str(response.status_code))
+            return call.result(response.status_code, response.text, response=response)
+
+    def _send(self, call: 'UpbitCall', url: str, params: Optional[dict], auth: bool,
+              timeout: tuple) -> requests.Response:
+        # nonce가 매번 달라야 하므로 요청(재시도, 헤지)마다 다시 서명한다.
+        headers = self.auth_headers(params) if auth else None
+
+        start = time.perf_counter()
+        if call.method in ('GET', 'DELETE'):
+            response = self.session.request(call.method, url, params=params, headers=headers, timeout=timeout)
+        else:
+            response = self.session.request(call.method, url, json=params, headers=headers, timeout=timeout)
+
+        call.observe(response.status_code, response.headers, time.perf_counter() - start)
+        return response
+
+    def _send_hedged(self, call: 'UpbitCall', url: str, params: Optional[dict], auth: bool,
+                     timeout: tuple) -> requests.Response:
+        # 응답이 p95보다 늦으면 같은 요청을 한 번 더 보내고 먼저 온 응답을 사용 (멱등 조회만)
+        delay = call.hedge_delay()
+        if delay is None:
+            return self._send(call, url, params, auth, timeout)
+
+        executor = self._get_hedge_executor()
+        primary = executor.submit(self._send, call, url, params, auth, timeout)
+        done, _ = wait([primary], timeout=delay)
+        if done or not call.start_hedge():
+            return primary.result()
+
+        hedged = executor.submit(self._send, call, url, params, auth, timeout)
+
+        pending = {primary, hedged}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedged:
+                        call.hedge_won()
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        if self._hedge_executor is None:
+            with self._hedge_lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(max_workers=self.pool_size,
+                                                              thread_name_prefix='upbit-hedge')
+        return self._hedge_executor
+
+    def get(self, path: str, params: Optional[dict] = None, auth: bool = False, priority: Optional[str] = None):
+        return self.request('GET', path, params=params, auth=auth, priority=priority)
+
+    def post(self, path: str, params: Optional[dict] = None, auth: bool = True):
+        return self.request('POST', path, params=params, auth=auth)
+
+    def delete(self, path: str, params: Optional[dict] = None, auth: bool = True):
+        return self.request('DELETE', path, params=params, auth=auth)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_upbit_client() -> UpbitClient:
+    # 프로세스 전체에서 하나의 클라이언트(커넥션 풀)를 공유한다.
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = UpbitClient()
+    return _client
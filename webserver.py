@@ -1,299 +1,899 @@
-from flask import Flask, request, jsonify  # , abort
-import logging
-from logging.handlers import TimedRotatingFileHandler
-import os, sys, math, time
-from collections import defaultdict  # 캐시를 위한 defaultdict 추가
-import pandas as pd
+from flask import Flask, request, jsonify, Response  # , abort
+import os, sys, math, threading, time
+import requests
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
+from typing import Callable, Optional
 
 # 현재 스크립트의 디렉토리 경로를 얻습니다.
 current_dir = os.path.dirname(os.path.abspath(__file__))
 
-# account, upbit_data, trading, utils 디렉토리의 경로를 생성
+# account, upbit_data, trading, utils, indicator 디렉토리의 경로를 생성
 account_dir = os.path.join(current_dir, 'account')
 trading_dir = os.path.join(current_dir, 'trading')
 utils_dir = os.path.join(current_dir, 'utils')
 upbit_data_dir = os.path.join(current_dir, 'upbit_data')
+indicator_dir = os.path.join(current_dir, 'indicator')
 
 # sys.path에 디렉토리를 추가
 sys.path.append(account_dir)
 sys.path.append(trading_dir)
 sys.path.append(utils_dir)
 sys.path.append(upbit_data_dir)
+sys.path.append(indicator_dir)
 
 # import
-from account.my_account import get_my_exchange_account
-from trading.trade import buy_market, sell_market, get_open_order
-from utils.email_utils import send_email
-from utils.convert_utils import convert_trade_ticker, convert_simple_ticker, get_trade_price, \
-    calculate_min_quantity_precise
-from upbit_data.candle import get_min_candle_data
+from account.account_cache import Reservation, get_account_cache
+from account.models import AccountSnapshot
+from trading.trade import buy_market, sell_market, get_open_order, get_order
+from trading.models import Order
+from trading.order_tracker import get_order_tracker, OrderTrackTimeout
+from utils.notifier import notify, get_notifier
+from utils.convert_utils import convert_trade_ticker, convert_simple_ticker, min_quantity, market_label, signal_label
+from upbit_data.candle_store import get_candle_store
+from upbit_data.price_feed import get_price_feed
+from upbit_data.candle_stream import get_candle_stream
+from upbit_data.market_catalog import get_market_catalog
+from upbit_data.models import MarketInfo
+from trading.trade_worker import TradeWorkerPool
+from trading.signal_coalescer import SignalCoalescer
+from trading.trade_journal import (TradeJournal, order_identifier, EVENT_SIGNAL, EVENT_SUBMIT, EVENT_ACCEPTED,
+                                   EVENT_OPEN, EVENT_DONE, EVENT_CANCEL, EVENT_FAILED)
+from utils.state_backend import create_state_backend
+from utils.rate_limiter import get_rate_limiter
+from utils.metrics import get_metrics, span, inc
+from utils.log_utils import setup_logging, correlation
+from utils.checkpoint import Checkpoint
+from utils.upbit_client import UpbitAPIError
+from utils.resilience import DeadlineExceeded, CircuitOpenError, deadline, circuit_stats
+from indicator.ema_engine import EmaRegimeEngine
 
 # Flask
 app = Flask(__name__)
 
-# logs 폴더 생성 (없으면 자동 생성)
-os.makedirs('logs', exist_ok=True)
-
-# TimedRotatingFileHandler 설정: 일자별 로테이션
-handler = TimedRotatingFileHandler(
-    filename='logs/app.log',  # 기본 파일명 (로테이션 시 변경됨)
-    when='midnight',  # 자정에 로테이션
-    interval=1,  # 1일 간격
-    backupCount=30,  # 최대 30일치 백업 파일 유지 (필요 시 조정)
-    encoding='utf-8'  # UTF-8 인코딩
-)
-handler.suffix = '%Y-%m-%d.log'  # 로테이션 파일명: app.log.YYYY-MM-DD
-handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))  # 로그 형식
-
-# 로거 설정
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-logger.addHandler(handler)
+# 로거 설정 (logs/app.log, JSON lines, 일자별 로테이션)
+# 요청 / 매매 스레드는 큐에 넣기만 하고 파일 기록은 writer 스레드에서 처리
+logger = setup_logging(__name__)
 
 # TradingView에서 설정한 시크릿 키
 SECRET_KEY = 'tradingview_haguri_peng_secret_key'
 
-# 중복 검사 캐시: 키 = "ticker_value_signal", 값 = 마지막 처리 timestamp
-signal_cache = defaultdict(float)  # 기본값 0.0 (float)
-
 # 중복 검사 시간 창: 30초
 DUPLICATE_WINDOW = 30
 
-# EMA 크로스
-EMA_cross = ''
+# 시그널 1건의 처리 시간 예산(초): 이 안에서만 업비트를 호출하여, 중복 검사 시간 창이 끝나기 전에 결과가 정해지도록 함
+TRADE_DEADLINE = float(os.getenv('TRADE_DEADLINE', '20'))
+
+# 주문 요청의 응답을 받지 못했을 때 identifier로 접수 여부를 확인하기 전 대기 시간(초) / 확인에 사용할 시간(초)
+ORDER_RECONCILE_DELAY = 1.0
+ORDER_RECONCILE_TIMEOUT = 10.0
+
+# 중복 검사 캐시 최대 크기 (memory:// 저장소에서 사용)
+SIGNAL_CACHE_SIZE = int(os.getenv('SIGNAL_CACHE_SIZE', '10000'))
+
+# 공유 상태 저장소 (EMA 크로스, 중복 검사)
+# 여러 프로세스/서버로 운영할 때는 STATE_BACKEND_URL을 sqlite:///... 혹은 redis://... 로 설정
+STATE_BACKEND_URL = os.getenv('STATE_BACKEND_URL', 'memory://')
+state_backend = create_state_backend(STATE_BACKEND_URL, window=DUPLICATE_WINDOW, max_size=SIGNAL_CACHE_SIZE)
+
+# 시그널 수신 -> 주문 요청 -> 접수(uuid) -> 체결 상태를 기록하는 저널 (SQLite WAL, group commit)
+trade_journal = TradeJournal()
+
+# 매매 대상 마켓과 EMA 계산에 사용할 분봉 단위 (e.g. "KRW-DOGE:10,KRW-BTC:60")
+TRADE_MARKETS = os.getenv('TRADE_MARKETS', 'KRW-DOGE:10')
+
+# 기동 시 EMA 레짐 계산(캔들 조회)을 동시에 진행할 마켓 수
+WARMUP_CONCURRENCY = int(os.getenv('WARMUP_CONCURRENCY', '4'))
+
+# EMA 레짐 계산에 사용할 캔들 수 (체크포인트가 없을 때)
+WARMUP_CANDLES = 1000
+
+# EMA50/EMA200 레짐 엔진 (캔들 마감 시 O(1) 갱신)
+ema_engine = EmaRegimeEngine(fast_span=50, slow_span=200)
+
+# 매도 수량 계산에 사용할 수 있는 현재가의 최대 경과 시간(초)
+MAX_TRADE_PRICE_AGE = float(os.getenv('MAX_TRADE_PRICE_AGE', '10'))
+
+# 1회 주문 금액 (quote 화폐별, 마켓의 최소 주문 금액보다 작으면 최소 주문 금액으로 주문)
+ORDER_AMOUNTS = os.getenv('ORDER_AMOUNTS', 'KRW:50000,USDT:35,BTC:0.0005')
+
+# 매매 작업 워커 수 (서로 다른 티커는 병렬, 같은 티커는 순서대로 처리)
+TRADE_WORKERS = int(os.getenv('TRADE_WORKERS', '4'))
+
+# 체결 스트림으로 만든 캔들이 마감될 때마다 EMA 레짐 갱신 (기본값은 현재가 WebSocket 사용 여부를 따름)
+CANDLE_STREAM_ENABLED = os.getenv('CANDLE_STREAM_ENABLED', os.getenv('UPBIT_WS_ENABLED', '1')) == '1'
+
+
+# 매매 대상 마켓 설정 파싱 -> [(market, unit), ...]
+def parse_markets(markets: str) -> list:
+    parsed = []
+    for item in markets.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        market, _, unit = item.partition(':')
+        parsed.append((market.strip(), int(unit or 10)))
+    return parsed
+
+
+# 1회 주문 금액 설정 파싱 -> {quote: Decimal}
+def parse_order_amounts(amounts: str) -> dict:
+    parsed = {}
+    for item in amounts.split(','):
+        quote, _, amount = item.strip().partition(':')
+        if quote and amount:
+            parsed[quote.strip()] = Decimal(amount.strip())
+    return parsed
+
+
+order_amounts = parse_order_amounts(ORDER_AMOUNTS)
+
+
+def order_amount(info: MarketInfo) -> Decimal:
+    # 마켓의 1회 주문 금액 (최소 / 최대 주문 금액 이내)
+    amount = max(order_amounts.get(info.quote, info.min_total), info.min_total)
+    if info.max_total is not None:
+        amount = min(amount, info.max_total)
+    return amount
+
+
+def order_fee(ticker: str, side: str) -> tuple:
+    # TradingView 심볼의 주문 1건 예상 수수료 -> (quote, 수수료). 시그널 상계로 절약한 수수료 집계용
+    info = get_market_catalog().get(convert_trade_ticker(ticker))
+    return info.quote, order_amount(info) * (info.bid_fee if side == 'buy' else info.ask_fee)
+
+
+# 티커별 EMA 크로스 조회 / 세팅 (모든 프로세스가 공유)
+# EMA_cross_* 알림과 로컬 EMA 엔진(기동 시 warmup, 캔들 스트림의 봉 마감)이 같은 값을 세팅하며, 마지막에 세팅한 값을 사용한다.
+# 캔들 스트림을 사용하면 봉이 마감될 때마다 로컬 레짐으로 덮어쓰므로 알림 값은 다음 봉 마감까지만 유지된다. (다르면 경고 로그)
+def get_ema_cross(trade_ticker: str):
+    return state_backend.get_regime(trade_ticker)
+
+
+def set_ema_cross(trade_ticker: str, value: Optional[str]):
+    # 캔들이 부족하여 로컬 레짐을 아직 계산하지 못한 경우(None)에는 기존 값을 유지
+    if value is None:
+        return
+    state_backend.set_regime(trade_ticker, value)
+
+
+# EMA 엔진 시드
+# 마지막 캔들은 아직 진행 중이므로 마감된 캔들만 반영한다. (rows: 캔들 저장소 레코드, 시간 오름차순)
+def seed_ema_engine(ticker: str, rows):
+    closed_rows = rows[:-1]
+    if len(closed_rows) < ema_engine.slow_span:
+        raise ValueError(f"데이터가 부족(최소 {ema_engine.slow_span}개는 필요)합니다.")
+
+    return ema_engine.seed(ticker, closed_rows['close'].tolist(), int(closed_rows['ts'][-1]))
+
+
+def handle_alert(data: dict, alert_span=None, coalescer: Optional[SignalCoalescer] = None):
+    """
+    알림 1건 처리 (EMA 크로스 세팅, 중복 검사, 시그널 묶음 처리기에 추가)
+
+    Args:
+        coalescer (Optional[SignalCoalescer]): 시그널 묶음 처리기 (기본: 이 모듈의 signal_coalescer)
+
+    Returns:
+        tuple: (응답 dict, HTTP 상태 코드)
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Alert must be a JSON object.")
+
+    logger.info("Received: %s", data)
+
+    ticker: str = data.get('ticker')
+    value: str = data.get('value')
+    if not all([ticker, value]):
+        raise ValueError("Missing fields.")
 
+    # EMA 크로스 값 세팅
+    if value.startswith('EMA'):
+        trade_ticker = convert_trade_ticker(ticker)
+        set_ema_cross(trade_ticker, value)
 
-# 캔들 조회
-def get_candle_data(ticker: str, minute: int):
-    return get_min_candle_data(ticker, minute)
+        # 로컬에서 계산한 레짐과 교차 검증
+        if ema_engine.cross_check(trade_ticker, value) is False:
+            logger.warning("[%s] EMA_cross mismatch - alert: %s, local: %s",
+                           trade_ticker, value, ema_engine.regime(trade_ticker))
 
+    # signal = ''
+    # if value.startswith('long'):
+    #     # 50EMA > 200EMA인 경우에만 매수 시그널
+    #     if get_ema_cross(convert_trade_ticker(ticker)) == 'EMA_cross_up':
+    #         signal = 'buy'
+    # elif value.startswith('short'):
+    #     signal = 'sell'
+    signal = value.lower()
 
-# EMA 계산
-def calc_ema(df: pd.DataFrame):
-    # DataFrame 필수 데이터 검증
-    required_columns = ['close', 'date', 'time', 'volume']
-    if not all(col in df.columns for col in required_columns):
-        raise ValueError(f"DataFrame은 {required_columns} 컬럼을 포함해야 합니다.")
+    logger.info("signal: %s", signal)
+    if not signal:
+        raise ValueError("signal is empty.")
 
-    # 최소 200개 데이터 필요 (MA200 계산을 위해)
-    if len(df) < 200:
-        print('데이터가 부족합니다 (최소 200개 필요).')
-        raise ValueError(f"데이터가 부족(최소 200개는 필요)합니다.")
+    if alert_span is not None:
+        alert_span.tag(ticker=market_label(ticker), signal=signal_label(signal))
 
-    # EMA
-    df['EMA50'] = df['close'].ewm(span=50, adjust=False).mean()
-    df['EMA200'] = df['close'].ewm(span=200, adjust=False).mean()
+    # 중복 검사 키 생성
+    cache_key = f"{ticker}_{value}_{signal}"
 
-    # 50EMA와 200EMA 비교)
-    return df['EMA50'].iloc[-1] > df['EMA200'].iloc[-1]
+    # 중복 아니면 바로 캐시에 기록 (처리 시작 마킹)
+    with span('webhook.dedup'):
+        duplicate = state_backend.check_and_set(cache_key, DUPLICATE_WINDOW)
+    if duplicate:
+        logger.info("Duplicate signal ignored: %s", data)
+        inc('tradehook_duplicates_total', 'Duplicate signals ignored.', ticker=market_label(ticker))
+        return {"status": "duplicate_ignored"}, 200
+
+    # 같은 티커의 시그널을 SIGNAL_COALESCE_WINDOW초 동안 모아서 상계한 뒤 최대 1건의 매매 작업으로 등록
+    # 매매 로직은 워커에서 처리하고, 요청은 바로 응답 (TradingView 재전송 방지)
+    job_id = (coalescer or signal_coalescer).add(ticker, signal, value)
+
+    # 수신한 시그널 기록 (재시작 시 중복 검사 복원에 사용, 커밋은 기다리지 않음)
+    trade_journal.record(EVENT_SIGNAL, job_id, ticker, signal, key=cache_key, value=value)
+
+    if job_id is None:
+        return {"status": "ignored"}, 200
+
+    logger.info("Trade signal queued: %s", job_id)
+    return {"status": "accepted", "job_id": job_id}, 202
 
 
 # Webhook
+# 알림 1건(JSON 객체) 혹은 여러 건(JSON 배열, {"alerts": [...]})을 한 번에 받는다.
 @app.route('/webhook', methods=['POST'])
 def webhook():
-    global EMA_cross
-
     # # 인증 검증
     # signature = request.headers.get('X-Signature')
     # if signature != SECRET_KEY:
     #     logger.error("Invalid signature.")
     #     abort(403)
 
-    try:
-        data = request.get_json()
-        if not data:
-            raise ValueError("No JSON data.")
+    # 웹훅과 매매 작업의 로그는 같은 correlation id를 가진다. (매매 작업은 등록한 요청의 컨텍스트에서 실행)
+    with span('webhook') as webhook_span, correlation(request.headers.get('X-Request-Id')):
+        try:
+            with span('webhook.parse'):
+                data = request.get_json()
 
-        logger.info(f"Received: {data}")
+            body, status_code = handle_payload(data, webhook_span)
+            return jsonify(body), status_code
 
-        ticker: str = data.get('ticker')
-        value: str = data.get('value')
-        if not all([ticker, value]):
-            raise ValueError("Missing fields.")
+        except Exception as e:
+            logger.error("Error: %s", e)
+            inc('tradehook_errors_total', 'Errors by stage.', stage='webhook')
+            webhook_span.tag(status='error')
+            return jsonify({"error": str(e)}), 500
 
-        # EMA 크로스 값 세팅
-        if value.startswith('EMA'):
-            EMA_cross = value
 
-        # signal = ''
-        # if value.startswith('long'):
-        #     # 50EMA > 200EMA인 경우에만 매수 시그널
-        #     if EMA_cross == 'EMA_cross_up':
-        #         signal = 'buy'
-        # elif value.startswith('short'):
-        #     signal = 'sell'
-        signal = value.lower()
+def handle_payload(data, webhook_span, coalescer: Optional[SignalCoalescer] = None):
+    """
+    웹훅 본문 처리. 알림 1건(JSON 객체) 혹은 여러 건(JSON 배열, {"alerts": [...]})
 
-        logger.info(f"signal: {signal}")
-        if not signal:
-            raise ValueError("signal is empty.")
+    Returns:
+        tuple: (응답 dict, HTTP 상태 코드)
+    """
+    if not data:
+        raise ValueError("No JSON data.")
 
-        # 중복 검사 키 생성
-        cache_key = f"{ticker}_{value}_{signal}"
+    if isinstance(data, dict) and 'alerts' in data:
+        data = data['alerts']
 
-        current_time = time.time()
-        last_processed = signal_cache[cache_key]
+    if not isinstance(data, list):
+        body, status_code = handle_alert(data, webhook_span, coalescer)
+        webhook_span.tag(status=body['status'].replace('_ignored', ''))
+        return body, status_code
 
-        if last_processed > 0 and (current_time - last_processed) < DUPLICATE_WINDOW:
-            logger.info(f"Duplicate signal ignored: {data}")
-            return jsonify({"status": "duplicate_ignored"}), 200
+    # 여러 건: 알림별로 처리하고 결과를 순서대로 반환 (한 건의 에러가 나머지에 영향을 주지 않음)
+    results = []
+    for alert in data:
+        try:
+            body, _ = handle_alert(alert, coalescer=coalescer)
+        except Exception as e:
+            logger.error("Error: %s", e)
+            inc('tradehook_errors_total', 'Errors by stage.', stage='webhook')
+            body = {"error": str(e)}
+        results.append(body)
 
-        # 중복 아니면 바로 캐시 업데이트 (처리 시작 마킹)
-        signal_cache[cache_key] = current_time
+    accepted = any(body.get('status') == 'accepted' for body in results)
+    webhook_span.tag(status='accepted' if accepted else 'batch')
+    return {"results": results}, 202 if accepted else 200
 
-        # 매매 로직 호출
-        process_trade(ticker, signal, value)
 
-        return jsonify({"status": "success"}), 200
+# Prometheus 지표 (구간별 처리 시간 히스토그램, 중복 / 에러 / 429 카운터)
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(get_metrics().render(), mimetype='text/plain; version=0.0.4')
+
+
+# 작업 목록 조회 (e.g. /jobs?status=queued)
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    status = request.args.get('status')
+    return jsonify({"stats": trade_workers.stats(), "jobs": trade_workers.list_jobs(status)}), 200
 
-    except Exception as e:
-        logger.error(f"Error: {str(e)}")
-        return jsonify({"error": str(e)}), 500
 
+# 작업 큐 / 중복 검사 캐시 / 시그널 묶음(절약한 주문 / 수수료) / 알림 / 요청 수 제한 통계, 티커별 EMA 크로스
+@app.route('/stats', methods=['GET'])
+def stats():
+    return jsonify(collect_stats(trade_workers, signal_coalescer)), 200
 
-def get_account_info(ticker: str):
+
+def collect_stats(workers: TradeWorkerPool, coalescer: SignalCoalescer) -> dict:
+    return {"jobs": workers.stats(), "dedup": state_backend.stats(),
+            "coalesce": coalescer.stats(), "regimes": state_backend.all_regimes(),
+            "notify": get_notifier().stats(), "rate_limit": get_rate_limiter().stats(),
+            "checkpoint": checkpoint.stats(), "journal": trade_journal.stats(), "circuits": circuit_stats()}
+
+
+# 작업 상태 조회
+# 아직 시그널을 모으는 중이거나 상계되어 주문하지 않은 경우에는 시간 창 상태(pending / netted)를 반환
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id: str):
+    job = trade_workers.get_job(job_id) or signal_coalescer.get(job_id)
+    if job is None:
+        return jsonify({"error": "job not found"}), 404
+    return jsonify(job), 200
+
+
+def get_account_info(info: MarketInfo):
     logger.info("========== get_account_info ==========")
 
-    # Get my account infomation
-    my_account = get_my_exchange_account()
+    # Get my account infomation (캐시된 스냅샷, 최대 ACCOUNT_CACHE_MAX_AGE초 이내)
+    my_account = get_account_cache().get()
 
+    return summarize_account(my_account, info)
+
+
+# 계좌 스냅샷에서 매매에 필요한 값 추출 (asyncio 서버와 공유)
+def summarize_account(my_account: AccountSnapshot, info: MarketInfo):
     # ticker 기준으로 확인
     is_ticker_in_account = False
     ticker_balance = '0'
     ticker_avg_buy_price = 0.0
 
-    if 'currency' not in my_account.columns:
-        raise ValueError("[currency] 컬럼이 존재하지 않습니다.")
-
-    if ticker in my_account['currency'].values:
+    ticker_account = my_account.get(info.base)
+    if ticker_account is not None:
         is_ticker_in_account = True
-        ticker_balance = my_account[my_account['currency'] == ticker]['balance'].values[0]
-        ticker_avg_buy_price = float(my_account[my_account['currency'] == ticker]['avg_buy_price'].values[0])
+        ticker_balance = ticker_account.balance
+        ticker_avg_buy_price = ticker_account.avg_buy_price
 
-    logger.info(f"is_ticker_in_account : {is_ticker_in_account}")
-    logger.info(f"ticker_balance : {ticker_balance}")
-    logger.info(f"ticker_avg_buy_price : {ticker_avg_buy_price}")
+    logger.info("is_ticker_in_account : %s", is_ticker_in_account)
+    logger.info("ticker_balance : %s", ticker_balance)
+    logger.info("ticker_avg_buy_price : %s", ticker_avg_buy_price)
 
-    # 원화 잔고 확인
-    krw_amount = 0.0
-    krw_ticker = 'KRW'
-    if krw_ticker in my_account['currency'].values:
-        my_account['balance'] = my_account['balance'].astype(float)
-        krw_amount = my_account[my_account['currency'] == krw_ticker]['balance'].values[0]
+    # 주문 화폐(quote, e.g. KRW / USDT) 잔고 확인
+    quote_amount = Decimal('0')
+    quote_account = my_account.get(info.quote)
+    if quote_account is not None:
+        quote_amount = Decimal(quote_account.balance)
 
-    logger.info(f"krw_amount : {krw_amount}")
+    logger.info("%s_amount : %s", info.quote.lower(), quote_amount)
 
-    # 투자 가능한 원화 계산
-    # 거래 수수료는 원화(KRW) 마켓에서는 0.05%이나 실제 매수 시 전체 금액에서 0.1%를 제한 금액으로 투자를 진행
-    krw_invest_amount = 0
-    if krw_amount > 0:
-        krw_invest_amount = math.floor(krw_amount * 0.999)
+    # 투자 가능한 금액 계산 (마켓의 매수 수수료를 제한 금액)
+    quote_invest_amount = quote_amount / (1 + info.bid_fee) if quote_amount > 0 else Decimal('0')
 
-    logger.info(f"krw_invest_amount : {krw_invest_amount}")
+    logger.info("%s_invest_amount : %s", info.quote.lower(), quote_invest_amount)
 
     return {
         'is_ticker': is_ticker_in_account,
         'ticker_balance': ticker_balance,
         'ticker_buy_price': ticker_avg_buy_price,
-        'krw_balance': krw_amount,
-        'krw_available': krw_invest_amount
+        'quote_balance': quote_amount,
+        'quote_available': quote_invest_amount
     }
 
 
-def process_trade(ticker: str, signal: str, value: str):
+def already_submitted(trade_ticker: str, identifier: Optional[str]) -> bool:
+    # 같은 identifier의 주문이 이미 접수되어 있는지 (재전송된 시그널)
+    previous = trade_journal.get(identifier) if identifier else None
+    if previous and previous['kind'] in (EVENT_ACCEPTED, EVENT_OPEN, EVENT_DONE, EVENT_CANCEL):
+        logger.info("[%s] order %s already submitted (%s)", trade_ticker, identifier, previous['kind'])
+        return True
+    return False
+
+
+def place_order(place: Callable[[], Order], trade_ticker: str, side: str, identifier: Optional[str],
+                **detail) -> Optional[Order]:
+    """
+    주문 요청을 저널에 먼저 기록(커밋)한 뒤 주문하고, 접수 결과를 기록합니다.
+
+    Returns:
+        Optional[Order]: 접수된 주문. 같은 identifier의 주문이 이미 접수되어 있으면(재전송된 시그널) None
+    """
+    if already_submitted(trade_ticker, identifier):
+        return None
+
+    trade_journal.record(EVENT_SUBMIT, identifier, trade_ticker, side, wait=True, **detail)
+    try:
+        order = place()
+    except Exception as e:
+        action = order_error_action(e, trade_ticker, identifier, NO_RESPONSE_ERRORS)
+        existing = lookup_error = None
+        if needs_order_lookup(action, identifier):
+            try:
+                existing = find_order(identifier, ORDER_RECONCILE_DELAY if action == ORDER_UNKNOWN else 0)
+            except Exception as lookup:
+                lookup_error = lookup
+        return settle_order_error(action, e, trade_ticker, side, identifier, existing, lookup_error)
+
+    return record_order_result(order, trade_ticker, side, identifier)
+
+
+# 주문 요청 에러의 처리 방법 (동기 / asyncio 서버 공유)
+ORDER_NOT_ACCEPTED = 'not_accepted'  # 접수되지 않음 (요청 전 실패, 업비트가 거부)
+ORDER_EXISTS = 'exists'  # 재시작 전에 같은 identifier로 접수된 주문이 있어서 업비트가 거부
+ORDER_UNKNOWN = 'unknown'  # 응답을 받지 못함 (접수되었을 수 있으므로 다시 보내지 않고 identifier로 확인)
+
+# 같은 identifier로 접수된 주문이 있을 때의 업비트 에러 이름 (나머지 4xx는 잔고 부족, 최소 주문 금액 미만 등의 거부)
+DUPLICATE_IDENTIFIER_ERROR = 'duplicate_identifier'
+
+# 동기 클라이언트에서 응답을 받지 못한 경우의 예외 (asyncio 서버는 aiohttp 예외를 사용)
+NO_RESPONSE_ERRORS = (requests.RequestException,)
+
+
+def order_error_action(error: Exception, trade_ticker: str, identifier: Optional[str],
+                       no_response: tuple) -> Optional[str]:
+    """
+    주문 요청 에러의 처리 방법을 정합니다.
+
+    Args:
+        no_response (tuple): 응답을 받지 못한 경우의 예외 (클라이언트별)
+
+    Returns:
+        Optional[str]: ORDER_NOT_ACCEPTED / ORDER_EXISTS / ORDER_UNKNOWN, 알 수 없는 에러면 None
+            (저널에는 주문 요청만 남고 다음 기동 시 reconcile_orders에서 확인)
+    """
+    # DeadlineExceeded / CircuitOpenError는 요청을 보내기 전에 발생
+    if isinstance(error, (DeadlineExceeded, CircuitOpenError)):
+        return ORDER_NOT_ACCEPTED
+    if isinstance(error, UpbitAPIError):
+        return ORDER_EXISTS if identifier and error.name == DUPLICATE_IDENTIFIER_ERROR else ORDER_NOT_ACCEPTED
+    if isinstance(error, no_response):
+        logger.warning("[%s] order %s no response: %s", trade_ticker, identifier, describe_error(error))
+        return ORDER_UNKNOWN
+    return None
+
+
+def needs_order_lookup(action: Optional[str], identifier: Optional[str]) -> bool:
+    # identifier로 주문을 조회해야 하는지
+    return bool(identifier) and action in (ORDER_EXISTS, ORDER_UNKNOWN)
+
+
+def find_order(identifier: str, delay: float = ORDER_RECONCILE_DELAY) -> Optional[Order]:
+    # identifier로 주문 조회 (업비트에 주문이 없으면 None), 시그널의 남은 처리 시간과 관계없이 ORDER_RECONCILE_TIMEOUT초 사용
+    time.sleep(delay)
+    with deadline(ORDER_RECONCILE_TIMEOUT):
+        try:
+            return get_order(identifier=identifier)
+        except UpbitAPIError as e:
+            if e.status_code == 404:
+                return None
+            raise
+
+
+def settle_order_error(action: Optional[str], error: Exception, trade_ticker: str, side: str,
+                       identifier: Optional[str], existing: Optional[Order] = None,
+                       lookup_error: Optional[Exception] = None) -> Optional[Order]:
+    """
+    주문 요청 에러와 identifier 조회 결과(existing / lookup_error)를 저널에 기록합니다. (동기 / asyncio 서버 공유)
+
+    응답을 받지 못한 주문의 접수 여부를 확인하지 못하면 저널에는 주문 요청(submit)만 남으며,
+    다음 기동 시 reconcile_orders에서 다시 확인합니다.
+
+    Returns:
+        Optional[Order]: 응답 없이 접수된 것을 확인한 주문. 재시작 전에 접수된 주문이면 None
+
+    Raises:
+        Exception: 접수되지 않았거나 접수 여부를 확인하지 못함 (error)
+    """
+    if action == ORDER_EXISTS and existing is not None:
+        logger.info("[%s] order %s already exists: %s", trade_ticker, identifier, existing.uuid)
+        trade_journal.record(EVENT_ACCEPTED, identifier, trade_ticker, side, existing.uuid, replayed=True)
+        return None
+
+    if action == ORDER_UNKNOWN:
+        if not identifier or lookup_error is not None:
+            if lookup_error is not None:
+                logger.error("[%s] order %s check error: %s", trade_ticker, identifier, describe_error(lookup_error))
+            notify('주문 확인 필요',
+                   f'[{trade_ticker}] 주문 {identifier or ""}의 접수 여부를 확인하지 못했습니다. ({describe_error(error)})')
+            raise error
+
+        if existing is not None:
+            logger.info("[%s] order %s accepted without response: %s", trade_ticker, identifier, existing.uuid)
+            trade_journal.record(EVENT_ACCEPTED, identifier, trade_ticker, side, existing.uuid, reconciled=True)
+            return existing
+
+    if action is not None:
+        trade_journal.record(EVENT_FAILED, identifier, trade_ticker, side, error=describe_error(error))
+    raise error
+
+
+def record_order_result(order: Order, trade_ticker: str, side: str, identifier: Optional[str]) -> Order:
+    # 주문 응답의 접수 여부를 저널에 기록 (동기 / asyncio 서버 공유)
+    if order.is_accepted:
+        trade_journal.record(EVENT_ACCEPTED, identifier, trade_ticker, side, order.uuid)
+    else:
+        trade_journal.record(EVENT_FAILED, identifier, trade_ticker, side, error='not accepted')
+    return order
+
+
+def describe_error(error: Exception) -> str:
+    # 메시지가 없는 예외(e.g. asyncio.TimeoutError)는 예외 이름
+    return str(error) or type(error).__name__
+
+
+def record_fill(identifier: Optional[str], order: Order):
+    # 최종 체결 상태(done / cancel)를 저널에 기록
+    trade_journal.record(EVENT_DONE if order.state == 'done' else EVENT_CANCEL, identifier, order.market, order.side,
+                         order.uuid, executed_volume=order.executed_volume, paid_fee=order.paid_fee)
+
+
+def record_fill_when_done(identifier: Optional[str], order_uuid: str):
+    # 체결 추적이 끝나면 최종 상태를 저널에 기록 (기다리지 않음)
+    def on_done(future):
+        if future.exception() is None:
+            record_fill(identifier, future.result())
+
+    get_order_tracker().track(order_uuid).add_done_callback(on_done)
+
+
+def buy_order_amount(account_info: dict, info: MarketInfo) -> Optional[Decimal]:
+    # 현재 계좌의 잔고(quote)에서 투자 가능한 금액 확인 -> 매수 금액 (부족하면 None)
+    quote_available = account_info['quote_available']
+    buy_amount = order_amount(info)
+
+    logger.info("%s_available : %s", info.quote.lower(), quote_available)
+
+    # 1회 주문 금액(최소 주문 금액 이상) 이상일 때 진행
+    if quote_available >= buy_amount:
+        return buy_amount
+    return None
+
+
+def sell_order_volume(ticker: str, account_info: dict, ticker_trade_price: Optional[float],
+                      price_age: Optional[float], info: MarketInfo) -> Decimal:
+    # 매도 수량 (1회 주문 금액어치, 보유 수량 이내)
+    ticker_balance = account_info['ticker_balance']
+    if not ticker_balance or ticker_balance == '0':
+        raise ValueError("매도할 대상이 없습니다.")
+
+    if ticker_trade_price is None:
+        raise ValueError(f"[{ticker}] trade_price 가 없습니다.")
+
+    if price_age > MAX_TRADE_PRICE_AGE:
+        raise ValueError(f"[{ticker}] trade_price 가 오래되었습니다. ({price_age:.1f}초 경과)")
+
+    # 매도할 balance를 1회 주문 금액에 맞게 환산 (마켓의 수량 소수점 자릿수에서 올림)
+    sell_amount = min_quantity(ticker_trade_price, info.volume_decimals, order_amount(info))
+
+    # sell_amount > ticker_balance
+    if sell_amount > Decimal(ticker_balance):
+        sell_amount = Decimal(ticker_balance)
+
+    # 업비트에서 거부될 주문은 요청하지 않는다.
+    if sell_amount * Decimal(str(ticker_trade_price)) < info.min_total:
+        raise ValueError(f"[{ticker}] 최소 주문 금액({info.min_total} {info.quote}) 미만입니다. ({sell_amount})")
+
+    logger.info("ticker_balance : %s", ticker_balance)
+    logger.info("sell_amount : %s", sell_amount)
+    return sell_amount
+
+
+def reserve_buy(buy_amount: Decimal, info: MarketInfo) -> Optional[Reservation]:
+    # 동시에 처리 중인 시그널이 같은 잔고로 매수하지 않도록 주문하기 전에 주문 금액(수수료 포함)을 차감
+    # 계좌 조회 이후 다른 시그널이 먼저 차감하여 잔고가 부족하면 None (주문하지 않음)
+    # (with 문을 빠져나올 때까지 settle()하지 않으면 차감 취소)
+    reservation = get_account_cache().reserve(info.quote, buy_amount * (1 + info.bid_fee))
+    if reservation is None:
+        logger.info("%s 잔고가 부족하여 매수하지 않습니다. (주문 금액: %s)", info.quote, buy_amount)
+    return reservation
+
+
+def on_buy_accepted(trade_ticker: str, identifier: Optional[str], buy_result: Order, buy_amount: Decimal,
+                    info: MarketInfo):
+    # 체결 상태는 기다리지 않고 추적이 끝나면 저널에 기록
+    record_fill_when_done(identifier, buy_result.uuid)
+
+    # 시장가로 주문하기 때문에 uuid 값이 있으면 정상적으로 처리됐다고 가정한다.
+    # logger.info("[%s] %s원 매수 하였습니다.", trade_ticker, krw_available)
+    logger.info("[%s] %s %s 매수 하였습니다.", trade_ticker, buy_amount, info.quote)
+    # notify(f'[{trade_ticker}] 시장가 매수', f'TrendFollow - {value}')
+    notify(f'[{trade_ticker}] 시장가 매수', f'[{trade_ticker}] {buy_amount} {info.quote} 매수 하였습니다.')
+
+
+def on_sell_filled(trade_ticker: str, identifier: Optional[str], filled_order: Order, sell_amount: Decimal):
+    get_account_cache().apply_fill(filled_order)
+    record_fill(identifier, filled_order)
+
+    logger.info("[%s] sell order %s %s (executed_volume: %s)", trade_ticker, filled_order.uuid,
+                filled_order.state, filled_order.executed_volume)
+    logger.info("[%s] %s 매도 하였습니다.", trade_ticker, sell_amount)
+    notify(f'[{trade_ticker}] 시장가 매도',
+           f'{sell_amount} 매도 하였습니다.')
+
+
+def process_trade(ticker: str, signal: str, value: str, identifier: Optional[str] = None):
     # 기존 매매 로직 (비동기 가능하게)
-    logger.info(f"Process trading {signal} {ticker}")
+    logger.info("Process trading %s %s (%s)", signal, ticker, identifier)
 
-    # 매매 시 사용하는 티커로 변경 (e.g. DOGEKRW -> KRW-DOGE)
+    # 매매 시 사용하는 티커로 변경 (e.g. DOGEKRW -> KRW-DOGE, BTCUSDT -> USDT-BTC)
     trade_ticker = convert_trade_ticker(ticker)
     simple_ticker = convert_simple_ticker(ticker)  # DOGE
 
-    logger.info(f"trade_ticker : {trade_ticker}")
-    logger.info(f"simple_ticker : {simple_ticker}")
+    logger.info("trade_ticker : %s", trade_ticker)
+    logger.info("simple_ticker : %s", simple_ticker)
+
+    # 마켓별 주문 규칙 (최소 주문 금액, 수수료, 수량 자릿수 - 마켓 카탈로그에 미리 계산된 값)
+    market_info = get_market_catalog().get(trade_ticker)
+    label = market_label(trade_ticker)
 
-    # trade_price 추출
-    ticker_trade_price = get_trade_price(trade_ticker)
+    # trade_price 추출 (현재가 피드, 오래된 가격이면 REST로 다시 조회)
+    with span('trade.price', ticker=label):
+        ticker_trade_price, price_age = get_price_feed().get_price(trade_ticker)
 
-    logger.info(f"[{trade_ticker}] ticker_trade_price : {ticker_trade_price}")
+    logger.info("[%s] ticker_trade_price : %s (age: %s)", trade_ticker, ticker_trade_price, price_age)
 
     # 계좌정보 확인
-    account_info = get_account_info(simple_ticker)
+    with span('trade.account', ticker=label):
+        account_info = get_account_info(market_info)
 
     # 매수
     if signal == 'buy':
-        # 현재 계좌의 잔고(KRW)에서 투자 가능한 금액 확인
-        krw_available = math.floor(account_info['krw_available'])
-
-        logger.info(f"krw_available : {krw_available}")
-
-        # 5,000원(최소 거래금액) 이상일 때 진행
-        # 5,000 -> 50,000 KRW
-        # if krw_available >= 5000:
-        if krw_available >= 50000:
-            buy_krw_amount = 50000
-
+        buy_amount = buy_order_amount(account_info, market_info)
+        # 주문 금액은 실제로 차감(reserve)한 금액 -> 차감하지 못하면 주문하지 않음
+        reservation = reserve_buy(buy_amount, market_info) if buy_amount is not None else None
+        if reservation is not None:
             # 매수 거래
             # buy_result = buy_market(trade_ticker, krw_available)
-            buy_result = buy_market(trade_ticker, buy_krw_amount)
-
-            if buy_result['uuid'].notnull()[0]:
-                # 시장가로 주문하기 때문에 uuid 값이 있으면 정상적으로 처리됐다고 가정한다.
-                # logger.info(f"[{trade_ticker}] {krw_available}원 매수 하였습니다.")
-                logger.info(f"[{trade_ticker}] {buy_krw_amount}원 매수 하였습니다.")
-                # send_email(f'[{trade_ticker}] 시장가 매수', f'TrendFollow - {value}')
-                send_email(f'[{trade_ticker}] 시장가 매수', f'[{trade_ticker}] {buy_krw_amount}원 매수 하였습니다.')
+            with reservation:
+                with span('trade.order', ticker=label, signal=signal):
+                    buy_result = place_order(lambda: buy_market(trade_ticker, str(buy_amount), identifier),
+                                             trade_ticker, 'bid', identifier, price=str(buy_amount))
+                if buy_result is not None and buy_result.is_accepted:
+                    reservation.settle()
+            if buy_result is None:
+                return
+
+            if buy_result.is_accepted:
+                on_buy_accepted(trade_ticker, identifier, buy_result, buy_amount, market_info)
             else:
-                send_email('매수 중 에러 발생', '매수 중 에러가 발생하였습니다. 확인해주세요.')
+                notify('매수 중 에러 발생', '매수 중 에러가 발생하였습니다. 확인해주세요.')
                 raise RuntimeError("매수가 정상적으로 처리되지 않았습니다.")
 
     # 매도
     elif signal == 'sell':
-        ticker_balance = account_info['ticker_balance']
-        if not ticker_balance or ticker_balance == '0':
-            raise ValueError("매도할 대상이 없습니다.")
+        sell_amount = sell_order_volume(ticker, account_info, ticker_trade_price, price_age, market_info)
+
+        with span('trade.order', ticker=label, signal=signal):
+            sell_result = place_order(lambda: sell_market(trade_ticker, str(sell_amount), identifier),
+                                      trade_ticker, 'ask', identifier, volume=str(sell_amount))
+        if sell_result is None:
+            return
+
+        if sell_result.is_accepted:
+            # 체결(done) 혹은 취소(cancel)될 때까지 대기 (최대 ORDER_TRACK_TIMEOUT초)
+            try:
+                with span('trade.fill_wait', ticker=label, signal=signal):
+                    filled_order = get_order_tracker().track(sell_result.uuid).result()
+            except OrderTrackTimeout as e:
+                notify('매도 체결 확인 지연', f'[{trade_ticker}] {sell_amount} 매도 주문의 체결을 확인하지 못했습니다.')
+                raise RuntimeError(str(e))
+
+            on_sell_filled(trade_ticker, identifier, filled_order, sell_amount)
+        else:
+            notify('매도 중 에러 발생', '매도 중 에러가 발생하였습니다. 확인해주세요.')
+            raise RuntimeError("매도가 정상적으로 처리되지 않았습니다.")
 
-        if ticker_trade_price is None:
-            raise ValueError(f"[{ticker}] trade_price 가 없습니다.")
 
-        # 매도할 balance를 50,000 KRW에 맞게 환산
-        sell_amount = calculate_min_quantity_precise(ticker_trade_price, 8)
+def warmup_market(market: str, unit: int):
+    # 저장소에 없는 캔들만 조회 -> 체크포인트에서 복원한 EMA 상태에 이후 마감 캔들만 반영 (없으면 시드) -> 레짐 세팅
+    candle_store = get_candle_store()
+    candle_store.sync(market, unit, WARMUP_CANDLES)
+    rows = candle_store.tail(market, unit, WARMUP_CANDLES)
 
-        # sell_amount > ticker_balance
-        if sell_amount > Decimal(ticker_balance):
-            sell_amount = Decimal(ticker_balance)
+    state = ema_engine.get_state(market)
+    closed_rows = rows[:-1]
+    if (state is None or state.last_ts is None or not ema_engine.is_ready(market)
+            or len(closed_rows) == 0 or state.last_ts < closed_rows['ts'][0]):
+        seed_ema_engine(market, rows)
+    else:
+        for row in closed_rows[closed_rows['ts'] > state.last_ts]:
+            ema_engine.update(market, float(row['close']), int(row['ts']))
 
-        logger.info(f"ticker_balance : {ticker_balance}")
-        logger.info(f"sell_amount : {sell_amount}")
+    if CANDLE_STREAM_ENABLED:
+        stream_candles(market, unit)
 
-        sell_result = sell_market(trade_ticker, str(sell_amount))
-        if sell_result['uuid'].notnull()[0]:
-            while True:
-                open_order_df = get_open_order(trade_ticker, 'wait')
+    regime = ema_engine.regime(market)
+    set_ema_cross(market, regime)
+    return regime
 
-                time.sleep(5)  # 5초 대기
 
-                # wait 중인 거래가 없으면 반복 중단
-                if len(open_order_df) == 0:
-                    break
+# 캔들 스트림의 마감 봉을 EMA 엔진에 반영하는 마켓 -> 분봉 단위 (warmup이 끝난 마켓만)
+_streamed_units = {}
+_streamed_lock = threading.Lock()
 
-            logger.info(f"[{trade_ticker}] {sell_amount} 매도 하였습니다.")
-            send_email(f'[{trade_ticker}] 시장가 매도',
-                       f'{sell_amount} 매도 하였습니다.')
-        else:
-            send_email('매도 중 에러 발생', '매도 중 에러가 발생하였습니다. 확인해주세요.')
-            raise RuntimeError("매도가 정상적으로 처리되지 않았습니다.")
 
+def stream_candles(market: str, unit: int):
+    # warmup 중에 스트림에서 마감된 봉을 반영하고, 이후의 봉은 on_candle_close에서 반영
+    with _streamed_lock:
+        for bar in get_candle_stream().candles(market, unit):
+            ema_engine.update(market, float(bar['close']), int(bar['ts']))  # 이미 반영된 시각은 무시됨
+        _streamed_units[market] = unit
+
+
+def on_candle_close(market: str, unit: int, bar):
+    # 캔들 스트림 콜백: 설정된 분봉이 마감되면 EMA를 O(1)로 갱신하고 레짐 세팅 (캔들 조회 없음)
+    # 마지막 EMA_cross_* 알림 값도 로컬 레짐으로 덮어쓴다. (set_ema_cross 참고)
+    with _streamed_lock:
+        if _streamed_units.get(market) != unit:
+            return
+        ema_engine.update(market, float(bar['close']), int(bar['ts']))
+        set_ema_cross(market, ema_engine.regime(market))
+
+
+def warmup_markets(markets: list):
+    # 마켓별 캔들 조회를 최대 WARMUP_CONCURRENCY개씩 동시에 진행
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WARMUP_CONCURRENCY, thread_name_prefix='warmup') as executor:
+        futures = {market: executor.submit(warmup_market, market, unit) for market, unit in markets}
+
+    for market, future in futures.items():
+        try:
+            logger.info("[%s] EMA_cross : %s", market, future.result())
+        except Exception as e:
+            logger.error("[%s] EMA warmup error: %s", market, e)
+
+    logger.info("EMA warmup finished in %.2fs", time.perf_counter() - start)
+    checkpoint.save()
 
-if __name__ == '__main__':
-    logger.info("TradeHook Web Server starts..")
 
-    # 도지코인(KRW-DOGE) 10분봉 가져오기
-    doge_10min_data = get_candle_data('KRW-DOGE', 10)
+def export_ema_state() -> dict:
+    # EMA 상태와 함께 분봉 단위를 저장 (단위가 바뀐 마켓은 복원하지 않음)
+    return {'units': dict(parse_markets(TRADE_MARKETS)), **ema_engine.export()}
+
+
+def restore_ema_state(data: dict) -> int:
+    units = dict(parse_markets(TRADE_MARKETS))
+    saved_units = data.get('units', {})
+    states = {market: state for market, state in data.get('states', {}).items()
+              if market in units and saved_units.get(market) == units[market]}
+    return ema_engine.restore({**data, 'states': states})
+
+
+def restore_regimes(regimes: dict) -> int:
+    # 공유 저장소에 이미 있는 (다른 프로세스가 기록한) 값은 덮어쓰지 않는다.
+    restored = 0
+    for ticker, value in regimes.items():
+        if value and get_ema_cross(ticker) is None:
+            set_ema_cross(ticker, value)
+            restored += 1
+    return restored
+
+
+def run_trade_job(ticker: str, signal: str, value: str, identifier: Optional[str] = None):
+    # 워커 스레드에서 실행되므로 에러는 여기서 로그로 남긴다.
+    try:
+        # 처리 시간 예산은 워커가 작업을 시작할 때부터 계산 (큐 / 시그널 묶음 대기 시간은 제외)
+        with deadline(TRADE_DEADLINE), span('trade', ticker=market_label(ticker), signal=signal_label(signal)):
+            process_trade(ticker, signal, value, identifier)
+    except Exception as e:
+        logger.error("[%s] Trade job error: %s", ticker, e)
+        inc('tradehook_errors_total', 'Errors by stage.', stage='trade')
+        # 주문 전에 실패한 경우 (주문 후의 실패는 주문 상태로 기록됨)
+        if identifier and trade_journal.get(identifier) is None:
+            trade_journal.record(EVENT_FAILED, identifier, ticker, signal, error=str(e))
+        raise
+
+
+def submit_trade(ticker: str, signal: str, value: str, job_id: Optional[str] = None):
+    # 시간 창 id(시그널로 정해지는 값)를 작업 id와 주문 identifier로 사용
+    return trade_workers.submit(ticker, signal, value, job_id, job_id=job_id)
+
+
+def reconcile_orders() -> dict:
+    """
+    저널에서 끝나지 않은 주문(submit / accepted / open)을 업비트 주문 조회로 확인하여 최종 상태를 기록합니다. (기동 시)
+
+    Returns:
+        dict: 상태별 주문 수
+    """
+    pending = trade_journal.pending()
+    result = {}
+    markets = {}
+    for order in pending:
+        markets.setdefault(order['ticker'], []).append(order)
+
+    for market, orders in markets.items():
+        try:
+            open_orders = {order.identifier: order for order in get_open_order(market, 'wait') if order.identifier}
+        except Exception as e:
+            logger.error("[%s] open order check error: %s", market, e)
+            continue
+
+        for pending_order in orders:
+            identifier = pending_order['identifier']
+            order = open_orders.get(identifier)
+            if order is None:
+                try:
+                    order = get_order(identifier=identifier)
+                except UpbitAPIError as e:
+                    if e.status_code != 404:
+                        logger.error("[%s] order %s check error: %s", market, identifier, e)
+                        continue
+                    # 주문 요청 기록만 있고 업비트에 주문이 없음 (요청 전에 종료)
+                    trade_journal.record(EVENT_FAILED, identifier, market, pending_order['side'], error='not found')
+                    result[EVENT_FAILED] = result.get(EVENT_FAILED, 0) + 1
+                    continue
+                except Exception as e:
+                    logger.error("[%s] order %s check error: %s", market, identifier, e)
+                    continue
+
+            if order.is_final:
+                record_fill(identifier, order)
+                kind = EVENT_DONE if order.state == 'done' else EVENT_CANCEL
+            else:
+                trade_journal.record(EVENT_OPEN, identifier, market, order.side, order.uuid)
+                record_fill_when_done(identifier, order.uuid)
+                kind = EVENT_OPEN
+            result[kind] = result.get(kind, 0) + 1
 
-    is_EMA_cross_up = calc_ema(doge_10min_data)
-    EMA_cross = 'EMA_cross_up' if is_EMA_cross_up else 'EMA_cross_down'
+    logger.info("Journal reconciled: %s", result)
+    if result.get(EVENT_FAILED) or result.get(EVENT_OPEN):
+        notify('주문 확인 필요', f'재시작 전 주문 확인 결과: {result}')
+    return result
+
+
+# 매매 작업 워커
+trade_workers = TradeWorkerPool(run_trade_job, max_workers=TRADE_WORKERS)
+
+# 티커별 시그널 묶음 처리 (시간 창마다 최대 1건의 주문)
+# 시간 창 id는 첫 시그널로 정해지므로(재전송된 시그널은 같은 id) 주문 identifier로도 사용
+signal_coalescer = SignalCoalescer(
+    submit_trade, order_fee=order_fee,
+    make_id=lambda ticker, signal, value: order_identifier(ticker, value, DUPLICATE_WINDOW))
+
+# 재시작 시 바로 알림을 처리할 수 있도록 EMA 상태(마지막 캔들 시각 포함) / 레짐 / 중복 검사 키를 저장
+checkpoint = Checkpoint()
+checkpoint.register('ema', export_ema_state, restore_ema_state)
+checkpoint.register('regimes', state_backend.all_regimes, restore_regimes)
+checkpoint.register('dedup', state_backend.export_dedup, state_backend.restore_dedup)
+
+
+def boot():
+    # 기동 시 상태 복원과 백그라운드 작업 시작 (asyncio 서버와 공유)
+
+    # 체크포인트 복원 (EMA 상태, 레짐, 중복 검사 키)
+    logger.info("Checkpoint restored: %s", checkpoint.load())
+    checkpoint.start()
+
+    # 체크포인트 이후에 받은 시그널도 중복 검사에 반영하고, 끝나지 않은 주문은 업비트에서 확인
+    logger.info("Journal signals restored: %s",
+                state_backend.restore_dedup(trade_journal.recent_signals(DUPLICATE_WINDOW)))
+    threading.Thread(target=reconcile_orders, name='reconcile', daemon=True).start()
+
+    markets = parse_markets(TRADE_MARKETS)
+
+    # 체결 스트림 구독 시작 (기동 / 재연결 시 빠진 분봉은 REST로 채움)
+    # warmup이 끝난 마켓부터 마감된 봉이 EMA 엔진에 반영되므로 warmup보다 먼저 시작
+    if CANDLE_STREAM_ENABLED:
+        candle_stream = get_candle_stream()
+        candle_stream.subscribe(on_candle_close)
+        candle_stream.add_markets([market for market, _ in markets])
+
+    # 설정된 마켓별 EMA 레짐 계산 (e.g. 도지코인(KRW-DOGE) 10분봉)
+    # 체크포인트 이후의 캔들만 조회하여 반영하며, 알림 수신을 막지 않도록 백그라운드에서 진행
+    threading.Thread(target=warmup_markets, args=(markets,), name='warmup', daemon=True).start()
+
+    # 마켓 카탈로그 조회 시작 (매매 대상 마켓은 주문 가능 정보까지 조회, 이후 백그라운드에서 갱신)
+    get_market_catalog().start([market for market, _ in markets])
+
+    # 현재가 피드 구독 시작
+    get_price_feed().add_markets([market for market, _ in markets])
+
+
+if __name__ == '__main__':
+    logger.info("TradeHook Web Server starts..")
 
-    logger.info(f"EMA_cross : {EMA_cross}")
+    boot()
 
     app.run(host='0.0.0.0', port=5555, debug=False)